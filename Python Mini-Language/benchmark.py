@@ -0,0 +1,667 @@
+from classes.lexer import Lexer
+from classes.parser import Parser
+from classes.interpreter import Interpreter
+from classes.compiler import Compiler, compile_source
+from classes.optimizer import Optimizer, count_nodes
+from classes.bytecode import BytecodeCompiler, Bytecode, VM
+from classes.frontend import AsyncChecker
+from classes.scanner import Scanner, measure_throughput
+from classes.tokenbuffer import tokenize_all
+from classes.incremental import Document, TokenList
+from classes.stackparser import StackParser
+from classes.fastparser import FastParser
+from classes.parallel import ParallelParser, paused_gc
+from classes.export import export_tokens, export_tree, read_tokens, read_tree
+from classes.generator import Generator
+from classes.semantic import Checker
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+##########################
+# BENCHMARKS
+##########################
+
+def example_text(copies):
+    """
+    Returns the programs in 'examples' concatenated 'copies' times.
+    The result is not a valid program but lexes like a large one.
+    """
+    folder = os.path.join(sys.path[0], 'examples')
+    text = ''
+    for name in sorted(os.listdir(folder)):
+        with open(os.path.join(folder, name)) as file:
+            text += file.read() + '\n'
+    return text * copies
+
+
+def euclid_text(a, b):
+    """
+    Returns examples/euclid.txt with other starting values. The loop
+    runs about max(a, b) / min(a, b) times for coprime values.
+    """
+    return f'''program GCD:
+   int a;  int b;
+   a := {a};
+   b := {b};
+   while a != b do
+      if a < b then b := b - a
+      else a := a - b
+      fi
+   od;
+   print a
+end
+'''
+
+
+def token_memory(args):
+    """
+    Compares the memory needed to keep every token as a Token object
+    against a packed TokenBuffer (bytes per token, source not included).
+    """
+    text = example_text(args.copies)
+    tracemalloc.start()
+    lex = Lexer(text)
+    tokens = [lex.next()]
+    while tokens[-1].kind() != 'EOF':
+        tokens.append(lex.next())
+    objects = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    count = len(tokens)
+    del tokens
+
+    tracemalloc.start()
+    buffer = tokenize_all(text)
+    packed = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(buffer) == count
+
+    print(f'{count} tokens')
+    print(f'{"Token objects" : <16}{objects / count:8.1f} bytes/token')
+    print(f'{"TokenBuffer" : <16}{packed / count:8.1f} bytes/token '
+          f'({buffer.nbytes() / count:.1f} in arrays)')
+
+
+def bulk_tokenize(args):
+    """
+    Compares tokens/sec of calling next() on the Lexer and the Scanner
+    for every token with tokenize_all() on a 1MB generated program
+    (best of --repeat runs each).
+    """
+    text = Generator(seed=args.seed).text(1 << 20)
+    results = {}
+    for name, lexer_class in (('Lexer.next', Lexer), ('Scanner.next', Scanner)):
+        runs = [measure_throughput(text, lexer_class) for _ in range(args.repeat)]
+        results[name] = runs[0]['tokens'], min(stats['seconds'] for stats in runs)
+    seconds, _ = measure(lambda: tokenize_all(text), args.repeat, False)
+    results['tokenize_all'] = len(tokenize_all(text)) - 1, seconds
+    base = results['Lexer.next'][1]
+    for name, (count, seconds) in results.items():
+        print(f'{name : <14}{count} tokens in {seconds:.6f} seconds ({count / seconds:12,.0f} tokens/sec, '
+              f'{base / seconds:.1f}x Lexer.next)')
+
+
+def trivia_stress(args):
+    """
+    Lexes a program with 100k blank lines followed by 100k comment lines
+    (--lines) with the Lexer and the Scanner and reports the time. That
+    deep trivia does not raise a RecursionError is checked in
+    tests/test_lexer.py.
+    """
+    text = ('program Blank:\n' + '\n' * args.lines +
+            '// comment line\n' * args.lines + '  print 1\nend\n')
+    for name, lexer_class in (('Lexer', Lexer), ('Scanner', Scanner)):
+        start_time = time.perf_counter()
+        lex = lexer_class(text)
+        token = lex.next()
+        while token.kind() != 'EOF':
+            token = lex.next()
+        seconds = time.perf_counter() - start_time
+        print(f'{name : <10}{2 * args.lines} trivia lines in {seconds:.6f} seconds')
+
+
+def interpret(args):
+    """
+    Runs Euclid's algorithm on (--iterations, 1) with the interpreter
+    and reports statements executed per second.
+    """
+    tree = Parser(Lexer(euclid_text(args.iterations, 1))).program()
+    output = []
+    interpreter = Interpreter(tree, output.append)
+    start_time = time.perf_counter()
+    interpreter.run()
+    seconds = time.perf_counter() - start_time
+    assert output == ['1'], output
+    print(f'{"Interpreter" : <14}{interpreter.steps} statements in {seconds:.6f} seconds '
+          f'({interpreter.steps / seconds:,.0f} statements/sec)')
+
+
+def compiled(args):
+    """
+    Runs the 'interpret' program compiled to Python and compares the
+    time with the interpreter. The second compile_source() call is
+    served from the cache.
+    """
+    text = euclid_text(args.iterations, 1)
+    output = []
+    interpreter = Interpreter(Parser(Lexer(text)).program(), output.append)
+    start_time = time.perf_counter()
+    interpreter.run()
+    interpreted = time.perf_counter() - start_time
+
+    for attempt in ('cold', 'cached'):
+        start_time = time.perf_counter()
+        run = compile_source(text)
+        compile_time = time.perf_counter() - start_time
+        print(f'{"compile (" + attempt + ")" : <20}{compile_time:.6f} seconds')
+
+    start_time = time.perf_counter()
+    run(output.append)
+    seconds = time.perf_counter() - start_time
+    assert output == ['1', '1'], output
+    print(f'{"Interpreter" : <20}{interpreted:.6f} seconds')
+    print(f'{"Compiled" : <20}{seconds:.6f} seconds ({interpreted / seconds:.1f}x faster)')
+
+
+def incremental(args):
+    """
+    Edits the middle of a program with --lines statements: changes a
+    number, inserts a new line, then changes the number again while a
+    syntax error is left near the start. Compares Document.edit() with
+    lexing and parsing the new text again.
+    """
+    lines = ''.join(f'   a := a + {line};\n' for line in range(args.lines))
+    text = 'program Edit:\n   int a;\n' + lines + '   print a\nend\n'
+    document = Document(text)
+    offset = text.index(f'a + {args.lines // 2};') + 4
+
+    start_time = time.perf_counter()
+    fresh = Document(text)
+    full = time.perf_counter() - start_time
+    print(f'{"Full parse" : <14}{fresh.reparsed} tokens in {full:.6f} seconds')
+
+    def timed(name, offset, deleted, inserted):
+        start_time = time.perf_counter()
+        document.edit(offset, deleted, inserted)
+        edited = time.perf_counter() - start_time
+        print(f'{name : <14}{document.reparsed} tokens in {edited:.6f} seconds '
+              f'({full / edited:.1f}x faster)')
+
+    timed('Edit', offset, len(str(args.lines // 2)), '7')
+    timed('New line', offset, 0, '\n')
+    document.edit(text.index('a + 1;') + 4, 0, ')')
+    timed('With error', offset + 2, 1, '8')
+
+    fresh = Document(document.text)
+    assert document.tree is None and fresh.tree is None
+    assert [str(error) for error in document.diagnostics] == [str(error) for error in fresh.diagnostics]
+    document.edit(text.index('a + 1;') + 4, 1, '')
+    assert document.tree == Document(document.text).tree
+
+
+def deep_nesting(args):
+    """
+    Parses --nesting nested if statements around an expression with
+    --nesting nested parentheses with the Parser and the StackParser,
+    then a generated 1MB program with both to compare their speed on
+    ordinary input.
+    """
+    depth = args.nesting
+    text = ('program Deep:\n   int a;\n' + 'if a < 1 then\n' * depth +
+            'a := ' + '(' * depth + '1' + ')' * depth + '\n' + 'fi\n' * depth + 'end\n')
+    flat = Generator(seed=args.seed).text(1 << 20)
+    for name, parser_class in (('Parser', Parser), ('StackParser', StackParser)):
+        parser = parser_class(Lexer(text))
+        start_time = time.perf_counter()
+        accepted = parser.program() is not None
+        seconds = time.perf_counter() - start_time
+        print(f'{name : <14}depth {depth}: {"accepted" if accepted else "rejected"} in {seconds:.6f} seconds')
+        start_time = time.perf_counter()
+        assert parser_class(Lexer(flat)).program() is not None
+        print(f'{"" : <14}1MB generated program in {time.perf_counter() - start_time:.6f} seconds')
+
+
+def optimize(args):
+    """
+    Optimizes a generated 1MB program and reports the nodes removed and
+    the time to compile the tree to Python before and after.
+    """
+    text = Generator(seed=args.seed).text(1 << 20)
+    tree = Parser(Lexer(text)).program()
+    before = count_nodes(tree)
+    start_time = time.perf_counter()
+    Compiler(tree).compile()
+    unoptimized = time.perf_counter() - start_time
+
+    tree = Parser(Lexer(text)).program()
+    optimizer = Optimizer(tree)
+    start_time = time.perf_counter()
+    optimizer.optimize()
+    seconds = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    Compiler(tree).compile()
+    optimized = time.perf_counter() - start_time
+    print(f'{"Optimizer" : <14}{optimizer.removed} of {before} nodes removed '
+          f'({optimizer.removed / before:.1%}) in {seconds:.6f} seconds')
+    print(f'{"Compile" : <14}{unoptimized:.6f} seconds before, {optimized:.6f} seconds after')
+
+
+def vm(args):
+    """
+    Runs the 'interpret' program with the interpreter and with the VM
+    after compiling it to bytecode, writing it to a file and loading it
+    back, and reports the time of each step.
+    """
+    text = euclid_text(args.iterations, 1)
+    tree = Parser(Lexer(text)).program()
+    output = []
+    interpreter = Interpreter(tree, output.append)
+    start_time = time.perf_counter()
+    interpreter.run()
+    interpreted = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    bytecode = BytecodeCompiler(Parser(Lexer(text)).program()).compile()
+    compile_time = time.perf_counter() - start_time
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'euclid.mlc')
+        bytecode.save(path)
+        size = os.path.getsize(path)
+        start_time = time.perf_counter()
+        loaded = Bytecode.load(path)
+        load_time = time.perf_counter() - start_time
+    assert loaded == bytecode
+    machine = VM(loaded, output.append)
+    start_time = time.perf_counter()
+    machine.run()
+    seconds = time.perf_counter() - start_time
+    assert output == ['1', '1'], output
+    print(f'{"parse+compile" : <16}{compile_time:.6f} seconds')
+    print(f'{"load" : <16}{load_time:.6f} seconds ({size} bytes)')
+    print(f'{"Interpreter" : <16}{interpreted:.6f} seconds ({interpreter.steps / interpreted:,.0f} statements/sec)')
+    print(f'{"VM" : <16}{seconds:.6f} seconds ({interpreted / seconds:.1f}x faster)')
+
+
+async def byte_stream(data, size=16 << 10):
+    """
+    Stands in for a request body: yields 'data' in chunks, letting other
+    tasks run between them.
+    """
+    for start in range(0, len(data), size):
+        await asyncio.sleep(0)
+        yield data[start:start + size]
+
+
+async def blocking_check(source):
+    """
+    Checks a request the plain way, blocking the event loop.
+    """
+    data = b''.join([chunk async for chunk in source])
+    tree = Parser(Lexer(data.decode('utf-8'))).program()
+    return tree is not None and not Checker(tree).errors
+
+
+async def load(check, small, large, rate, duration, heavy):
+    """
+    Sends small programs at 'rate' requests per second for 'duration'
+    seconds while 'heavy' tasks keep sending the large program. Returns
+    the latencies of the small requests, measured from the time each was
+    due, so requests delayed by a blocked event loop count as slow.
+    """
+    loop = asyncio.get_running_loop()
+    latencies = []
+    done = False
+
+    async def request(due):
+        await check(byte_stream(small))
+        latencies.append(loop.time() - due)
+
+    async def heavy_client():
+        while not done:
+            await check(byte_stream(large))
+
+    background = [asyncio.create_task(heavy_client()) for _ in range(heavy)]
+    requests = []
+    start_time = loop.time()
+    for index in range(int(rate * duration)):
+        due = start_time + index / rate
+        await asyncio.sleep(max(due - loop.time(), 0))
+        requests.append(asyncio.create_task(request(due)))
+    await asyncio.gather(*requests)
+    done = True
+    await asyncio.gather(*background)
+    return sorted(latencies)
+
+
+def async_service(args):
+    """
+    A stand-in load generator for a validation service: 4KB generated
+    programs arrive at --rate requests per second for --duration seconds
+    while 0 up to --heavy clients keep uploading 256KB programs. Reports
+    the p50 and p99 latency of the small requests when every request is
+    checked by blocking the event loop and with the AsyncChecker.
+    """
+    generator = Generator(seed=args.seed)
+    small = generator.text(4 << 10).encode('utf-8')
+    large = generator.text(256 << 10).encode('utf-8')
+
+    async def run():
+        async with AsyncChecker() as checker:
+            await checker.check(large)  # starts a worker
+            heavy = 0
+            while heavy <= args.heavy:
+                for name, check in (('blocking', blocking_check), ('AsyncChecker', checker.check)):
+                    latencies = await load(check, small, large, args.rate, args.duration, heavy)
+                    p50 = latencies[len(latencies) // 2]
+                    p99 = latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)]
+                    print(f'{name : <14}{heavy : >3} large uploads  p50 {p50 * 1000:9.3f} ms  '
+                          f'p99 {p99 * 1000:9.3f} ms')
+                heavy = heavy * 2 or 1
+
+    asyncio.run(run())
+    return 0
+
+
+def fast_parser(args):
+    """
+    Parses a generated program of --size bytes with the Parser and the
+    FastParser (best of --repeat runs each) and checks that both give the
+    same tree.
+
+    'parse only' runs on tokens scanned beforehand, with the garbage
+    collector paused, so it times the parsers themselves: otherwise the
+    collections set off by the new nodes scan the million saved tokens
+    too, and take a varying share of the time. 'from text' includes
+    scanning (the FastParser uses tokenize_all()) and runs with the
+    garbage collector on, like main.py.
+    """
+    text = Generator(args.depth, args.complexity, args.seed).text(args.size)
+    scanner = Scanner(text)
+    tokens = [scanner.next()]
+    while tokens[-1].type_ != 'EOF':
+        tokens.append(scanner.next())
+    buffer = tokenize_all(text)
+    assert Parser(TokenList(tokens)).program() == FastParser(buffer).program()
+
+    def parse_only(parse):
+        def stage():
+            with paused_gc():
+                parse()
+        return stage
+
+    stages = (
+        ('Parser', 'parse only', parse_only(lambda: Parser(TokenList(tokens)).program())),
+        ('FastParser', 'parse only', parse_only(lambda: FastParser(buffer).program())),
+        ('Parser', 'from text', lambda: Parser(Lexer(text)).program()),
+        ('FastParser', 'from text', lambda: FastParser(text).program()),
+    )
+    times = {}
+    for name, source, stage in stages:
+        seconds, _ = measure(stage, args.repeat, False)
+        base = times.setdefault(source, seconds)
+        print(f'{name : <12}{source : <13}{len(tokens) / seconds:12,.0f} tokens/sec '
+              f'({base / seconds:.1f}x Parser)')
+
+
+def parallel_parse(args):
+    """
+    Parses a generated program of --size bytes with the FastParser and
+    with the ParallelParser for 1, 2, 4, ... up to --jobs workers
+    (default: CPU count), and checks that the trees are the same. With
+    one job the ParallelParser parses sequentially but with the garbage
+    collector paused, so it is the baseline for the speedups.
+    """
+    text = Generator(args.depth, args.complexity, args.seed).text(args.size)
+    start_time = time.perf_counter()
+    expected = FastParser(text).program()
+    print(f'{"FastParser" : <20}{time.perf_counter() - start_time:10.3f} seconds')
+    jobs = 1
+    base = None
+    while True:
+        parser = ParallelParser(text, jobs, min_bytes=0)
+        start_time = time.perf_counter()
+        tree = parser.program()
+        seconds = time.perf_counter() - start_time
+        assert tree == expected and parser.parallel == (jobs > 1)
+        base = base or seconds
+        print(f'{f"ParallelParser x{jobs}" : <20}{seconds:10.3f} seconds ({base / seconds:.1f}x)')
+        if jobs >= (args.jobs or os.cpu_count() or 1):
+            break
+        jobs = min(2 * jobs, args.jobs or os.cpu_count() or 1)
+    return 0
+
+
+SIZE_UNITS = {'KB': 1 << 10, 'MB': 1 << 20, 'GB': 1 << 30}
+
+
+def export(args):
+    """
+    Writes the tokens and the tree of a generated program of --size
+    bytes in both export formats and loads them back, next to the
+    outputs of main.py (the token table and the printed tree) and to
+    scanning and parsing again.
+    """
+    text = Generator(args.depth, args.complexity, args.seed).text(args.size)
+
+    def clock(label, function, size=len):
+        start_time = time.perf_counter()
+        value = function()
+        seconds = time.perf_counter() - start_time
+        print(f'{label : <20}{seconds:10.3f} seconds' + ('' if size is None else f' ({size(value):,} bytes)'))
+        return value
+
+    def token_table():
+        output = io.StringIO()
+        scanner = Scanner(text)
+        token = scanner.next()
+        while token.kind() != 'EOF':
+            output.write(f'{token.position() : <24} {token.kind() : <15} {token.value() : <20}\n')
+            token = scanner.next()
+        return output.getvalue()
+
+    def write(function, binary):
+        file = io.BytesIO()
+        function(text, file, binary)
+        return file.getvalue()
+
+    clock('token table', token_table)
+    tokens = clock('scan', lambda: tokenize_all(text), None)
+    tree = clock('parse', lambda: FastParser(tokens).program(), None)
+    clock('str(tree)', lambda: str(tree))
+    for binary in (False, True):
+        label = 'binary' if binary else 'JSON lines'
+        data = clock(f'{label} tokens', lambda: write(export_tokens, binary))
+        loaded, _ = clock('  load', lambda: read_tokens(io.BytesIO(data)), None)
+        assert len(loaded) == len(tokens.kinds)
+        data = clock(f'{label} tree', lambda: write(export_tree, binary))
+        loaded, _ = clock('  load', lambda: read_tree(io.BytesIO(data)), None)
+        assert loaded == tree
+    return 0
+
+
+def byte_size(text):
+    """
+    Reads a size like '1KB', '64MB' or '1GB' (or a plain byte count).
+    """
+    text = text.strip().upper()
+    for unit, factor in SIZE_UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-2]) * factor)
+    return int(text)
+
+
+def lex_file(path):
+    """
+    Lexes a file (read in chunks) and returns the number of tokens.
+    """
+    with open(path) as file:
+        lex = Lexer(file)
+        count = 1
+        while lex.next().type_ != 'EOF':
+            count += 1
+    return count
+
+
+def scan_file(path):
+    """
+    Returns the tokens and illegal characters of a file, for the
+    parser-only stage.
+    """
+    with open(path) as file:
+        scanner = Scanner(file.read())
+    tokens = [scanner.next()]
+    while tokens[-1].type_ != 'EOF':
+        tokens.append(scanner.next())
+    return tokens, scanner.errors
+
+
+def check_program(path):
+    """
+    Lexes, parses and checks a file, like main.py does.
+    """
+    with open(path) as file:
+        tree = Parser(Lexer(file)).program()
+    assert tree is not None and not Checker(tree).errors
+
+
+def measure(stage, repeat, memory):
+    """
+    Returns the best time of 'repeat' runs of stage() and, if 'memory'
+    is set, the peak traced memory of one more run.
+    """
+    seconds = float('inf')
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        stage()
+        seconds = min(seconds, time.perf_counter() - start_time)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        stage()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def suite(args):
+    """
+    Generates a program of --size bytes (see classes/generator.py) and
+    measures the throughput and peak memory of the lexer alone, of the
+    parser alone (on tokens lexed beforehand, for programs up to
+    --parser-limit) and of lexing, parsing and checking together.
+
+    --save-baseline writes the results as JSON; --baseline compares with
+    such a file and fails (exit status 1) when a stage is more than
+    --threshold slower.
+    """
+    generator = Generator(args.depth, args.complexity, args.seed)
+    results = {
+        'size': args.size, 'depth': args.depth, 'complexity': args.complexity, 'seed': args.seed,
+        'python': sys.version.split()[0], 'stages': {},
+    }
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'generated.txt')
+        with open(path, 'w') as file:
+            generator.write(file, args.size)
+        size = os.path.getsize(path)
+        tokens = lex_file(path)
+        print(f'{size:,} bytes, {tokens:,} tokens (depth {args.depth}, complexity {args.complexity}, '
+              f'seed {args.seed})')
+
+        stages = {'lexer': lambda: lex_file(path)}
+        if size <= args.parser_limit:
+            scanned, errors = scan_file(path)
+            stages['parser'] = lambda: Parser(TokenList(scanned, 0, errors)).program()
+        stages['end-to-end'] = lambda: check_program(path)
+        for name, stage in stages.items():
+            seconds, peak = measure(stage, args.repeat, not args.skip_memory)
+            results['stages'][name] = {
+                'seconds': seconds,
+                'mb_per_sec': size / seconds / (1 << 20),
+                'tokens_per_sec': tokens / seconds,
+                'peak_bytes': peak,
+            }
+            memory = '' if peak is None else f', peak {peak / (1 << 20):,.1f} MB'
+            print(f'{name : <12}{seconds:10.6f} seconds {size / seconds / (1 << 20):8.3f} MB/sec '
+                  f'{tokens / seconds:12,.0f} tokens/sec{memory}')
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if any(baseline[key] != results[key] for key in ('size', 'depth', 'complexity', 'seed')):
+        print('warning: the baseline was measured on a different program')
+    status = 0
+    for name, stats in results['stages'].items():
+        if name not in baseline['stages']:
+            continue
+        before = baseline['stages'][name]['mb_per_sec']
+        change = stats['mb_per_sec'] / before - 1
+        regressed = change < -args.threshold
+        print(f'{"REGRESSION" if regressed else "ok" : <12}{name : <12}{change:+8.1%} against the baseline')
+        status |= regressed
+    return int(status)
+
+
+BENCHMARKS = {
+    'async-service': async_service,
+    'bulk-tokenize': bulk_tokenize,
+    'compiled': compiled,
+    'deep-nesting': deep_nesting,
+    'export': export,
+    'fast-parser': fast_parser,
+    'incremental': incremental,
+    'interpret': interpret,
+    'optimize': optimize,
+    'parallel-parse': parallel_parse,
+    'suite': suite,
+    'token-memory': token_memory,
+    'trivia-stress': trivia_stress,
+    'vm': vm,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run lexer and parser benchmarks.')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS))
+    parser.add_argument('--copies', type=int, default=1000,
+                        help='number of times the examples are repeated')
+    parser.add_argument('--iterations', type=int, default=200_000,
+                        help='number of loop iterations in euclid programs')
+    parser.add_argument('--lines', type=int, default=100_000,
+                        help='number of blank lines and of comment lines')
+    parser.add_argument('--nesting', type=int, default=100_000,
+                        help='deep-nesting: nested statements and parentheses')
+    parser.add_argument('--size', type=byte_size, default=1 << 20,
+                        help='suite: size of the generated program (e.g. 1KB, 64MB, 1GB)')
+    parser.add_argument('--depth', type=int, default=3, help='suite: deepest if/while nesting')
+    parser.add_argument('--complexity', type=int, default=4, help='suite: operators per expression')
+    parser.add_argument('--rate', type=float, default=100, help='async-service: small requests per second')
+    parser.add_argument('--duration', type=float, default=2, help='async-service: seconds of load per run')
+    parser.add_argument('--heavy', type=int, default=4, help='async-service: most concurrent large uploads')
+    parser.add_argument('--jobs', type=int, help='parallel-parse: most workers (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=0, help='suite: random seed of the generator')
+    parser.add_argument('--repeat', type=int, default=3, help='suite: runs per stage (the best is kept)')
+    parser.add_argument('--parser-limit', type=byte_size, default=64 << 20,
+                        help='suite: largest program the parser-only stage keeps in memory')
+    parser.add_argument('--skip-memory', action='store_true', help='suite: do not measure peak memory')
+    parser.add_argument('--baseline', help='suite: fail when slower than the results in this file')
+    parser.add_argument('--save-baseline', help='suite: write the results to this file')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='suite: allowed throughput loss against the baseline (0.1 = 10%%)')
+    args = parser.parse_args()
+    return BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
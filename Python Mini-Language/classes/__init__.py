@@ -1,4 +1,8 @@
 from .token import *
 from .error import *
+from .source import *
 from .lexer import *
+from .scanner import *
+from .tokenbuffer import *
+from .nodes import *
 from .symbol import *
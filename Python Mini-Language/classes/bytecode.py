@@ -0,0 +1,327 @@
+# Change this if classes are in different directory
+from classes.nodes import Assign, If, While, BinOp, Literal, Name
+from classes.interpreter import Resolver, format_value, BINARY, DEFAULTS
+from array import array
+import marshal
+import struct
+import sys
+
+######################
+# BYTECODE
+######################
+
+
+"""
+Instructions of the stack machine. Every instruction takes two items
+of the code array: the opcode and its argument (0 when it has none).
+
+The VM keeps the variables and the constants in one list, the frame:
+slots 0 to size - 1 are the variables, the constants follow. Jump
+arguments are indexes in the code array.
+
+LOAD r            push frame[r] (a variable or a constant)
+STORE s           pop the top value into variable s
+ADD r ... NE r    pop the right operand (r = -1) or read it from
+                  frame[r], then replace the left operand on top of the
+                  stack with the result
+NEG / NOT         replace the top value
+JUMP t            go to t
+JUMP_IF_FALSE t   pop a value, go to t if it is false
+JUMP_IF_TRUE t    pop a value, go to t if it is true
+AND t / OR t      'and' / 'or': go to t keeping the top value if it
+                  decides the result (false / true), else pop it
+PRINT             pop a value and print it
+HALT              stop
+"""
+
+OPCODES = ('LOAD', 'STORE', 'ADD', 'SUB', 'MUL', 'DIV', 'LT', 'GT', 'LE', 'GE', 'EQ', 'NE',
+           'NEG', 'NOT', 'JUMP', 'JUMP_IF_FALSE', 'JUMP_IF_TRUE', 'AND', 'OR', 'PRINT', 'HALT')
+(LOAD, STORE, ADD, SUB, MUL, DIV, LT, GT, LE, GE, EQ, NE,
+ NEG, NOT, JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE, AND, OR, PRINT, HALT) = range(len(OPCODES))
+
+OPERATORS = ('+', '-', '*', '/', '<', '>', '<=', '>=', '=', '!=')  # in opcode order, from ADD
+BINARY_OPCODES = {op: ADD + index for index, op in enumerate(OPERATORS)}
+FUNCTIONS = [None] * ADD + [BINARY[op] for op in OPERATORS]  # by opcode
+
+"""
+A compiled program file is HEADER (magic, VERSION, the marshal version,
+number of slots and the byte lengths of the name, the code and the
+constants) followed by the name in UTF-8, the code as little-endian
+32-bit integers and the constants written with marshal.
+
+VERSION must be increased whenever the instruction set or the layout
+changes; files with another version, or constants written with another
+marshal version, are refused.
+"""
+
+MAGIC = b'MLBC'
+VERSION = 2
+HEADER = struct.Struct('<4sHHIIII')
+
+
+class Bytecode:
+    """
+    A compiled program: 'code' is an array of opcodes and arguments,
+    'constants' the literal values and 'size' the number of variable
+    slots the VM needs.
+    """
+
+    def __init__(self, name, code, constants, size):
+        self.name = name
+        self.code = code
+        self.constants = constants
+        self.size = size
+
+    def __eq__(self, other):
+        return isinstance(other, Bytecode) and \
+            (self.name, self.code, self.constants, self.size) == \
+            (other.name, other.code, other.constants, other.size)
+
+    __hash__ = None
+
+    def to_bytes(self):
+        """
+        Returns the program in the compiled file format.
+        """
+        code = array('i', self.code)
+        if sys.byteorder == 'big':
+            code.byteswap()
+        name = self.name.encode('utf-8')
+        code = code.tobytes()
+        constants = marshal.dumps(tuple(self.constants))
+        return HEADER.pack(MAGIC, VERSION, marshal.version, self.size, len(name), len(code), len(constants)) + \
+            name + code + constants
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Reads a program written by to_bytes().
+        """
+        try:
+            magic, version, marshal_version, size, name_length, code_length, constants_length = \
+                HEADER.unpack_from(data)
+        except struct.error:
+            raise Exception('<ERROR! Not a compiled program>')
+        if magic != MAGIC:
+            raise Exception('<ERROR! Not a compiled program>')
+        if version != VERSION:
+            raise Exception(f'<ERROR! Compiled program has version {version}, expected {VERSION}>')
+        if marshal_version != marshal.version:
+            raise Exception(f'<ERROR! Compiled program has marshal version {marshal_version}, '
+                            f'expected {marshal.version}>')
+        start = HEADER.size
+        name = bytes(data[start:start + name_length]).decode('utf-8')
+        start += name_length
+        code = array('i')
+        code.frombytes(data[start:start + code_length])
+        if sys.byteorder == 'big':
+            code.byteswap()
+        start += code_length
+        constants = list(marshal.loads(data[start:start + constants_length]))
+        return cls(name, code, constants, size)
+
+    def save(self, path):
+        with open(path, 'wb') as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            return cls.from_bytes(file.read())
+
+    def disassemble(self):
+        """
+        Returns the instructions as text, one per line.
+        """
+        lines = []
+        for index in range(0, len(self.code), 2):
+            op, argument = self.code[index], self.code[index + 1]
+            text = f'{index : >6} {OPCODES[op] : <14}'
+            if ADD <= op <= NE and argument < 0:
+                pass
+            elif op == LOAD or ADD <= op <= NE:
+                text += self.operand(argument)
+            elif op in (STORE, JUMP, JUMP_IF_FALSE, JUMP_IF_TRUE, AND, OR):
+                text += str(argument)
+            lines.append(text.rstrip())
+        return '\n'.join(lines)
+
+    def operand(self, index):
+        if index < self.size:
+            return str(index)
+        return f'{index} ({format_value(self.constants[index - self.size])})'
+
+
+class BytecodeCompiler:
+    """
+    This class translates a program tree returned by Parser.program()
+    into a Bytecode for the VM. Variables are the slots found by the
+    Resolver.
+    """
+
+    def __init__(self, program):
+        self.program = program
+        self.size = Resolver(program).size
+        self.code = array('i')
+        self.constants = []
+        self.indexes = {}  # (type, value) -> index in constants
+
+    def compile(self):
+        self.body(self.program.body)
+        self.emit(HALT)
+        return Bytecode(self.program.name, self.code, self.constants, self.size)
+
+    def emit(self, op, argument=0):
+        """
+        Appends an instruction and returns its index.
+        """
+        self.code.append(op)
+        self.code.append(argument)
+        return len(self.code) - 2
+
+    def patch(self, index):
+        """
+        Points the jump at 'index' to the next instruction.
+        """
+        self.code[index + 1] = len(self.code)
+
+    def constant(self, value):
+        """
+        Returns the frame index of a constant.
+        """
+        key = (type(value), value)  # True and 1 are different constants
+        index = self.indexes.get(key)
+        if index is None:
+            index = self.indexes[key] = self.size + len(self.constants)
+            self.constants.append(value)
+        return index
+
+    def operand(self, node):
+        """
+        Returns the frame index of a variable or a constant, or -1 for
+        other expressions (their value is left on the stack).
+        """
+        kind = type(node)
+        if kind is Name:
+            return node.slot
+        if kind is Literal:
+            return self.constant(node.value)
+        self.expr(node)
+        return -1
+
+    def body(self, body):
+        for declaration in body.declarations:
+            self.emit(LOAD, self.constant(DEFAULTS[declaration.type_]))
+            self.emit(STORE, declaration.slot)
+        for statement in body.statements:
+            self.statement(statement)
+
+    def statement(self, node):
+        kind = type(node)
+        if kind is Assign:
+            self.expr(node.value)
+            self.emit(STORE, node.target.slot)
+        elif kind is If:
+            self.expr(node.condition)
+            jump = self.emit(JUMP_IF_FALSE)
+            self.body(node.then_body)
+            if node.else_body is not None:
+                end = self.emit(JUMP)
+                self.patch(jump)
+                self.body(node.else_body)
+                self.patch(end)
+            else:
+                self.patch(jump)
+        elif kind is While:
+            # The condition is tested at the bottom: one jump per iteration.
+            jump = self.emit(JUMP)
+            start = len(self.code)
+            self.body(node.body)
+            self.patch(jump)
+            self.expr(node.condition)
+            self.emit(JUMP_IF_TRUE, start)
+        else:
+            self.expr(node.value)
+            self.emit(PRINT)
+
+    def expr(self, node):
+        kind = type(node)
+        if kind is Name:
+            self.emit(LOAD, node.slot)
+        elif kind is Literal:
+            self.emit(LOAD, self.constant(node.value))
+        elif kind is BinOp:
+            self.expr(node.left)
+            if node.op == 'and' or node.op == 'or':
+                jump = self.emit(AND if node.op == 'and' else OR)
+                self.expr(node.right)
+                self.patch(jump)
+            else:
+                self.emit(BINARY_OPCODES[node.op], self.operand(node.right))
+        else:
+            self.expr(node.operand)
+            self.emit(NEG if node.op == '-' else NOT)
+
+
+class VM:
+    """
+    This class runs a Bytecode. Printed values are passed to 'output'
+    (print by default).
+    """
+
+    def __init__(self, bytecode, output=print):
+        self.bytecode = bytecode
+        self.output = output
+
+    def run(self):
+        """
+        Executes the program with a fresh set of variables.
+        """
+        bytecode = self.bytecode
+        code = bytecode.code.tolist()  # list items are already int objects
+        frame = [0] * bytecode.size + bytecode.constants
+        functions = FUNCTIONS
+        output = self.output
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        pc = 0
+        while True:
+            op = code[pc]
+            argument = code[pc + 1]
+            pc += 2
+            # Most frequent instructions first.
+            if op == LOAD:
+                push(frame[argument])
+            elif op <= NE:
+                if op == STORE:
+                    frame[argument] = pop()
+                else:
+                    right = pop() if argument < 0 else frame[argument]
+                    stack[-1] = functions[op](stack[-1], right)
+            elif op == JUMP_IF_TRUE:
+                if pop():
+                    pc = argument
+            elif op == JUMP_IF_FALSE:
+                if not pop():
+                    pc = argument
+            elif op == JUMP:
+                pc = argument
+            elif op == AND:
+                if stack[-1]:
+                    pop()
+                else:
+                    pc = argument
+            elif op == OR:
+                if stack[-1]:
+                    pc = argument
+                else:
+                    pop()
+            elif op == NEG:
+                stack[-1] = -stack[-1]
+            elif op == NOT:
+                stack[-1] = not stack[-1]
+            elif op == PRINT:
+                output(format_value(pop()))
+            else:
+                break
@@ -0,0 +1,225 @@
+# Change this if classes are in different directory
+from classes.token import Token, InternTable, KINDS, KIND_CODES
+from classes.scanner import Scanner
+from classes.parser import Parser
+from classes.incremental import TokenList
+from classes.nodes import Program, Body, Declaration, Assign, If, While, Print, BinOp, UnaryOp, Literal, Name
+from classes.error import IllegalCharacterError, IllegalSyntaxError, SemanticError
+import hashlib
+import marshal
+import os
+
+######################
+# PARSE CACHE
+######################
+
+
+"""
+VERSION must be increased whenever the grammar, the parser output or
+the node classes change, so entries written by an older parser are
+never read back. The token kinds and the marshal format are part of
+the stamp too.
+"""
+
+VERSION = 2
+STAMP = f'{VERSION}:{marshal.version}:{" ".join(KINDS)}'.encode('utf-8')
+
+MAX_BYTES = 64 << 20  # default size cap of a cache directory
+
+NODES = (Program, Body, Declaration, Assign, If, While, Print, BinOp, UnaryOp, Literal, Name)
+NODE_CODES = {node: code for code, node in enumerate(NODES)}
+ERRORS = (IllegalCharacterError, IllegalSyntaxError, SemanticError)
+ERROR_CODES = {error: code for code, error in enumerate(ERRORS)}
+
+
+def encode_node(value):
+    """
+    Returns a node as nested tuples (class code, line, position, fields...)
+    that marshal can write. Lists stay lists; names and values are kept.
+    """
+    if isinstance(value, list):
+        return [encode_node(item) for item in value]
+    if type(value) in NODE_CODES:
+        return (NODE_CODES[type(value)], value.line, value.position_,
+                *[encode_node(getattr(value, field)) for field in value.fields])
+    return value
+
+
+def decode_node(value, names):
+    """
+    Rebuilds the node written by encode_node(). Names are interned in
+    'names' again to set the 'ident' of Name and Declaration nodes.
+    """
+    if isinstance(value, list):
+        return [decode_node(item, names) for item in value]
+    if isinstance(value, tuple):
+        code, line, position, *fields = value
+        node = NODES[code](line, position, *[decode_node(field, names) for field in fields])
+        if NODES[code] is Name or NODES[code] is Declaration:
+            node.ident = names.intern(node.name)
+            node.name = names.names[node.ident]
+        return node
+    return value
+
+
+class ParseCache:
+    """
+    This class keeps the result of lexing and parsing a source text in a
+    directory, one file per source, so parsing an unchanged text again
+    is a hash and a file read.
+
+    An entry is named after the SHA-256 of STAMP and the source. It holds
+    the token stream (as columns), the tree and the diagnostics written
+    with marshal. When the files take more than 'max_bytes', the least
+    recently used ones are deleted; reading an entry updates its
+    modification time, so the order survives between runs.
+
+    'hits', 'misses' and 'evictions' count what happened since the
+    cache was opened.
+    """
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        entries = []
+        with os.scandir(directory) as scan:
+            for entry in scan:
+                if entry.name.endswith('.bin'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, entry.name, stat.st_size))
+        entries.sort()
+        self.entries = {name: size for _, name, size in entries}  # least recently used first
+        self.size = sum(self.entries.values())
+
+    @staticmethod
+    def key(text):
+        return hashlib.sha256(STAMP + text.encode('utf-8')).hexdigest() + '.bin'
+
+    def parse(self, text):
+        """
+        Returns (tokens, tree, diagnostics) for a source text, like
+        lexing all of it and calling Parser.program() would give. The
+        tree is None when there are diagnostics.
+        """
+        name = self.key(text)
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, 'rb') as file:
+                record = marshal.load(file)
+        except (OSError, EOFError, ValueError, TypeError):
+            record = None
+        if record is not None:
+            self.hits += 1
+            self.touch(name, path)
+            return self.decode(record)
+
+        self.misses += 1
+        scanner = Scanner(text)
+        tokens = [scanner.next()]
+        while tokens[-1].kind() != 'EOF':
+            tokens.append(scanner.next())
+        parser = Parser(TokenList(tokens, 0, scanner.errors))
+        tree = parser.program()
+        self.store(name, path, self.encode(tokens, tree, parser.diagnostics))
+        return tokens, tree, parser.diagnostics
+
+    @staticmethod
+    def encode(tokens, tree, diagnostics):
+        kinds = bytes(KIND_CODES[token.type_] for token in tokens)
+        return (kinds,
+                tuple(token.line for token in tokens),
+                tuple(token.position_ for token in tokens),
+                tuple(token.value_ for token in tokens),
+                None if tree is None else encode_node(tree),
+                tuple((ERROR_CODES[type(error)], error.details, error.line, error.position_)
+                      for error in diagnostics))
+
+    @staticmethod
+    def decode(record):
+        kinds, lines, positions, values, tree, diagnostics = record
+        names = InternTable()
+        tokens = [Token(KINDS[kind], line, position, value)
+                  for kind, line, position, value in zip(kinds, lines, positions, values)]
+        for token in tokens:
+            if token.type_ == 'ID':
+                token.ident = names.intern(token.value_)
+                token.value_ = names.names[token.ident]
+        tree = None if tree is None else decode_node(tree, names)
+        diagnostics = [ERRORS[code](details, line, position) for code, details, line, position in diagnostics]
+        return tokens, tree, diagnostics
+
+    def touch(self, name, path):
+        """
+        Marks an entry as the most recently used one.
+        """
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        size = self.entries.pop(name, None)
+        if size is not None:
+            self.entries[name] = size
+
+    def store(self, name, path, record):
+        """
+        Writes an entry (through a temporary file, so a reader never sees
+        half of it) and evicts old entries above the size cap. Trees too
+        deep for marshal are not cached.
+        """
+        try:
+            data = marshal.dumps(record)
+        except ValueError:
+            return
+        temporary = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(temporary, 'wb') as file:
+                file.write(data)
+            os.replace(temporary, path)
+        except OSError:
+            return
+        self.size += len(data) - self.entries.pop(name, 0)
+        self.entries[name] = len(data)
+        self.trim()
+
+    def trim(self):
+        """
+        Deletes the least recently used entries until the cache fits in
+        'max_bytes'.
+        """
+        while self.size > self.max_bytes and self.entries:
+            name = next(iter(self.entries))
+            self.size -= self.entries.pop(name)
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Returns the counters and the current size as a dict.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'bytes': self.size,
+        }
+
+
+OPEN = {}  # (directory, max_bytes) -> ParseCache, one per process
+
+
+def open_cache(directory, max_bytes=MAX_BYTES):
+    """
+    Returns the ParseCache of a directory, opening it once per process.
+    """
+    cache = OPEN.get((directory, max_bytes))
+    if cache is None:
+        cache = OPEN[directory, max_bytes] = ParseCache(directory, max_bytes)
+    return cache
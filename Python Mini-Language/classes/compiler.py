@@ -0,0 +1,140 @@
+# Change this if classes are in different directory
+from classes.lexer import Lexer
+from classes.parser import Parser
+from classes.nodes import Assign, If, While, BinOp, Literal, Name
+from classes.interpreter import Resolver, divide, format_value, DEFAULTS
+import ast
+import hashlib
+
+######################
+# COMPILER
+######################
+
+
+"""
+Python operators used for the mini-language operators. '/' is not in
+the table because it is compiled to a call to interpreter.divide(),
+which rounds toward zero like the Interpreter does.
+"""
+
+BINARY = {'+': ast.Add, '-': ast.Sub, '*': ast.Mult}
+COMPARE = {'<': ast.Lt, '>': ast.Gt, '<=': ast.LtE, '>=': ast.GtE, '=': ast.Eq, '!=': ast.NotEq}
+BOOLEAN = {'and': ast.And, 'or': ast.Or}
+
+
+class Compiler:
+    """
+    This class translates a program tree returned by Parser.program()
+    into a Python code object with the 'ast' module and compile().
+
+    The code object defines one function, run(_output), in which every
+    variable slot found by the Resolver is a local variable (v0, v1, ...),
+    so a mini-language loop runs as a plain Python loop.
+    """
+
+    def __init__(self, program):
+        self.program = program
+        Resolver(program)
+
+    def compile(self):
+        """
+        Returns the code object of a module that defines run().
+        """
+        arguments = ast.arguments(
+            posonlyargs=[], args=[ast.arg('_output'), ast.arg('_divide'), ast.arg('_format')],
+            kwonlyargs=[], kw_defaults=[],
+            defaults=[ast.Name('_divide', ast.Load()), ast.Name('_format', ast.Load())])
+        function = ast.FunctionDef(name='run', args=arguments, body=self.body(self.program.body),
+                                   decorator_list=[], returns=None, type_comment=None)
+        module = ast.fix_missing_locations(ast.Module(body=[function], type_ignores=[]))
+        return compile(module, f'<program {self.program.name}>', 'exec')
+
+    def body(self, body):
+        """
+        Returns the Python statements for a Body: the declared variables
+        are reset to their default value, then the statements follow.
+        """
+        statements = [ast.Assign([self.variable(declaration.slot, ast.Store())],
+                                 ast.Constant(DEFAULTS[declaration.type_]),
+                                 lineno=declaration.line, end_lineno=declaration.line)
+                      for declaration in body.declarations]
+        statements += [self.statement(statement) for statement in body.statements]
+        return statements or [ast.Pass()]
+
+    def statement(self, node):
+        """
+        Returns the Python statement for a mini-language statement.
+        """
+        kind = type(node)
+        if kind is Assign:
+            result = ast.Assign([self.variable(node.target.slot, ast.Store())], self.expr(node.value))
+        elif kind is If:
+            orelse = [] if node.else_body is None else self.body(node.else_body)
+            result = ast.If(self.expr(node.condition), self.body(node.then_body), orelse)
+        elif kind is While:
+            result = ast.While(self.expr(node.condition), self.body(node.body), [])
+        else:
+            text = ast.Call(ast.Name('_format', ast.Load()), [self.expr(node.value)], [])
+            result = ast.Expr(ast.Call(ast.Name('_output', ast.Load()), [text], []))
+        result.lineno = result.end_lineno = node.line
+        return result
+
+    def expr(self, node):
+        """
+        Returns the Python expression for a mini-language expression.
+        """
+        kind = type(node)
+        if kind is Name:
+            return self.variable(node.slot, ast.Load())
+        if kind is Literal:
+            return ast.Constant(node.value)
+        if kind is BinOp:
+            op = node.op
+            left = self.expr(node.left)
+            right = self.expr(node.right)
+            if op in BINARY:
+                return ast.BinOp(left, BINARY[op](), right)
+            if op in COMPARE:
+                return ast.Compare(left, [COMPARE[op]()], [right])
+            if op in BOOLEAN:
+                return ast.BoolOp(BOOLEAN[op](), [left, right])
+            return ast.Call(ast.Name('_divide', ast.Load()), [left, right], [])
+        operand = self.expr(node.operand)
+        return ast.UnaryOp(ast.USub() if node.op == '-' else ast.Not(), operand)
+
+    @staticmethod
+    def variable(slot, context):
+        return ast.Name(f'v{slot}', context)
+
+
+def load(code):
+    """
+    Executes a code object returned by Compiler.compile() and returns
+    its run(output=print) function.
+    """
+    namespace = {'_divide': divide, '_format': format_value}
+    exec(code, namespace)
+    run = namespace['run']
+    return lambda output=print: run(output)
+
+
+CACHE = {}  # source hash -> code object
+
+
+def compile_source(text, cache=CACHE):
+    """
+    Parses and compiles a program and returns its run(output=print)
+    function, or None if the program is not accepted by the parser.
+
+    Code objects are kept in 'cache' under the SHA-256 of the source,
+    so compiling the same source again skips the lexer, the parser and
+    compile().
+    """
+    key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    code = cache.get(key)
+    if code is None:
+        tree = Parser(Lexer(text)).program()
+        if tree is None:
+            return None
+        code = cache[key] = Compiler(tree).compile()
+    return load(code)
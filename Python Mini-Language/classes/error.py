@@ -7,24 +7,34 @@
 These classes are used for error handling.
 Combined classes in one file to add more errors
 later on.
+
+Errors are collected in lists (diagnostics) instead of being raised,
+so line and position are kept for sorting and reporting.
 """
 
 
 class Error:
-    def __init__(self, error_name, details):
+    def __init__(self, error_name, details, line=None, position=None):
         self.error_name = error_name
         self.details = details
+        self.line = line
+        self.position_ = position
 
     def __str__(self):
         return f'{self.error_name}: {self.details}'
 
 
 class IllegalCharacterError(Error):
-    def __init__(self, details):
-        super().__init__('Illegal Character Found', details)
+    def __init__(self, details, line=None, position=None):
+        super().__init__('Illegal Character Found', details, line, position)
 
 
 class IllegalSyntaxError(Error):
-    def __init__(self, details):
-        super().__init__('Syntax Error', details)
+    def __init__(self, details, line=None, position=None):
+        super().__init__('Syntax Error', details, line, position)
+
+
+class SemanticError(Error):
+    def __init__(self, details, line=None, position=None):
+        super().__init__('Semantic Error', details, line, position)
 
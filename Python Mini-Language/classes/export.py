@@ -0,0 +1,674 @@
+# Change this if classes are in different directory
+from classes.token import Token, InternTable, KINDS, KIND_CODES
+from classes.scanner import Scanner
+from classes.fastparser import FastParser
+from classes.parallel import paused_gc
+from classes.nodes import Program, Body, Declaration, Assign, If, While, Print, BinOp, UnaryOp, Literal, Name
+from classes.error import IllegalCharacterError, IllegalSyntaxError, SemanticError
+from array import array
+import itertools
+import json
+import struct
+import sys
+
+######################
+# TOKEN AND TREE EXPORT
+######################
+
+
+"""
+Token streams and trees are written as a sequence of records, each a
+code, a line, a position and one value, in one of two formats. The
+loaders rebuild Token objects and nodes from them without lexing or
+parsing again, and both formats can be written and read one record at
+a time, so neither side needs the whole stream in memory.
+
+A token stream is the tokens up to and including 'EOF', then the
+illegal characters. A tree is its nodes in postfix order (the children
+of a node come before it; None stands for a part the parser could not
+build), then the diagnostics. A tree with diagnostics loads as None,
+like Parser.program() returns it.
+
+JSON lines, one object per record:
+
+    {"kind": "ID", "line": 1, "position": 8, "value": "p"}
+    {"node": "BinOp", "line": 2, "position": 6, "op": "+"}
+    {"error": "Syntax Error", "details": "...", "line": 2, "position": 5}
+
+Tokens only have a "value" when it is not their kind (ID and NUM).
+Node fields: Name "name", Literal "value", BinOp and UnaryOp "op", If
+"else" (true when it has an else body), Declaration "type" and "name",
+Body "declarations" and "statements" (how many of the preceding nodes
+are its children), Program "name"; a missing part is {"node": null}.
+
+Binary: HEADER (MAGIC, VERSION and TOKENS or TREE), then blocks of up
+to BLOCK_RECORDS records, each BLOCK (record count and the byte
+lengths of its strings and numbers) followed by the columns: codes
+(bytes), lines and positions (32-bit), values (64-bit), all
+little-endian, then the strings and the numbers. A block of 0 records
+ends the stream.
+
+Codes are token kind codes (see token.KINDS) or indexes in NODES, and
+ERROR_BASE + the index in ERRORS for diagnostics. Strings (names,
+operators, types and error details) are numbered in the order they
+first appear in the stream; each block lists the new ones, each as
+its byte length (STRING_LENGTH) followed by its UTF-8 bytes. Numbers are the NUM and Literal values of the block, written
+in decimal (or true / false) and separated by spaces; the value of
+such a record is its index in the block's numbers. The other values
+are a string number, a Declaration's type << 32 | name, a Body's
+declarations << 32 | statements and an If's 1 for an else body.
+
+VERSION must be increased whenever the token kinds, the node classes or
+the layout change; files with another version are refused.
+"""
+
+MAGIC = b'MLEX'
+VERSION = 2
+TOKENS, TREE = range(2)
+HEADER = struct.Struct('<4sHB')
+BLOCK = struct.Struct('<III')
+STRING_LENGTH = struct.Struct('<I')
+BLOCK_RECORDS = 1 << 14
+RECORD_BYTES = 1 + 4 + 4 + 8  # code, line, position, value
+
+NODES = (Program, Body, Declaration, Assign, If, While, Print, BinOp, UnaryOp, Literal, Name, type(None))
+NODE_CODES = {node: code for code, node in enumerate(NODES)}
+NODE_NAMES = {node.__name__: code for code, node in enumerate(NODES[:-1])}
+(PROGRAM, BODY, DECLARATION, ASSIGN, IF, WHILE, PRINT, BINARY, UNARY, LITERAL, NAME, NONE) = range(len(NODES))
+ERRORS = (IllegalCharacterError, IllegalSyntaxError, SemanticError)
+ERROR_CODES = {error: code for code, error in enumerate(ERRORS)}
+ERROR_NAMES = {error(None).error_name: code for code, error in enumerate(ERRORS)}
+ERROR_BASE = 128
+SHIFT = 1 << 32
+
+ID = KIND_CODES['ID']
+NUM = KIND_CODES['NUM']
+
+
+def number_text(value):
+    if value is True or value is False:
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def text_number(text):
+    if text == 'true' or text == 'false':
+        return text == 'true'
+    return int(text, 10)
+
+
+class Writer:
+    """
+    The part of the writers shared by both formats: turns Tokens, nodes
+    and errors into records for record(code, line, position, value),
+    which the subclasses encode. Use it as a context manager, or call
+    close() to end the stream (the file itself is not closed).
+    """
+
+    def __init__(self, file, content):
+        self.file = file
+        self.content = content
+
+    def token(self, token):
+        kind = KIND_CODES[token.type_]
+        self.record(kind, token.line, token.position_, token.value_ if kind == ID or kind == NUM else None)
+
+    def tokens(self, tokens):
+        for token in tokens:
+            self.token(token)
+
+    def error(self, error):
+        self.record(ERROR_BASE + ERROR_CODES[type(error)], error.line, error.position_, error.details)
+
+    def errors(self, errors):
+        for error in errors:
+            self.error(error)
+
+    def node(self, node):
+        """
+        Writes a node and its children in postfix order.
+        """
+        kind = type(node)
+        if kind is Name:
+            self.record(NAME, node.line, node.position_, node.name)
+        elif kind is Literal:
+            self.record(LITERAL, node.line, node.position_, node.value)
+        elif kind is BinOp:
+            self.node(node.left)
+            self.node(node.right)
+            self.record(BINARY, node.line, node.position_, node.op)
+        elif kind is UnaryOp:
+            self.node(node.operand)
+            self.record(UNARY, node.line, node.position_, node.op)
+        elif kind is Assign:
+            self.node(node.target)
+            self.node(node.value)
+            self.record(ASSIGN, node.line, node.position_, None)
+        elif kind is Print:
+            self.node(node.value)
+            self.record(PRINT, node.line, node.position_, None)
+        elif kind is While:
+            self.node(node.condition)
+            self.node(node.body)
+            self.record(WHILE, node.line, node.position_, None)
+        elif kind is If:
+            self.node(node.condition)
+            self.node(node.then_body)
+            if node.else_body is not None:
+                self.node(node.else_body)
+            self.record(IF, node.line, node.position_, node.else_body is not None)
+        elif kind is Declaration:
+            # A declaration with a syntax error may have a number as its name.
+            self.record(DECLARATION, node.line, node.position_, (node.type_, str(node.name)))
+        elif kind is Body:
+            for declaration in node.declarations:
+                self.node(declaration)
+            for statement in node.statements:
+                self.node(statement)
+            self.record(BODY, node.line, node.position_, (len(node.declarations), len(node.statements)))
+        elif kind is Program:
+            self.node(node.body)
+            self.record(PROGRAM, node.line, node.position_, node.name)
+        else:
+            self.record(NONE, 0, 0, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonLinesWriter(Writer):
+    """
+    Writes records as JSON lines to a binary file. Lines are collected
+    and written BLOCK_RECORDS at a time.
+    """
+
+    def __init__(self, file, content):
+        super().__init__(file, content)
+        self.lines = []
+        self.strings = {}  # value -> its JSON text
+
+    def string(self, value):
+        text = self.strings.get(value)
+        if text is None:
+            text = self.strings[value] = json.dumps(value, ensure_ascii=False)
+        return text
+
+    def record(self, code, line, position, value):
+        if code >= ERROR_BASE:
+            error = ERRORS[code - ERROR_BASE]
+            self.lines.append(f'{{"error": {self.string(error(None).error_name)}, '
+                              f'"details": {json.dumps(value, ensure_ascii=False)}, '
+                              f'"line": {json.dumps(line)}, "position": {json.dumps(position)}}}\n')
+            self.flush_full()
+            return
+        elif self.content == TOKENS:
+            text = f'{{"kind": {self.string(KINDS[code])}, '
+            if code == ID:
+                text += f'"value": {self.string(value)}, '
+            elif code == NUM:
+                text += f'"value": {value}, '
+        elif code == NONE:
+            self.lines.append('{"node": null}\n')
+            self.flush_full()
+            return
+        else:
+            text = f'{{"node": "{NODES[code].__name__}", '
+            if code == NAME or code == PROGRAM:
+                text += f'"name": {self.string(value)}, '
+            elif code == LITERAL:
+                text += f'"value": {json.dumps(value)}, '
+            elif code == BINARY or code == UNARY:
+                text += f'"op": {self.string(value)}, '
+            elif code == IF:
+                text += f'"else": {json.dumps(value)}, '
+            elif code == DECLARATION:
+                text += f'"type": {self.string(value[0])}, "name": {self.string(value[1])}, '
+            elif code == BODY:
+                text += f'"declarations": {value[0]}, "statements": {value[1]}, '
+        self.lines.append(f'{text}"line": {line}, "position": {position}}}\n')
+        self.flush_full()
+
+    def flush_full(self):
+        if len(self.lines) >= BLOCK_RECORDS:
+            self.flush()
+
+    def flush(self):
+        self.file.write(''.join(self.lines).encode('utf-8'))
+        self.lines = []
+
+    def close(self):
+        self.flush()
+
+
+class BinaryWriter(Writer):
+    """
+    Writes records in the binary format, BLOCK_RECORDS at a time.
+    """
+
+    def __init__(self, file, content):
+        super().__init__(file, content)
+        self.file.write(HEADER.pack(MAGIC, VERSION, content))
+        self.strings = {}  # string -> its number
+        self.new_strings = []
+        self.numbers = []
+        self.codes = array('B')
+        self.lines = array('I')
+        self.positions = array('I')
+        self.values = array('Q')
+
+    def string(self, value):
+        number = self.strings.get(value)
+        if number is None:
+            number = self.strings[value] = len(self.strings)
+            self.new_strings.append(value)
+        return number
+
+    def number(self, value):
+        self.numbers.append(number_text(value))
+        return len(self.numbers) - 1
+
+    def record(self, code, line, position, value):
+        if code >= ERROR_BASE:
+            value = self.string(value)
+        elif self.content == TOKENS:
+            if code == ID:
+                value = self.string(value)
+            elif code == NUM:
+                value = self.number(value)
+            else:
+                value = 0
+        elif code == NAME or code == PROGRAM or code == BINARY or code == UNARY:
+            value = self.string(value)
+        elif code == LITERAL:
+            value = self.number(value)
+        elif code == DECLARATION:
+            value = self.string(value[0]) * SHIFT + self.string(value[1])
+        elif code == BODY:
+            value = value[0] * SHIFT + value[1]
+        else:
+            value = 1 if value else 0
+        self.codes.append(code)
+        self.lines.append(line)
+        self.positions.append(position)
+        self.values.append(value)
+        if len(self.codes) >= BLOCK_RECORDS:
+            self.flush()
+
+    def flush(self):
+        if not self.codes:
+            return
+        columns = [self.codes, self.lines, self.positions, self.values]
+        if sys.byteorder == 'big':
+            for column in columns:
+                column.byteswap()
+        strings = []
+        for string in self.new_strings:
+            string = string.encode('utf-8')
+            strings.append(STRING_LENGTH.pack(len(string)))
+            strings.append(string)
+        strings = b''.join(strings)
+        numbers = ' '.join(self.numbers).encode('ascii')
+        self.file.write(BLOCK.pack(len(self.codes), len(strings), len(numbers)) +
+                        b''.join(column.tobytes() for column in columns) + strings + numbers)
+        self.new_strings = []
+        self.numbers = []
+        self.codes = array('B')
+        self.lines = array('I')
+        self.positions = array('I')
+        self.values = array('Q')
+
+    def close(self):
+        self.flush()
+        self.file.write(BLOCK.pack(0, 0, 0))
+
+
+def writer(file, content, binary=False):
+    """
+    Returns a writer for TOKENS or a TREE in the JSON lines or the binary
+    format. 'file' must be opened in binary mode.
+    """
+    return (BinaryWriter if binary else JsonLinesWriter)(file, content)
+
+
+def read_blocks(file):
+    """
+    Yields the records of a stream written by either writer in blocks:
+    (content, codes, lines, positions, values), with the values as the
+    writers took them. 'file' must be opened in binary mode.
+    """
+    head = file.read(HEADER.size)
+    if head[:len(MAGIC)] == MAGIC:
+        return read_binary(file, head)
+    return read_json_lines(file, head)
+
+
+def read_records(file):
+    """
+    Yields the records of a stream one at a time, as (content, code,
+    line, position, value).
+    """
+    for content, *columns in read_blocks(file):
+        for code, line, position, value in zip(*columns):
+            yield content, code, line, position, value
+
+
+def read_binary(file, head):
+    try:
+        magic, version, content = HEADER.unpack(head)
+    except struct.error:
+        raise Exception('<ERROR! Not an exported token stream or tree>')
+    if version != VERSION:
+        raise Exception(f'<ERROR! Export has version {version}, expected {VERSION}>')
+    strings = []
+    while True:
+        data = file.read(BLOCK.size)
+        if len(data) != BLOCK.size:
+            raise Exception('<ERROR! Export ends before its last block>')
+        count, strings_length, numbers_length = BLOCK.unpack(data)
+        if not count:
+            return
+        size = count * RECORD_BYTES + strings_length + numbers_length
+        data = file.read(size)
+        if len(data) != size:
+            raise Exception('<ERROR! Export ends before its last block>')
+        columns = [array('B'), array('I'), array('I'), array('Q')]
+        start = 0
+        for column in columns:
+            end = start + count * column.itemsize
+            column.frombytes(data[start:end])
+            if sys.byteorder == 'big':
+                column.byteswap()
+            start = end
+        end = start + strings_length
+        while start < end:
+            length, = STRING_LENGTH.unpack_from(data, start)
+            start += STRING_LENGTH.size
+            strings.append(data[start:start + length].decode('utf-8'))
+            start += length
+        if start != end:
+            raise Exception('<ERROR! Export has a damaged string table>')
+        numbers = [text_number(text) for text in data[start:].decode('ascii').split()]
+        codes, lines, positions, values = (column.tolist() for column in columns)
+        for index, code in enumerate(codes):
+            value = values[index]
+            if code >= ERROR_BASE:
+                values[index] = strings[value]
+            elif content == TOKENS:
+                if code == ID:
+                    values[index] = strings[value]
+                elif code == NUM:
+                    values[index] = numbers[value]
+                else:
+                    values[index] = None
+            elif code == NAME or code == PROGRAM or code == BINARY or code == UNARY:
+                values[index] = strings[value]
+            elif code == LITERAL:
+                values[index] = numbers[value]
+            elif code == DECLARATION:
+                values[index] = (strings[value // SHIFT], strings[value % SHIFT])
+            elif code == BODY:
+                values[index] = divmod(value, SHIFT)
+            else:
+                values[index] = value == 1
+        yield content, codes, lines, positions, values
+
+
+def read_json_lines(file, head):
+    content = None
+    block = [], [], [], []
+    codes, lines, positions, values = block
+    loads = json.loads
+    for text in itertools.chain([head + file.readline()], file):
+        if not text.strip():
+            continue
+        record = loads(text)
+        if 'kind' in record:
+            content = TOKENS
+            codes.append(KIND_CODES[record['kind']])
+            values.append(record.get('value'))
+        elif 'node' in record:
+            content = TREE
+            name = record['node']
+            code = NONE if name is None else NODE_NAMES[name]
+            if code == NAME or code == PROGRAM:
+                value = record['name']
+            elif code == LITERAL:
+                value = record['value']
+            elif code == BINARY or code == UNARY:
+                value = record['op']
+            elif code == IF:
+                value = record['else']
+            elif code == DECLARATION:
+                value = (record['type'], record['name'])
+            elif code == BODY:
+                value = (record['declarations'], record['statements'])
+            else:
+                value = None
+            codes.append(code)
+            values.append(value)
+        else:
+            codes.append(ERROR_BASE + ERROR_NAMES[record['error']])
+            values.append(record['details'])
+        lines.append(record.get('line', 0))
+        positions.append(record.get('position', 0))
+        if len(codes) >= BLOCK_RECORDS:
+            yield (content, *block)
+            block = [], [], [], []
+            codes, lines, positions, values = block
+    if codes:
+        yield (content, *block)
+
+
+class TokenReader:
+    """
+    This class reads a token stream written by either writer and yields
+    it as Token objects, with the names of 'ID' tokens interned in
+    'names' like the Scanner does. The illegal characters are in
+    'errors' once the tokens have all been read.
+    """
+
+    def __init__(self, file, names=None):
+        self.file = file
+        self.names = InternTable() if names is None else names
+        self.errors = []
+
+    def __iter__(self):
+        ids = self.names.ids
+        intern = self.names.intern
+        strings = self.names.names
+        kinds = KINDS
+        for content, codes, lines, positions, values in read_blocks(self.file):
+            if content != TOKENS and any(code < ERROR_BASE for code in codes):
+                raise Exception('<ERROR! Export is not a token stream>')
+            for code, line, position, value in zip(codes, lines, positions, values):
+                if code == ID:
+                    ident = ids.get(value)
+                    if ident is None:
+                        ident = intern(value)
+                    yield Token('ID', line, position, strings[ident], ident)
+                elif code < ERROR_BASE:
+                    kind = kinds[code]
+                    yield Token(kind, line, position, kind if value is None else value)
+                else:
+                    self.errors.append(ERRORS[code - ERROR_BASE](value, line, position))
+
+
+def read_tokens(file, names=None):
+    """
+    Returns (tokens, errors) of a token stream written by either writer.
+    """
+    reader = TokenReader(file, names)
+    with paused_gc():
+        return list(reader), reader.errors
+
+
+def read_tree(file, names=None):
+    """
+    Returns (tree, diagnostics) of a tree written by either writer; the
+    tree is None if there are diagnostics. Names are interned in 'names'
+    to set the 'ident' of Name and Declaration nodes.
+    """
+    with paused_gc():
+        return build_tree(read_blocks(file), InternTable() if names is None else names)
+
+
+def build_tree(blocks, names):
+    """
+    The part of read_tree() that rebuilds the nodes, one block at a time.
+    """
+    ids = names.ids
+    intern = names.intern
+    strings = names.names
+    new = object.__new__
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    diagnostics = []
+    for content, codes, lines, positions, values in blocks:
+        if content != TREE and any(code < ERROR_BASE for code in codes):
+            raise Exception('<ERROR! Export is not a tree>')
+        for code, line, position, value in zip(codes, lines, positions, values):
+            if code == NAME:
+                node = new(Name)
+                ident = ids.get(value)
+                if ident is None:
+                    ident = intern(value)
+                node.name = strings[ident]
+                node.ident = ident
+            elif code == LITERAL:
+                node = new(Literal)
+                node.value = value
+            elif code == BINARY:
+                node = new(BinOp)
+                node.op = value
+                node.right = pop()
+                node.left = pop()
+            elif code == UNARY:
+                node = new(UnaryOp)
+                node.op = value
+                node.operand = pop()
+            elif code == ASSIGN:
+                node = new(Assign)
+                node.value = pop()
+                node.target = pop()
+            elif code == PRINT:
+                node = new(Print)
+                node.value = pop()
+            elif code == WHILE:
+                node = new(While)
+                node.body = pop()
+                node.condition = pop()
+            elif code == IF:
+                node = new(If)
+                node.else_body = pop() if value else None
+                node.then_body = pop()
+                node.condition = pop()
+            elif code == DECLARATION:
+                node = new(Declaration)
+                node.type_ = value[0]
+                node.ident = intern(value[1])
+                node.name = strings[node.ident]
+            elif code == BODY:
+                node = new(Body)
+                declarations, statements = value
+                node.statements = stack[len(stack) - statements:]
+                del stack[len(stack) - statements:]
+                node.declarations = stack[len(stack) - declarations:]
+                del stack[len(stack) - declarations:]
+            elif code == PROGRAM:
+                node = new(Program)
+                node.name = value
+                node.body = pop()
+            elif code == NONE:
+                push(None)
+                continue
+            else:
+                diagnostics.append(ERRORS[code - ERROR_BASE](value, line, position))
+                continue
+            node.line = line
+            node.position_ = position
+            push(node)
+    if diagnostics or len(stack) != 1:
+        return None, diagnostics
+    return stack[0], diagnostics
+
+
+def export_tokens(source, file, binary=False):
+    """
+    Scans a source (a string or a stream) and writes every token, as it
+    is scanned, then the illegal characters. Returns the illegal
+    characters.
+    """
+    scanner = Scanner(source)
+    with writer(file, TOKENS, binary) as output:
+        token = scanner.next()
+        while True:
+            output.token(token)
+            if token.type_ == 'EOF':
+                break
+            token = scanner.next()
+        output.errors(scanner.errors)
+    return scanner.errors
+
+
+class StatementSink:
+    """
+    Stands in for the list of top-level statements of a StreamingParser:
+    writes every statement appended to it instead of keeping it.
+    """
+
+    def __init__(self, output):
+        self.output = output
+        self.count = 0
+
+    def append(self, statement):
+        self.output.node(statement)
+        self.count += 1
+
+
+class StreamingParser(FastParser):
+    """
+    A FastParser that writes the top-level declarations and statements
+    to a writer as soon as each is parsed and then drops them, so the
+    tree of a program is never in memory all at once. program() returns
+    the Program with an empty list of top-level statements.
+    """
+
+    def __init__(self, source, output):
+        super().__init__(source)
+        self.output = output
+        self.sink = StatementSink(output)
+        self.top_level = True  # until the first top-level statement starts
+
+    def declaration(self):
+        node = super().declaration()
+        if self.top_level:
+            self.output.node(node)
+        return node
+
+    def statements(self, values=None):
+        if not self.top_level:
+            return super().statements(values)
+        self.top_level = False
+        super().statements(self.sink)
+        return []
+
+
+def export_tree(source, file, binary=False):
+    """
+    Parses a source (a string, a stream or a TokenBuffer) with a
+    StreamingParser, writing the tree node by node, then the
+    diagnostics. Returns the diagnostics.
+    """
+    with writer(file, TREE, binary) as output:
+        parser = StreamingParser(source, output)
+        tree = parser.program()
+        if tree is not None:
+            body = tree.body
+            output.record(BODY, body.line, body.position_, (len(body.declarations), parser.sink.count))
+            output.record(PROGRAM, tree.line, tree.position_, tree.name)
+        output.errors(parser.diagnostics)
+    return parser.diagnostics
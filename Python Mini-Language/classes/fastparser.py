@@ -0,0 +1,422 @@
+# Change this if classes are in different directory
+from classes.parser import SYNC, STATEMENT_START, LITERAL_FOLLOW
+from classes.nodes import Program, Body, Declaration, Assign, If, While, Print, \
+    BinOp, UnaryOp, Literal, Name
+from classes.tokenbuffer import TokenBuffer, tokenize_all
+from classes.token import KINDS, KIND_CODES
+from classes.error import IllegalSyntaxError
+
+######################
+# INTEGER-KIND PARSER
+######################
+
+
+def mask(kinds):
+    """
+    Returns a set of token kinds as a bitmask of their codes, so
+    'kind in set' becomes MASK >> code & 1.
+    """
+    bits = 0
+    for kind in kinds:
+        bits |= 1 << KIND_CODES[kind]
+    return bits
+
+
+(EOF, ID, NUM, PROGRAM, INT, PRINT, IF, THEN, ELSE, WHILE, DO, OD, FI, BOOL, END, TRUE, FALSE, OR, AND, NOT,
+ SEMICOLON, LPAREN, RPAREN, PLUS, MINUS, TIMES, DIVIDE, EQUAL, COLON, ASSIGN,
+ LESS, LESS_EQUAL, GREATER, GREATER_EQUAL, NOT_EQUAL) = range(len(KINDS))
+
+"""
+FIRST and FOLLOW sets of 'Project Information/grammar.txt' as bitmasks.
+The sets the Parser recovers and looks ahead with come from parser.py,
+so both parsers stay in step.
+"""
+
+FIRST_DECLARATION = mask(['bool', 'int'])
+FIRST_STATEMENT = mask(STATEMENT_START)
+FIRST_LITERAL = mask(['true', 'false', 'NUM'])
+FIRST_FACTOR = mask(['true', 'false', 'NUM', 'ID', '('])  # after the unary operator
+LEAF = mask(['true', 'false', 'NUM', 'ID'])  # factors of one token
+UNARY = mask(['-', 'not'])
+RELATIONAL = mask(['<', '>', '<=', '>=', '!=', '='])
+ADDITIVE = mask(['+', '-', 'or'])
+MULTIPLICATIVE = mask(['*', '/', 'and'])
+CONTINUES_SIMPLE = ADDITIVE | MULTIPLICATIVE  # operators that continue a simple expression
+FOLLOW_LITERAL = mask(LITERAL_FOLLOW)
+SYNC_MASK = mask(SYNC)
+
+new = object.__new__  # nodes of expressions are built without Node.__init__()
+
+
+class FastParser:
+    """
+    This class parses the same grammar as the Parser and returns the same
+    tree and the same diagnostics, but reads the integer kind codes of a
+    TokenBuffer (see tokenbuffer.tokenize_all()) instead of Token objects.
+
+    The current token is an index into the buffer and its kind a small
+    integer, so match() is an integer comparison, sets of kinds are
+    tested with bitmasks and statement() dispatches through a list
+    indexed by kind. Values are sliced out of the source only for the
+    tokens that end up in the tree.
+
+    Expressions make up most of a tree, so their nodes are built with
+    object.__new__() and direct slot stores instead of Node.__init__(),
+    and names and literals are built in one step by leaf().
+
+    The source can be a TokenBuffer, a string or a stream.
+    """
+
+    def __init__(self, source):
+        buffer = source if isinstance(source, TokenBuffer) else tokenize_all(source)
+        self.buffer = buffer
+        self.kinds = buffer.kinds.tolist()
+        self.lines = buffer.lines.tolist()
+        self.columns = buffer.columns.tolist()
+        self.starts = buffer.starts
+        self.lengths = buffer.lengths
+        self.text = buffer.text
+        self.names = buffer.names
+        self.index = 0  # current token
+        self.kind = self.kinds[0]
+        self.errors = []  # syntax errors
+        self.diagnostics = []  # lexer and syntax errors, set by program()
+        self.panic = False  # True while recovering from an error
+        self.statements_by_kind = [None] * len(KINDS)
+        self.statements_by_kind[ID] = self.assignment_statement
+        self.statements_by_kind[IF] = self.conditional_statement
+        self.statements_by_kind[WHILE] = self.iterative_statement
+        self.statements_by_kind[PRINT] = self.print_statement
+
+    def advance(self):
+        """
+        Moves to the next token. The parser never moves past 'EOF'.
+        """
+        self.index += 1
+        self.kind = self.kinds[self.index]
+
+    def position(self, index):
+        return f'(Line: {self.lines[index]}, Pos: {self.columns[index]})'
+
+    def value(self, index):
+        """
+        Returns the value of a token as the Lexer gives it, and the
+        InternTable id of an 'ID' token (else None).
+        """
+        kind = self.kinds[index]
+        if kind != ID and kind != NUM:
+            return KINDS[kind], None
+        buffer = self.buffer
+        start = buffer.starts[index]
+        text = buffer.text[start:start + buffer.lengths[index]]
+        if kind == NUM:
+            return int(text, 10), None
+        ident = buffer.names.intern(text)
+        return buffer.names.names[ident], ident
+
+    def report(self, details, index=None):
+        """
+        Records a syntax error at the given (default: current) token and
+        enters panic mode, like Parser.report().
+        """
+        if not self.panic:
+            if index is None:
+                index = self.index
+            self.errors.append(IllegalSyntaxError(details, self.lines[index], self.columns[index]))
+            self.panic = True
+
+    def synchronize(self):
+        """
+        Skips tokens until one in SYNC and leaves panic mode.
+        """
+        while not SYNC_MASK >> self.kind & 1:
+            self.advance()
+        self.panic = False
+
+    def match(self, kind):
+        """
+        Consumes the current token if it has the given kind, else reports
+        an error. Returns the index of the current token either way.
+        """
+        index = self.index
+        if self.kind == kind:
+            self.index = index + 1
+            self.kind = self.kinds[index + 1]
+        else:
+            self.report(f'<At {self.position(index)} I see "{KINDS[self.kind]}" but expected "{KINDS[kind]}">')
+        return index
+
+    def expected(self, first, kinds):
+        """
+        Reports an error unless the current token is in 'first' (a mask;
+        'kinds' is how the error message lists it).
+        """
+        if not first >> self.kind & 1:
+            self.report(f'<ERROR! at {self.position(self.index)}. Expected to see {kinds}, '
+                        f'but see "{KINDS[self.kind]}">')
+
+    def program(self):
+        """
+        Program  =  "program"  Identifier  ":"  Body  "end"
+        """
+        start = self.match(PROGRAM)
+        name = self.match(ID)
+        self.match(COLON)
+        try:
+            body = self.body()
+            self.match(END)
+            if self.kind != EOF:
+                self.report(f'<At {self.position(self.index)} I see "{KINDS[self.kind]}" but expected "EOF">')
+        except RecursionError:
+            self.panic = False
+            self.report(f'<ERROR! at {self.position(self.index)}. Program is nested too deeply>')
+        self.diagnostics = sorted(self.buffer.errors + self.errors, key=lambda error: (error.line, error.position_))
+        if self.diagnostics:
+            return None
+        return Program(self.lines[start], self.columns[start], self.value(name)[0], body)
+
+    def body(self):
+        """
+        Body  =  [ Declarations ]  Statements
+        """
+        start = self.index
+        declarations = []
+        while FIRST_DECLARATION >> self.kind & 1:
+            declarations.append(self.declaration())
+        statements = self.statements()
+        return Body(self.lines[start], self.columns[start], declarations, statements)
+
+    def declaration(self):
+        """
+        Declaration  =  ( "bool" | "int" )  Identifier ";"
+        """
+        start = self.index
+        self.advance()
+        name = self.match(ID)
+        self.match(SEMICOLON)
+        if self.panic:
+            self.synchronize()
+            if self.kind == SEMICOLON:
+                self.advance()
+        value, ident = self.value(name)
+        node = Declaration(self.lines[start], self.columns[start], KINDS[self.kinds[start]], value)
+        node.ident = ident
+        return node
+
+    def statements(self, values=None):
+        """
+        Statements  =  Statement { ";" Statement }
+
+        The statements are appended to 'values' (a new list by default)
+        as they are parsed.
+        """
+        values = [] if values is None else values
+        values.append(self.statement())
+        while True:
+            if self.panic:
+                self.synchronize()
+            if self.kind == SEMICOLON:
+                self.advance()
+            elif FIRST_STATEMENT >> self.kind & 1:
+                self.report(f'<ERROR! at {self.position(self.index)}. Expected ";" but none found.>')
+                self.panic = False  # parse on as if the ";" was there
+            else:
+                break
+            values.append(self.statement())
+        return values
+
+    def statement(self):
+        """
+        Statement  =  AssignmentStatement  |  ConditionalStatement
+                   |  IterativeStatement  |  PrintStatement
+        """
+        production = self.statements_by_kind[self.kind]
+        if production is None:
+            self.expected(FIRST_STATEMENT, ('if', 'ID', 'while', 'print'))
+            return None
+        return production()
+
+    def assignment_statement(self):
+        """
+        AssignmentStatement  =  Identifier ":=" Expression
+        """
+        index = self.index
+        target = self.leaf()  # statement() only calls this on an 'ID'
+        self.match(ASSIGN)
+        return Assign(self.lines[index], self.columns[index], target, self.expr())
+
+    def conditional_statement(self):
+        """
+        ConditionalStatement  =  "if"  Expression  "then"  Body  [ "else" Body ]  "fi"
+        """
+        start = self.match(IF)
+        condition = self.expr()
+        self.match(THEN)
+        then_body = self.body()
+        else_body = None
+        if self.kind == ELSE:
+            self.advance()
+            else_body = self.body()
+        self.match(FI)
+        return If(self.lines[start], self.columns[start], condition, then_body, else_body)
+
+    def iterative_statement(self):
+        """
+        IterativeStatement  =  "while"  Expression  "do"  Body  "od"
+        """
+        start = self.match(WHILE)
+        condition = self.expr()
+        self.match(DO)
+        body = self.body()
+        self.match(OD)
+        return While(self.lines[start], self.columns[start], condition, body)
+
+    def print_statement(self):
+        """
+        PrintStatement  =  "print"  Expression
+        """
+        start = self.match(PRINT)
+        return Print(self.lines[start], self.columns[start], self.expr())
+
+    def expr(self):
+        """
+        Expression  =  SimpleExpression [ RelationalOperator SimpleExpression ]
+        """
+        # A name or literal not followed by an operator is the whole simple
+        # expression: leaf() is called directly, skipping three levels.
+        kinds = self.kinds
+        if LEAF >> self.kind & 1 and not CONTINUES_SIMPLE >> kinds[self.index + 1] & 1:
+            value = self.leaf()
+        else:
+            value = self.simple_expr()
+        if RELATIONAL >> self.kind & 1:
+            op = self.index
+            self.index = op + 1
+            self.kind = kind = kinds[op + 1]
+            if LEAF >> kind & 1 and not CONTINUES_SIMPLE >> kinds[op + 2] & 1:
+                right = self.leaf()
+            else:
+                right = self.simple_expr()
+            node = new(BinOp)
+            node.line = self.lines[op]
+            node.position_ = self.columns[op]
+            node.op = KINDS[kinds[op]]
+            node.left = value
+            node.right = right
+            return node
+        return value
+
+    def simple_expr(self):
+        """
+        SimpleExpression  =  Term { AdditiveOperator Term }
+        """
+        kinds = self.kinds
+        if LEAF >> self.kind & 1 and not MULTIPLICATIVE >> kinds[self.index + 1] & 1:
+            value = self.leaf()  # the whole term
+        else:
+            value = self.term()
+        while ADDITIVE >> self.kind & 1:
+            op = self.index
+            self.index = op + 1
+            self.kind = kind = kinds[op + 1]
+            if LEAF >> kind & 1 and not MULTIPLICATIVE >> kinds[op + 2] & 1:
+                right = self.leaf()
+            else:
+                right = self.term()
+            node = new(BinOp)
+            node.line = self.lines[op]
+            node.position_ = self.columns[op]
+            node.op = KINDS[kinds[op]]
+            node.left = value
+            node.right = right
+            value = node
+        return value
+
+    def term(self):
+        """
+        Term  =  Factor { MultiplicativeOperator Factor }
+        """
+        kinds = self.kinds
+        value = self.factor()
+        while MULTIPLICATIVE >> self.kind & 1:
+            op = self.index
+            self.index = op + 1
+            self.kind = kind = kinds[op + 1]
+            right = self.leaf() if LEAF >> kind & 1 else self.factor()
+            node = new(BinOp)
+            node.line = self.lines[op]
+            node.position_ = self.columns[op]
+            node.op = KINDS[kinds[op]]
+            node.left = value
+            node.right = right
+            value = node
+        return value
+
+    def factor(self):
+        """
+        Factor  =  [ UnaryOperator ] ( Literal  |  Identifier  | "(" Expression ")" )
+        """
+        kind = self.kind
+        if LEAF >> kind & 1:
+            return self.leaf()
+        op = None
+        if UNARY >> kind & 1:
+            op = self.index
+            self.advance()
+            kind = self.kind
+        value = None
+        if LEAF >> kind & 1:
+            value = self.leaf()
+        elif kind == LPAREN:
+            self.advance()
+            value = self.expr()
+            self.match(RPAREN)
+        else:
+            self.expected(FIRST_FACTOR, ['true', 'false', 'NUM', 'ID', '('])
+        if op is not None:
+            node = new(UnaryOp)
+            node.line = self.lines[op]
+            node.position_ = self.columns[op]
+            node.op = KINDS[self.kinds[op]]
+            node.operand = value
+            return node
+        return value
+
+    def leaf(self):
+        """
+        Literal  =  BooleanLiteral  |  IntegerLiteral
+
+        Returns the Name node (with its InternTable id) or the Literal
+        node of the current token, which must be an 'ID', a 'NUM',
+        "true" or "false", and moves past it.
+        """
+        index = self.index
+        kind = self.kind
+        kinds = self.kinds
+        if kind == ID:
+            start = self.starts[index]
+            text = self.text[start:start + self.lengths[index]]
+            names = self.names
+            ident = names.ids.get(text)
+            if ident is None:
+                ident = names.intern(text)
+            node = new(Name)
+            node.name = names.names[ident]
+            node.ident = ident
+        else:
+            if kind == NUM:
+                # A missing ";" before a statement is reported by statements().
+                if not FOLLOW_LITERAL >> kinds[index + 1] & 1:
+                    self.report(f'<ERROR! at (Line: {self.lines[index]}, Pos: {self.columns[index] + 1}). '
+                                f'Expected ";" but none found.>', index)
+                start = self.starts[index]
+                value = int(self.text[start:start + self.lengths[index]], 10)
+            else:
+                value = kind == TRUE
+            node = new(Literal)
+            node.value = value
+        node.line = self.lines[index]
+        node.position_ = self.columns[index]
+        self.index = index + 1
+        self.kind = kinds[index + 1]
+        return node
@@ -0,0 +1,251 @@
+# Change this if classes are in different directory
+from classes.scanner import Scanner
+from classes.parser import Parser
+from classes.incremental import TokenList
+from classes.semantic import Checker
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+import asyncio
+import codecs
+import os
+import time
+
+######################
+# ASYNC FRONT END
+######################
+
+
+YIELD_EVERY = 2048  # tokens scanned between two yields to the event loop
+OFFLOAD_BYTES = 64 << 10  # larger sources are checked in the executor
+READ_SIZE = 1 << 16  # bytes read from a stream at a time
+SHARE_EVERY = 256  # tokens parsed in a thread between two hand-overs of the GIL
+
+
+def error_dict(error):
+    return {'kind': error.error_name, 'details': error.details,
+            'line': error.line, 'position': error.position_}
+
+
+class SharingTokenList(TokenList):
+    """
+    This class is a TokenList for a parser running in a thread next to
+    the event loop. Every 'every' tokens it calls time.sleep(0), which
+    releases the GIL, so the event loop thread takes it at once instead
+    of waiting up to the switch interval (5 ms) on every wake-up.
+    """
+
+    def __init__(self, tokens, errors, every=SHARE_EVERY):
+        TokenList.__init__(self, tokens, 0, errors)
+        self.every = every
+
+    def next(self):
+        if not self.current % self.every:
+            time.sleep(0)
+        return TokenList.next(self)
+
+
+def parse_tokens(tokens, errors, shared=False):
+    """
+    Parses and checks scanned tokens and returns (accepted, errors) with
+    the errors as dicts. 'shared' is set when the parser runs in a
+    thread next to the event loop.
+    """
+    parser = Parser(SharingTokenList(tokens, errors) if shared else TokenList(tokens, 0, errors))
+    tree = parser.program()
+    diagnostics = parser.diagnostics
+    if tree is not None:
+        diagnostics = diagnostics + Checker(tree).errors
+    return tree is not None and not diagnostics, [error_dict(error) for error in diagnostics]
+
+
+def check_source(data):
+    """
+    Decodes, scans, parses and checks a source (UTF-8 bytes or a string)
+    in one go and returns the result dict of AsyncChecker.check(). This
+    is what runs in the executor.
+    """
+    start_time = time.perf_counter()
+    try:
+        text = data if isinstance(data, str) else codecs.decode(data, 'utf-8')
+    except UnicodeDecodeError as err:
+        return result(False, [decode_error(err)], 0, len(data), True, start_time)
+    scanner = Scanner(text)
+    tokens = [scanner.next()]
+    while tokens[-1].type_ != 'EOF':
+        tokens.append(scanner.next())
+    accepted, errors = parse_tokens(tokens, scanner.errors)
+    return result(accepted, errors, len(tokens), len(data), True, start_time)
+
+
+def decode_error(err):
+    return {'kind': 'Decode Error', 'details': str(err), 'line': None, 'position': None}
+
+
+def result(accepted, errors, tokens, size, offloaded, start_time):
+    return {
+        'accepted': accepted,
+        'errors': errors,
+        'tokens': tokens,
+        'bytes': size,
+        'offloaded': offloaded,
+        'seconds': time.perf_counter() - start_time,
+    }
+
+
+class ChunkFeed:
+    """
+    This class hands the chunks of a source to a Scanner as they arrive.
+
+    read() returns the oldest chunk not read yet, None if the next one
+    has not arrived and '' once close() was called and every chunk has
+    been read.
+    """
+
+    def __init__(self):
+        self.chunks = deque()
+        self.closed = False
+
+    def push(self, chunk):
+        self.chunks.append(chunk)
+
+    def close(self):
+        self.closed = True
+
+    def read(self, size=None):
+        if self.chunks:
+            return self.chunks.popleft()
+        return '' if self.closed else None
+
+
+class AsyncChecker:
+    """
+    This class checks mini-language sources for an asyncio service
+    without blocking its event loop, and returns the outcome as a dict
+    instead of printing it.
+
+    check() reads an async byte stream (anything with an async
+    read(size), like asyncio.StreamReader, or an async iterable of byte
+    chunks) or takes bytes or a string. Each chunk is scanned on the
+    event loop as soon as it arrives, so only the tokens are kept, and
+    the loop is given back every 'yield_every' tokens. Parsing and
+    checking the tokens runs in the loop's default executor (a thread),
+    which hands the GIL back to the loop every few hundred tokens.
+
+    Sources longer than 'offload_bytes' are admitted 'max_workers' at a
+    time; the others wait on the event loop (a stream stops being read
+    until it is admitted). Such bytes or strings are checked in a
+    process pool of 'max_workers' workers instead. An executor can also
+    be passed in.
+
+    The result dict has 'accepted', 'errors' (kind, details, line and
+    position of every error, in order), 'tokens', 'bytes', 'offloaded'
+    and 'seconds' (the time from the last chunk arriving to the result).
+    """
+
+    def __init__(self, yield_every=YIELD_EVERY, offload_bytes=OFFLOAD_BYTES, max_workers=None, executor=None):
+        self.yield_every = yield_every
+        self.offload_bytes = offload_bytes
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = executor
+        self.own_executor = executor is None
+        self.slots = None  # created in the event loop on first use
+
+    async def check(self, source):
+        """
+        Returns the result dict for a source.
+        """
+        if isinstance(source, (bytearray, memoryview)):
+            source = bytes(source)
+        if isinstance(source, (bytes, str)) and len(source) > self.offload_bytes:
+            return await self.offload(source)
+        feed = ChunkFeed()
+        scanner = Scanner(feed)
+        tokens = []
+        size = 0
+        slots = None
+        try:
+            async for chunk in read_chunks(source):
+                start_time = time.perf_counter()
+                size += len(chunk)
+                if slots is None and size > self.offload_bytes:
+                    slots = self.get_slots()
+                    await slots.acquire()
+                feed.push(chunk)
+                await self.scan(scanner, tokens)
+            start_time = time.perf_counter()
+            feed.close()
+            await self.scan(scanner, tokens)
+            loop = asyncio.get_running_loop()
+            accepted, errors = await loop.run_in_executor(None, parse_tokens, tokens, scanner.errors, True)
+        except UnicodeDecodeError as err:
+            return result(False, [decode_error(err)], 0, size, False, start_time)
+        finally:
+            if slots is not None:
+                slots.release()
+        return result(accepted, errors, len(tokens), size, False, start_time)
+
+    async def scan(self, scanner, tokens):
+        """
+        Appends the tokens of the input the scanner has been fed so far,
+        yielding to the event loop every 'yield_every' tokens. Stops at
+        EOF or when the scanner waits for more input.
+        """
+        scan = scanner.next
+        append = tokens.append
+        while not tokens or tokens[-1].type_ != 'EOF':
+            for _ in range(self.yield_every):
+                token = scan()
+                if token is None:
+                    return
+                append(token)
+                if token.type_ == 'EOF':
+                    return
+            await asyncio.sleep(0)
+
+    def get_slots(self):
+        """
+        Returns the semaphore that admits 'max_workers' large sources at
+        a time.
+        """
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.max_workers)
+        return self.slots
+
+    async def offload(self, data):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.max_workers)
+        async with self.get_slots():
+            return await asyncio.get_running_loop().run_in_executor(self.executor, check_source, data)
+
+    def close(self):
+        """
+        Shuts down the process pool if this object created it.
+        """
+        if self.own_executor and self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+async def read_chunks(source, size=READ_SIZE):
+    """
+    Yields the non-empty chunks of an async byte stream as they arrive.
+    Bytes and strings are yielded whole.
+    """
+    if isinstance(source, (bytes, str)):
+        if source:
+            yield source
+    elif hasattr(source, 'read'):
+        chunk = await source.read(size)
+        while chunk:
+            yield chunk
+            chunk = await source.read(size)
+    else:
+        async for chunk in source:
+            if chunk:  # an empty chunk would read as the end of the stream
+                yield chunk
@@ -0,0 +1,130 @@
+# Change this if classes are in different directory
+import random
+
+######################
+# PROGRAM GENERATOR
+######################
+
+
+"""
+Operators by the type of their operands and result, following
+'Project Information/grammar.txt'. Relational operators are the ones the
+lexer accepts ('<=' rather than the grammar's '=<').
+"""
+
+INT_OPERATORS = ('+', '-', '*', '/')
+BOOL_OPERATORS = ('and', 'or')
+COMPARISONS = ('<', '<=', '=', '!=', '>=', '>')
+
+INT_NAMES = ('a', 'b', 'count', 'total')
+BOOL_NAMES = ('done', 'flag')
+
+
+class Generator:
+    """
+    This class writes random programs that follow the grammar and pass
+    the semantic checks (every name is declared and every expression
+    has the right type), for benchmarks and tests.
+
+    'depth' is the deepest nesting of if/while bodies, 'complexity' the
+    number of operators in an expression (at most) and 'seed' makes the
+    output reproducible.
+    """
+
+    def __init__(self, depth=3, complexity=4, seed=0):
+        self.depth = depth
+        self.complexity = complexity
+        self.random = random.Random(seed)
+
+    def chunks(self, size):
+        """
+        Yields the text of a program of about 'size' characters in
+        pieces of one top-level statement, so programs larger than
+        memory can be written to a file.
+        """
+        yield 'program Generated:\n'
+        yield ''.join(f'   int {name};\n' for name in INT_NAMES)
+        yield ''.join(f'   bool {name};\n' for name in BOOL_NAMES)
+        written = 0
+        separator = ''
+        while written < size:
+            text = separator + self.statement(1, '   ')
+            written += len(text)
+            yield text
+            separator = ';\n'
+        yield '\nend\n'
+
+    def text(self, size):
+        return ''.join(self.chunks(size))
+
+    def write(self, file, size):
+        """
+        Writes a program of about 'size' characters to an open text file.
+        """
+        for chunk in self.chunks(size):
+            file.write(chunk)
+
+    def statement(self, level, indent):
+        choice = self.random.random()
+        if level <= self.depth and choice < 0.15:
+            text = f'{indent}if {self.expr("bool", self.complexity)} then\n{self.body(level, indent)}'
+            if self.random.random() < 0.5:
+                text += f'\n{indent}else\n{self.body(level, indent)}'
+            return text + f'\n{indent}fi'
+        if level <= self.depth and choice < 0.25:
+            return f'{indent}while {self.expr("bool", self.complexity)} do\n{self.body(level, indent)}\n{indent}od'
+        if choice < 0.35:
+            return f'{indent}print {self.expr(self.random.choice(("int", "bool")), self.complexity)}'
+        if self.random.random() < 0.75:
+            return f'{indent}{self.random.choice(INT_NAMES)} := {self.expr("int", self.complexity)}'
+        return f'{indent}{self.random.choice(BOOL_NAMES)} := {self.expr("bool", self.complexity)}'
+
+    def body(self, level, indent):
+        """
+        Returns a nested body: sometimes a declaration that hides an
+        outer variable, then one to three statements.
+        """
+        indent += '   '
+        text = ''
+        if self.random.random() < 0.3:
+            text = f'{indent}int {self.random.choice(INT_NAMES)};\n'
+        count = self.random.randint(1, 3)
+        return text + ';\n'.join(self.statement(level + 1, indent) for _ in range(count))
+
+    def expr(self, type_, operators):
+        """
+        Returns an expression of type 'int' or 'bool' with up to
+        'operators' operators. Operands that are themselves operations
+        are put in parentheses, so precedence never changes the type.
+        """
+        if operators <= 0:
+            return self.leaf(type_)
+        operators -= 1
+        left = self.random.randint(0, operators)
+        right = operators - left
+        if type_ == 'int':
+            if self.random.random() < 0.1:
+                return f'-{self.operand("int", operators)}'
+            op = self.random.choice(INT_OPERATORS)
+            return f'{self.operand("int", left)} {op} {self.operand("int", right)}'
+        choice = self.random.random()
+        if choice < 0.1:
+            return f'not {self.operand("bool", operators)}'
+        if choice < 0.6:
+            op = self.random.choice(COMPARISONS)
+            return f'{self.operand("int", left)} {op} {self.operand("int", right)}'
+        op = self.random.choice(BOOL_OPERATORS)
+        return f'{self.operand("bool", left)} {op} {self.operand("bool", right)}'
+
+    def operand(self, type_, operators):
+        text = self.expr(type_, operators)
+        return f'({text})' if operators else text
+
+    def leaf(self, type_):
+        if type_ == 'int':
+            if self.random.random() < 0.5:
+                return self.random.choice(INT_NAMES)
+            return str(self.random.randint(0, 1000))
+        if self.random.random() < 0.5:
+            return self.random.choice(BOOL_NAMES)
+        return self.random.choice(('true', 'false'))
@@ -0,0 +1,1017 @@
+# Change this if classes are in different directory
+from classes.scanner import Scanner
+from classes.token import InternTable
+from classes.parser import Parser
+from classes.nodes import Program, Body, If, While
+from bisect import bisect_right
+from itertools import accumulate, chain
+
+######################
+# INCREMENTAL PARSING
+######################
+
+BLOCK_SIZE = 128  # tokens per block of a Document (a block keeps between half and twice as many)
+HEADER = 'program'  # owner of the syntax errors before the program body
+
+
+class TokenList:
+    """
+    This class gives a list of already scanned tokens the next()
+    interface of the Lexer, starting at any index. 'current' is the index
+    of the token returned last; the final 'EOF' token is repeated.
+    """
+
+    def __init__(self, tokens, start=0, errors=()):
+        self.tokens = tokens
+        self.current = start - 1
+        self.errors = list(errors)
+
+    def next(self):
+        if self.current < len(self.tokens) - 1:
+            self.current += 1
+        return self.tokens[self.current]
+
+
+class Sums:
+    """
+    This class keeps a list of integers in a Fenwick tree: adding to one
+    value and summing the first values both take O(log n) steps.
+    """
+
+    def __init__(self, values):
+        tree = [0]
+        tree.extend(values)
+        size = len(tree)
+        for index in range(1, size):
+            parent = index + (index & -index)
+            if parent < size:
+                tree[parent] += tree[index]
+        self.tree = tree
+
+    @classmethod
+    def zeros(cls, size):
+        sums = cls.__new__(cls)
+        sums.tree = [0] * (size + 1)
+        return sums
+
+    def __len__(self):
+        return len(self.tree) - 1
+
+    def add(self, index, value):
+        """
+        Adds 'value' to value number 'index'.
+        """
+        tree = self.tree
+        index += 1
+        while index < len(tree):
+            tree[index] += value
+            index += index & -index
+
+    def prefix(self, count):
+        """
+        Returns the sum of the first 'count' values.
+        """
+        tree = self.tree
+        total = 0
+        while count:
+            total += tree[count]
+            count &= count - 1
+        return total
+
+    def search(self, total):
+        """
+        Returns the number of leading values whose sum is at most 'total',
+        and that sum. With sizes as values, it is the index of the item
+        that contains position 'total' and the position where it starts.
+        Values must not be negative.
+        """
+        tree = self.tree
+        index = 0
+        before = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            probe = index + step
+            if probe < len(tree) and before + tree[probe] <= total:
+                index = probe
+                before += tree[probe]
+            step >>= 1
+        return index, before
+
+    def values(self):
+        """
+        Returns the list of values.
+        """
+        values = self.tree[:]
+        for index in range(len(values) - 1, 0, -1):
+            parent = index + (index & -index)
+            if parent < len(values):
+                values[parent] -= values[index]
+        return values[1:]
+
+
+class Moves(Sums):
+    """
+    This class keeps the moves still to be applied to a list of items
+    (lines, positions or token indexes to add). They are stored as the
+    differences between neighbours, so moving a range of items and
+    getting the move of one item both take O(log n) steps.
+    """
+
+    def __init__(self, values):
+        super().__init__(value - previous for value, previous in zip(values, chain((0,), values)))
+
+    def move(self, start, stop, value):
+        """
+        Adds 'value' to the moves of items start..stop-1.
+        """
+        if value and start < stop:
+            self.add(start, value)
+            if stop < len(self):
+                self.add(stop, -value)
+
+    def get(self, index):
+        """
+        Returns the move of item 'index'.
+        """
+        return self.prefix(index + 1)
+
+    def values(self):
+        return list(accumulate(super().values()))
+
+
+class SpanParser(Parser):
+    """
+    This class is a Parser that records the token span (start, end) of
+    every body and statement it builds, and whether it was in panic mode
+    before and after it ('panics'), so they can be re-parsed alone. It
+    reads tokens from a TokenList (or anything with its 'current' and
+    next()).
+
+    Syntax errors are also kept in 'reports' as (error, index of the
+    token it was found at, owner): the owner is the innermost body or
+    statement whose parse reported it, HEADER before the program body
+    and None after it. 'root' is the outermost body.
+    """
+
+    def __init__(self, lexer):
+        self.first = lexer.current + 1  # index of the first token read
+        self.reports = []
+        self.owners = [[HEADER, None]]  # [node, enclosing entry] for each span being parsed
+        self.root = None
+        super().__init__(lexer)
+
+    def index(self):
+        """
+        Returns the index of the current token in the TokenList (the
+        stream may have read further ahead).
+        """
+        return self.first + self.stream.count - 1
+
+    def report(self, details, token=None):
+        if not self.panic:
+            super().report(details, token)
+            self.reports.append((self.errors[-1], self.index(), self.owners[-1]))
+
+    def span(self, parse):
+        """
+        Runs parse() and records the span of the node it returns.
+        """
+        start = self.index()
+        panic = self.panic
+        owner = [None, self.owners[-1]]
+        self.owners.append(owner)
+        node = parse()
+        self.owners.pop()
+        if node is not None:
+            owner[0] = node
+            node.start = start
+            node.end = self.index()
+            node.panics = (panic, self.panic)
+        return node
+
+    def body(self):
+        node = self.span(super().body)
+        node.moves = None
+        if len(self.owners) == 1:
+            self.root = node
+            self.owners[0] = None
+        return node
+
+    def statement(self):
+        return self.span(super().statement)
+
+    def resume(self, synced):
+        """
+        Parses statements like statements(), from the current token, until
+        synced(index of the token, panic) returns the number of an old
+        statement that started there. Returns the statements and that
+        number, or None if the statements ended first.
+        """
+        values = [self.statement()]
+        while self.next_statement():
+            stop = synced(self.index(), self.panic)
+            if stop is not None:
+                return values, stop
+            values.append(self.statement())
+        return values, None
+
+
+def owner(entry):
+    """
+    Returns the node of an owner entry of SpanParser.reports, or of the
+    nearest enclosing one if the parse gave no node (a statement with a
+    syntax error may be None).
+    """
+    while entry is not None and entry[0] is None:
+        entry = entry[1]
+    return None if entry is None else entry[0]
+
+
+def spans(node):
+    """
+    Yields a body or statement and all bodies and statements in it.
+    """
+    yield node
+    if type(node) is Body:
+        for statement in node.statements:
+            if statement is not None:
+                yield from spans(statement)
+    else:
+        for field in node.fields:
+            value = getattr(node, field)
+            if type(value) is Body:
+                yield from spans(value)
+
+
+def moved(error, line_delta, column_delta):
+    """
+    Returns a copy of an error moved by 'line_delta' lines and
+    'column_delta' positions, with the position in its details moved too.
+    """
+    details = error.details
+    start = details.index('(Line: ')
+    end = details.index(')', start)
+    line, position = details[start + 7:end].split(', Pos: ')
+    details = f'{details[:start]}(Line: {int(line) + line_delta}, Pos: {int(position) + column_delta})' + \
+        details[end + 1:]
+    return type(error)(details, error.line + line_delta, error.position_ + column_delta)
+
+
+def move(node, line, line_delta, column_delta):
+    """
+    Moves an expression or declaration and its children by 'line_delta'
+    lines, and by 'column_delta' positions if they are on 'line'.
+    """
+    if node.line == line:
+        node.position_ += column_delta
+    node.line += line_delta
+    for field in node.fields:
+        value = getattr(node, field)
+        if hasattr(value, 'fields'):
+            move(value, line, line_delta, column_delta)
+
+
+def shift(node, line_delta, column_delta, count_delta):
+    """
+    Moves a body or statement and everything in it by 'line_delta' lines,
+    by 'column_delta' positions what is on its first line, and by
+    'count_delta' tokens. The statements of a body get the move lazily,
+    in the body's 'moves'.
+    """
+    line = node.line
+    if type(node) is Body:
+        for declaration in node.declarations:
+            move(declaration, line, line_delta, column_delta)
+        lines, columns, counts = moves_of(node)
+        size = len(node.statements)
+        if column_delta:
+            columns.move(0, bisect_body(node, line, line_of), column_delta)
+        lines.move(0, size, line_delta)
+        counts.move(0, size, count_delta)
+    else:
+        for field in node.fields:
+            value = getattr(node, field)
+            if type(value) is Body:
+                shift(value, line_delta, column_delta if value.line == line else 0, count_delta)
+            elif value is not None:
+                move(value, line, line_delta, column_delta)
+    node.position_ += column_delta
+    node.line += line_delta
+    node.start += count_delta
+    node.end += count_delta
+
+
+def moves_of(body):
+    """
+    Returns the moves (lines, columns, counts) waiting for the statements
+    of a body; the column moves are for what is on their first line.
+    """
+    if body.moves is None:
+        size = len(body.statements)
+        body.moves = (Moves.zeros(size), Moves.zeros(size), Moves.zeros(size))
+    return body.moves
+
+
+def start_of(body, index):
+    """
+    Returns the index of the first token of statement 'index' of a body.
+    """
+    moves = body.moves
+    return body.statements[index].start + (moves[2].get(index) if moves else 0)
+
+
+def line_of(body, index):
+    """
+    Returns the line of statement 'index' of a body.
+    """
+    moves = body.moves
+    return body.statements[index].line + (moves[0].get(index) if moves else 0)
+
+
+def bisect_body(body, value, key, low=0):
+    """
+    Returns the index of the first statement of the body from 'low' on
+    whose key is greater than 'value'. None statements (left by syntax
+    errors) take the key of the statement before them.
+    """
+    statements = body.statements
+    high = len(statements)
+    while low < high:
+        middle = (low + high) // 2
+        probe = middle
+        while probe >= low and statements[probe] is None:
+            probe -= 1
+        if probe >= low and key(body, probe) > value:
+            high = probe
+        else:
+            low = middle + 1
+    return low
+
+
+def splice(body, start, stop, statements):
+    """
+    Replaces statements start..stop-1 of a body, keeping the moves
+    waiting for the others.
+    """
+    if body.moves is not None:
+        if stop - start == len(statements):
+            for moves in body.moves:
+                for index in range(start, stop):
+                    moves.move(index, index + 1, -moves.get(index))
+        else:
+            values = [moves.values() for moves in body.moves]
+            for value in values:
+                value[start:stop] = [0] * len(statements)
+            body.moves = tuple(Moves(value) for value in values)
+    body.statements[start:stop] = statements
+
+
+def synced(body, low, target, panic, last):
+    """
+    Returns the number of the statement of a body, from 'low' on, that
+    started at old token 'target' in the same panic mode, if it comes
+    after the old tokens replaced by an edit (up to 'last').
+    """
+    if target < last:
+        return None
+    index = bisect_body(body, target - 1, start_of, low)
+    if index < len(body.statements) and body.statements[index] is not None and \
+            start_of(body, index) == target and body.statements[index].panics[0] == panic:
+        return index
+    return None
+
+
+def settle_statement(body, index):
+    """
+    Applies the moves waiting for statement 'index' of a body and
+    returns it.
+    """
+    statement = body.statements[index]
+    if body.moves is not None and statement is not None:
+        lines, columns, counts = body.moves
+        line_delta = lines.get(index)
+        column_delta = columns.get(index)
+        count_delta = counts.get(index)
+        if line_delta or column_delta or count_delta:
+            shift(statement, line_delta, column_delta, count_delta)
+            lines.move(index, index + 1, -line_delta)
+            columns.move(index, index + 1, -column_delta)
+            counts.move(index, index + 1, -count_delta)
+    return statement
+
+
+def settle_body(body):
+    """
+    Applies all moves waiting in a body and the bodies in it.
+    """
+    statements = body.statements
+    if body.moves is not None:
+        values = zip(statements, *(moves.values() for moves in body.moves))
+        body.moves = None
+        for statement, line_delta, column_delta, count_delta in values:
+            if statement is not None and (line_delta or column_delta or count_delta):
+                shift(statement, line_delta, column_delta, count_delta)
+    for statement in statements:
+        if statement is not None:
+            for field in statement.fields:
+                value = getattr(statement, field)
+                if type(value) is Body:
+                    settle_body(value)
+
+
+class Block:
+    """
+    A run of tokens of a Document and the text from its first token up
+    to the first token of the next block (the first block also has the
+    text before its first token). 'starts' are the offsets of the tokens
+    in 'text', 'errors' the illegal characters in the text and 'reports'
+    the syntax errors found at its tokens, as (error, token, owner) in
+    the order the parser reported them (see SpanParser).
+    """
+    __slots__ = ('text', 'tokens', 'starts', 'errors', 'reports', 'index')
+
+
+def split(text, tokens, starts, errors, reports, count):
+    """
+    Cuts the tokens at offsets 'starts' of 'text' into 'count' blocks of
+    about the same size and gives each the illegal characters and syntax
+    errors that belong to it.
+    """
+    size = len(tokens)
+    cuts = [size * number // count for number in range(count + 1)]
+    blocks = []
+    blocks_of = {}
+    taken = 0
+    for number in range(count):
+        first, stop = cuts[number], cuts[number + 1]
+        begin = starts[first] if number else 0
+        block = Block()
+        block.text = text[begin:starts[stop] if stop < size else len(text)]
+        block.tokens = tokens[first:stop]
+        block.starts = [start - begin for start in starts[first:stop]]
+        end = taken
+        if stop < size:
+            limit = (tokens[stop].line, tokens[stop].position_)
+            while end < len(errors) and (errors[end].line, errors[end].position_) < limit:
+                end += 1
+        else:
+            end = len(errors)
+        block.errors = errors[taken:end]
+        taken = end
+        block.reports = []
+        if reports:
+            blocks_of.update(dict.fromkeys(block.tokens, block))
+        blocks.append(block)
+    for entry in reports:
+        blocks_of[entry[1]].reports.append(entry)
+    return blocks
+
+
+def move_block(block, line_delta, column_delta):
+    """
+    Moves the tokens and errors of a block by 'line_delta' lines, and by
+    'column_delta' positions those on the line of its first token.
+    """
+    line = block.tokens[0].line
+    block.errors = [moved(error, line_delta, column_delta if error.line == line else 0)
+                    for error in block.errors]
+    block.reports = [(moved(error, line_delta, column_delta if error.line == line else 0), token, node)
+                     for error, token, node in block.reports]
+    for token in block.tokens:
+        if token.line == line:
+            token.position_ += column_delta
+        token.line += line_delta
+
+
+class BlockReader:
+    """
+    This class gives the tokens of a Document the next() interface of the
+    Lexer from token 'start' on, like a TokenList, applying the moves
+    waiting for each block before reading it.
+    """
+
+    def __init__(self, document, start):
+        self.document = document
+        self.number, self.local = document.locate(start)
+        document.settle(self.number)
+        self.tokens = document.blocks[self.number].tokens
+        self.current = start - 1
+        self.errors = []
+
+    def next(self):
+        local = self.local
+        if local == len(self.tokens):
+            if self.number + 1 == len(self.document.blocks):
+                return self.tokens[-1]
+            self.number += 1
+            self.document.settle(self.number)
+            self.tokens = self.document.blocks[self.number].tokens
+            local = 0
+        self.local = local + 1
+        self.current += 1
+        return self.tokens[local]
+
+
+class Pieces:
+    """
+    This class reads strings one after the other as a stream: read()
+    returns the next non-empty one, then ''.
+    """
+
+    def __init__(self, pieces):
+        self.pieces = iter(pieces)
+
+    def read(self, size=None):
+        for piece in self.pieces:
+            if piece:
+                return piece
+        return ''
+
+
+class Document:
+    """
+    This class keeps the tokens and the tree of a source text and updates
+    them after each edit instead of lexing and parsing the whole text again.
+
+    The tokens are kept in blocks of about BLOCK_SIZE tokens, with their
+    text and errors. Sums of the block sizes (in characters and tokens)
+    find the block of an offset or token index, and the line and position
+    moves caused by an edit are recorded for the blocks after it in Moves
+    and only applied when a block is read again. In the tree, each body
+    keeps such moves for its statements.
+
+    edit() re-scans from the token before the edit until the Scanner
+    produces a token identical to an old one at the same (shifted) offset,
+    and rebuilds the blocks in between. The tree is updated by re-parsing
+    the innermost statement that contains the re-scanned tokens. If it
+    does not end at the same token, in the same panic mode, as before, the
+    statements of its body are re-parsed from it until one starts where an
+    old one did, in the same panic mode, and so on up to the whole program.
+    Edits of the tokens before the body re-parse the program header alone.
+    This works with syntax errors too: only those reported while parsing
+    the replaced statements are replaced.
+
+    'tree' and 'diagnostics' are the same as Parser.program() and
+    Parser.diagnostics would give for the current text. 'relexed' and
+    'reparsed' count the tokens scanned and parsed by the last edit.
+    """
+
+    def __init__(self, text):
+        self.load(text)
+
+    def load(self, text):
+        """
+        Scans and parses the whole text.
+        """
+        self.names = InternTable()  # shared by every scan, so ids stay valid
+        scanner = Scanner(text, names=self.names)
+        tokens = []
+        starts = []
+        token = scanner.next()
+        while True:
+            tokens.append(token)
+            starts.append(scanner.start)
+            if token.kind() == 'EOF':
+                break
+            token = scanner.next()
+        self.faulty = set()  # blocks with errors
+        self.unsettled = False  # True while the tree has moves waiting
+        self.cache = None  # diagnostics
+        self.renumber(split(text, tokens, starts, scanner.errors, [], -(-len(tokens) // BLOCK_SIZE)))
+        self.relexed = len(tokens)
+        self.parse()
+
+    @property
+    def text(self):
+        return ''.join(block.text for block in self.blocks)
+
+    @property
+    def tokens(self):
+        for number in range(len(self.blocks)):
+            self.settle(number)
+        return [token for block in self.blocks for token in block.tokens]
+
+    @property
+    def errors(self):
+        """
+        The illegal characters of the text.
+        """
+        errors = []
+        for block in sorted(self.faulty, key=lambda block: block.index):
+            self.settle(block.index)
+            errors += block.errors
+        return errors
+
+    @property
+    def diagnostics(self):
+        if self.cache is None:
+            errors = []
+            reports = []
+            for block in sorted(self.faulty, key=lambda block: block.index):
+                self.settle(block.index)
+                errors += block.errors
+                reports += [error for error, token, node in block.reports]
+            self.cache = sorted(errors + reports, key=lambda error: (error.line, error.position_))
+        return self.cache
+
+    @property
+    def tree(self):
+        if self.body is None or self.diagnostics:
+            return None
+        if self.unsettled:
+            settle_body(self.body)
+            self.unsettled = False
+        reader = BlockReader(self, 0)
+        start = reader.next()
+        name = reader.next()
+        return Program(start.line, start.position_, name.value_, self.body)
+
+    def locate(self, index):
+        """
+        Returns the block of token 'index' and its index in the block.
+        """
+        number, before = self.counts.search(index)
+        return number, index - before
+
+    def settle(self, number):
+        """
+        Applies the moves waiting for block 'number'.
+        """
+        line_delta = self.lines.get(number)
+        column_delta = self.columns.get(number)
+        if line_delta or column_delta:
+            move_block(self.blocks[number], line_delta, column_delta)
+            self.lines.move(number, number + 1, -line_delta)
+            self.columns.move(number, number + 1, -column_delta)
+
+    def renumber(self, blocks, lines=None, columns=None):
+        """
+        Sets the list of blocks and the moves waiting for them (default:
+        none), and rebuilds the sums of their sizes.
+        """
+        self.blocks = blocks
+        for number, block in enumerate(blocks):
+            block.index = number
+            if block.errors or block.reports:
+                self.faulty.add(block)
+        self.chars = Sums(len(block.text) for block in blocks)
+        self.counts = Sums(len(block.tokens) for block in blocks)
+        self.lines = Moves(lines or [0] * len(blocks))
+        self.columns = Moves(columns or [0] * len(blocks))
+
+    def replace(self, start, stop, blocks):
+        """
+        Replaces blocks start..stop-1 with new ones.
+        """
+        for block in self.blocks[start:stop]:
+            self.faulty.discard(block)
+        for block in blocks:
+            if block.errors or block.reports:
+                self.faulty.add(block)
+        if len(blocks) == stop - start:
+            for number, block in enumerate(blocks, start):
+                old = self.blocks[number]
+                self.chars.add(number, len(block.text) - len(old.text))
+                self.counts.add(number, len(block.tokens) - len(old.tokens))
+                self.lines.move(number, number + 1, -self.lines.get(number))
+                self.columns.move(number, number + 1, -self.columns.get(number))
+                block.index = number
+                self.blocks[number] = block
+            return
+        lines = self.lines.values()
+        columns = self.columns.values()
+        lines[start:stop] = columns[start:stop] = [0] * len(blocks)
+        self.renumber(self.blocks[:start] + blocks + self.blocks[stop:], lines, columns)
+
+    def pieces(self, start, stop=None):
+        """
+        Yields the text from offset 'start' up to 'stop' (default: the
+        end), a block at a time.
+        """
+        number, before = self.chars.search(start)
+        while number < len(self.blocks):
+            text = self.blocks[number].text
+            end = before + len(text)
+            if stop is not None and stop <= end:
+                yield text[start - before:stop - before]
+                return
+            yield text[start - before:]
+            start = before = end
+            number += 1
+
+    def parse(self):
+        """
+        Parses all tokens again.
+        """
+        parser = SpanParser(BlockReader(self, 0))
+        parser.program()
+        self.body = parser.root
+        self.unsettled = False
+        self.cache = None
+        for block in list(self.faulty):
+            block.reports = []
+            if not block.errors:
+                self.faulty.discard(block)
+        for number, entries in self.entries(parser.reports).items():
+            self.blocks[number].reports = entries
+            self.faulty.add(self.blocks[number])
+        self.reparsed = parser.index() + 1
+
+    def entries(self, reports):
+        """
+        Returns SpanParser reports as block reports, by block.
+        """
+        entries = {}
+        for error, index, entry in reports:
+            number, local = self.locate(index)
+            entries.setdefault(number, []).append((error, self.blocks[number].tokens[local], owner(entry)))
+        return entries
+
+    def edit(self, offset, deleted, inserted):
+        """
+        Replaces 'deleted' characters at 'offset' with the 'inserted' text
+        and updates the tokens, the tree and the diagnostics.
+        """
+        delta = len(inserted) - deleted
+        blocks = self.blocks
+
+        # Re-scan from the token before the first one the edit can touch.
+        number, before = self.chars.search(offset)
+        if number == len(blocks):
+            number -= 1
+            before = self.chars.prefix(number)
+        first = max(self.counts.prefix(number) + bisect_right(blocks[number].starts, offset - before) - 2, 0)
+        number, local = self.locate(first)
+        self.settle(number)
+        head = blocks[number]
+        token = head.tokens[local]
+        region = self.chars.prefix(number)  # offset of the first block re-built
+        first_start = region + head.starts[local]
+        scanner_start = first_start
+        if offset < first_start:  # before the first token: scan from the start
+            scanner_start = 0
+        scanner = Scanner(Pieces(chain(self.pieces(scanner_start, offset), (inserted,),
+                                       self.pieces(offset + deleted))), names=self.names)
+        if scanner_start:
+            scanner.line = token.line
+            scanner.line_start = -token.position_
+        restart = (scanner.line, -scanner.line_start)
+
+        new_tokens = []
+        new_starts = []  # offsets from 'region'
+        inserted_end = offset + len(inserted)
+        last = number
+        tail = head
+        index = local
+        base = region  # old offset of block 'last'
+        old_start = first_start
+        while True:
+            new = scanner.next()
+            start = scanner_start + scanner.offset + scanner.start
+            if start >= inserted_end:
+                target = start - delta
+                while old_start < target:
+                    if tail.tokens[index].kind() == 'EOF':  # the old tokens do not line up
+                        self.load(self.text[:offset] + inserted + self.text[offset + deleted:])
+                        return self
+                    index += 1
+                    if index == len(tail.tokens):
+                        base += len(tail.text)
+                        last += 1
+                        tail = blocks[last]
+                        index = 0
+                    old_start = base + tail.starts[index]
+                sync = tail.tokens[index]
+                if old_start == target and sync.type_ == new.type_ and sync.value_ == new.value_:
+                    break
+            new_tokens.append(new)
+            new_starts.append(start - region)
+
+        self.settle(last)
+        sync_line = sync.line
+        sync_position = sync.position_
+        line_delta = new.line - sync_line
+        column_delta = new.position_ - sync_position
+        count = self.counts.prefix(last) + index - first  # old tokens replaced
+
+        # Old illegal characters in the re-scanned range are replaced by the
+        # ones the scanner found, and syntax errors at replaced tokens are
+        # dropped; later ones are moved like the tokens.
+        before = set(head.tokens[:local])
+        after = set(tail.tokens[index:])
+        reports = [entry for entry in head.reports if entry[1] in before]
+        reports += [(moved(error, line_delta, column_delta if error.line == sync_line else 0), token, node)
+                    for error, token, node in tail.reports if token in after]
+        lost = [node for block in blocks[number:last + 1] for error, token, node in block.reports
+                if token not in before and token not in after]  # owners of the dropped syntax errors
+        errors = [error for error in head.errors if (error.line, error.position_) < restart]
+        errors += scanner.errors
+        errors += [moved(error, line_delta, column_delta if error.line == sync_line else 0)
+                   for error in tail.errors if (error.line, error.position_) >= (sync_line, sync_position)]
+        for token in tail.tokens[index:]:
+            if token.line == sync_line:
+                token.position_ += column_delta
+            token.line += line_delta
+
+        text = ''.join(block.text for block in blocks[number:last + 1])
+        text = text[:offset - region] + inserted + text[offset + deleted - region:]
+        tokens = head.tokens[:local] + new_tokens + tail.tokens[index:]
+        starts = head.starts[:local] + new_starts
+        starts += [base - region + start + delta for start in tail.starts[index:]]
+        size = last + 1 - number
+        if not size * BLOCK_SIZE // 2 <= len(tokens) <= size * BLOCK_SIZE * 2:
+            size = -(-len(tokens) // BLOCK_SIZE)
+        self.replace(number, last + 1, split(text, tokens, starts, errors, reports, size))
+
+        # Later blocks move lazily: by the column delta those starting on the
+        # line of the sync token, and by the line delta all of them.
+        after = number + size
+        if column_delta:
+            low, high = after, len(self.blocks)
+            while low < high:
+                middle = (low + high) // 2
+                if self.blocks[middle].tokens[0].line + self.lines.get(middle) > sync_line:
+                    high = middle
+                else:
+                    low = middle + 1
+            self.columns.move(after, low, column_delta)
+        self.lines.move(after, len(self.blocks), line_delta)
+        self.relexed = len(new_tokens)
+        self.cache = None
+
+        if self.body is None:
+            self.parse()
+        else:
+            self.reparse(first, first + count, len(new_tokens) - count, sync_line, line_delta, column_delta, lost)
+        return self
+
+    def reparse(self, first, last, count_delta, sync_line, line_delta, column_delta, lost):
+        """
+        Re-parses the innermost statement that contains the old tokens
+        first..last-1 (now replaced), or else the statements of a body from
+        the one where they start, until an old statement starts in the same
+        state, and splices the result into the tree. What is re-parsed must
+        also own the syntax errors dropped with the tokens ('lost').
+        """
+        if last <= self.body.start and all(node is HEADER for node in lost):
+            self.reparse_header(count_delta, sync_line, line_delta, column_delta)
+            return
+
+        # Path from the program body down to the innermost node where the edit
+        # starts (it may end after it).
+        path = []
+        indexes = []  # position of each path node in its parent body (or None)
+        node = self.body
+        index = None
+        while node is not None and node.start <= first:
+            path.append(node)
+            indexes.append(index)
+            child = None
+            index = None
+            if type(node) is Body:
+                index = bisect_body(node, first, start_of) - 1
+                while index >= 0 and node.statements[index] is None:
+                    index -= 1
+                if index >= 0:
+                    child = settle_statement(node, index)
+            elif type(node) is If:
+                child = node.then_body
+                if node.else_body is not None and node.else_body.start <= first:
+                    child = node.else_body
+            elif type(node) is While:
+                child = node.body
+            node = child
+
+        if any(node is None or node is HEADER for node in lost):  # a syntax error of the program itself
+            path = []
+        for depth in range(len(path) - 1, -1, -1):
+            old = path[depth]
+            if type(old) is Body and depth + 1 < len(path):
+                # Re-parse the statements of the body from the one with the
+                # edit until an old statement starts in the same state.
+                index = indexes[depth + 1]
+                statement = old.statements[index]
+                parser = SpanParser(BlockReader(self, statement.start))
+                parser.panic = statement.panics[0]
+                parser.owners.append([old, None])
+                try:
+                    statements, stop = parser.resume(
+                        lambda position, panic: synced(old, index + 1, position - count_delta, panic, last))
+                except RecursionError:
+                    break
+                if stop is None:
+                    stop = len(old.statements)
+                    if last > old.end or parser.index() != old.end + count_delta or \
+                            parser.panic != old.panics[1]:
+                        continue
+                owners = set()
+                for node in old.statements[index:stop]:
+                    if node is not None:
+                        owners.update(map(id, spans(node)))
+                if not all(id(node) in owners or node is old and first > statement.start for node in lost):
+                    continue
+                start = statement.start
+                self.replace_reports(owners, start, parser.index(), parser.reports, old)
+                splice(old, index, stop, statements)
+                depth += 1  # the body moves the statements after the new ones
+                path[depth] = statements[-1]
+                indexes[depth] = index + len(statements) - 1
+            else:
+                if last > old.end:
+                    continue
+                owners = set(map(id, spans(old)))
+                if not all(id(node) in owners for node in lost):
+                    continue
+                parser = SpanParser(BlockReader(self, old.start))
+                parser.panic = old.panics[0]
+                try:
+                    new = parser.body() if type(old) is Body else parser.statement()
+                except RecursionError:
+                    break
+                if new is None or parser.index() != old.end + count_delta or parser.panic != old.panics[1]:
+                    continue
+                parent = path[depth - 1] if depth else None
+                if parent is None:
+                    self.body = new
+                elif type(parent) is Body:
+                    splice(parent, indexes[depth], indexes[depth] + 1, [new])
+                else:
+                    for field in parent.fields:
+                        if getattr(parent, field) is old:
+                            setattr(parent, field, new)
+                path[depth] = new
+                start = new.start
+                self.replace_reports(owners, start, new.end, parser.reports)
+
+            # Everything after the new node moves like the tokens after the edit.
+            for level in range(depth - 1, -1, -1):
+                ancestor = path[level]
+                ancestor.end += count_delta
+                if type(ancestor) is Body:
+                    index = indexes[level + 1] + 1
+                    size = len(ancestor.statements)
+                    if index < size and (line_delta or column_delta or count_delta):
+                        lines, columns, counts = moves_of(ancestor)
+                        if column_delta:
+                            columns.move(index, bisect_body(ancestor, sync_line, line_of, index), column_delta)
+                        lines.move(index, size, line_delta)
+                        counts.move(index, size, count_delta)
+                        self.unsettled = True
+                elif type(ancestor) is If and ancestor.else_body is not None and \
+                        path[level + 1] is ancestor.then_body:
+                    body = ancestor.else_body
+                    shift(body, line_delta, column_delta if body.line == sync_line else 0, count_delta)
+                    self.unsettled = True
+            self.reparsed = parser.index() - start
+            return
+
+        self.parse()
+
+    def reparse_header(self, count_delta, sync_line, line_delta, column_delta):
+        """
+        Re-parses the tokens before the program body after an edit of them,
+        and moves the body like the tokens after the edit.
+        """
+        body = self.body
+        parser = SpanParser(BlockReader(self, 0))
+        parser.match('program')
+        parser.match('ID')
+        parser.match(':')
+        end = parser.index()
+        if end != body.start + count_delta or parser.panic != body.panics[0]:
+            self.parse()
+            return
+        self.replace_reports(set(), 0, end, parser.reports, HEADER)
+        shift(body, line_delta, column_delta if body.line == sync_line else 0, count_delta)
+        self.unsettled = True
+        self.reparsed = end
+
+    def replace_reports(self, owners, start, end, reports, body=None):
+        """
+        Replaces the syntax errors that the nodes with ids 'owners', and
+        'body' after token 'start' (or all of HEADER), reported up to token
+        'end' with those of the new parse (SpanParser reports).
+        """
+        first, _ = self.locate(start)
+        last, _ = self.locate(end)
+        added = self.entries(reports)
+        for number in range(first, last + 1):
+            block = self.blocks[number]
+            entries = added.get(number, [])
+            if block.reports:
+                base = self.counts.prefix(number)
+                indexes = {token: base + local for local, token in enumerate(block.tokens)}
+                before = []
+                after = []
+                for entry in block.reports:
+                    index = indexes[entry[1]]
+                    if id(entry[2]) in owners or body is not None and entry[2] is body and \
+                            (body is HEADER or start < index <= end):
+                        continue
+                    (before if (index < end or index == start) and body is not HEADER else after).append(entry)
+                entries = before + entries + after
+            block.reports = entries
+            if entries or block.errors:
+                self.faulty.add(block)
+            else:
+                self.faulty.discard(block)
@@ -0,0 +1,163 @@
+# Change this if classes are in different directory
+from classes.parser import Parser
+import json
+import sys
+import time
+
+######################
+# INSTRUMENTATION
+######################
+
+
+"""
+The plain Lexer and Parser have no hooks, so parsing without a Profile
+costs exactly what it did before. A Profile records its counters through
+a ProfiledLexer, which wraps any lexer, and a ProfiledParser, whose
+productions are the Parser's wrapped in enter()/exit().
+"""
+
+PRODUCTIONS = ('program', 'body', 'declarations', 'declaration', 'statements', 'statement',
+               'assignment_statement', 'conditional_statement', 'iterative_statement', 'print_statement',
+               'expr', 'simple_expr', 'term', 'factor', 'literal', 'boolean_literal')
+
+LEXER_FRAME = 'Lexer.next'
+
+
+class Profile:
+    """
+    This class collects the counters of one or more profiled parses:
+
+    - 'tokens': tokens returned by the lexer, per kind
+    - 'calls': calls of Lexer.next and of each production
+    - 'self_ns': time spent in each of them, without the time of the
+      productions (and Lexer.next calls) they made, in nanoseconds
+    - 'blocks': memory blocks allocated and not freed while in each of
+      them (sys.getallocatedblocks() deltas), also without their callees
+    - 'max_depth': deepest nesting of productions
+    - 'stacks': self time per call stack, for a flame graph
+    """
+
+    def __init__(self):
+        self.tokens = {}
+        self.calls = {}
+        self.self_ns = {}
+        self.blocks = {}
+        self.stacks = {}
+        self.max_depth = 0
+        self.names = []  # current call stack
+        self.frames = []  # [start time, callee time, start blocks, callee blocks] per call
+
+    def parser(self, lexer):
+        """
+        Returns a ProfiledParser reading from 'lexer' through a
+        ProfiledLexer, both reporting to this profile.
+        """
+        return ProfiledParser(ProfiledLexer(lexer, self), self)
+
+    def enter(self, name):
+        self.names.append(name)
+        if len(self.names) > self.max_depth:
+            self.max_depth = len(self.names)
+        self.frames.append([time.perf_counter_ns(), 0, sys.getallocatedblocks(), 0])
+
+    def exit(self):
+        now = time.perf_counter_ns()
+        blocks = sys.getallocatedblocks()
+        start, callee_ns, start_blocks, callee_blocks = self.frames.pop()
+        elapsed = now - start
+        allocated = blocks - start_blocks
+        stack = tuple(self.names)
+        name = self.names.pop()
+        self.calls[name] = self.calls.get(name, 0) + 1
+        self.self_ns[name] = self.self_ns.get(name, 0) + elapsed - callee_ns
+        self.blocks[name] = self.blocks.get(name, 0) + allocated - callee_blocks
+        self.stacks[stack] = self.stacks.get(stack, 0) + elapsed - callee_ns
+        if self.frames:
+            parent = self.frames[-1]
+            parent[1] += elapsed
+            parent[3] += allocated
+
+    def count(self, kind):
+        self.tokens[kind] = self.tokens.get(kind, 0) + 1
+
+    def to_dict(self):
+        """
+        Returns the counters as a dict that json.dumps() accepts.
+        """
+        return {
+            'tokens': dict(sorted(self.tokens.items(), key=lambda item: -item[1])),
+            'max_depth': self.max_depth,
+            'frames': {
+                name: {
+                    'calls': self.calls[name],
+                    'self_seconds': self.self_ns[name] / 1e9,
+                    'allocated_blocks': self.blocks[name],
+                }
+                for name in sorted(self.calls, key=lambda name: -self.self_ns[name])
+            },
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def collapsed(self):
+        """
+        Returns the call stacks in the collapsed format read by
+        flamegraph.pl and speedscope ('a;b;c <microseconds>' per line).
+        """
+        return ''.join(f'{";".join(stack)} {ns // 1000}\n'
+                       for stack, ns in sorted(self.stacks.items()) if ns >= 1000)
+
+
+class ProfiledLexer:
+    """
+    This class wraps a lexer: next() is timed as a 'Lexer.next' frame
+    and the kind of every token is counted.
+    """
+
+    def __init__(self, lexer, profile):
+        self.lexer = lexer
+        self.profile = profile
+
+    @property
+    def errors(self):
+        return self.lexer.errors
+
+    def next(self):
+        profile = self.profile
+        profile.enter(LEXER_FRAME)
+        try:
+            token = self.lexer.next()
+        finally:
+            profile.exit()
+        profile.count(token.kind())
+        return token
+
+
+class ProfiledParser(Parser):
+    """
+    This class is a Parser whose productions (PRODUCTIONS) report
+    to a Profile.
+    """
+
+    def __init__(self, lexer, profile):
+        self.profile = profile
+        super().__init__(lexer)
+
+
+def profiled(name, production):
+    def method(self, *args):
+        profile = self.profile
+        profile.enter(name)
+        try:
+            return production(self, *args)
+        finally:
+            profile.exit()
+    method.__name__ = name
+    method.__doc__ = production.__doc__
+    return method
+
+
+for _name in PRODUCTIONS:
+    setattr(ProfiledParser, _name, profiled(_name, getattr(Parser, _name)))
+del _name
@@ -0,0 +1,177 @@
+# Change this if classes are in different directory
+from classes.nodes import Assign, If, While, Print, BinOp, UnaryOp, Literal, Name
+from classes.symbol import SymbolTable
+import operator
+
+######################
+# INTERPRETER
+######################
+
+
+def divide(left, right):
+    """
+    Integer division rounded toward zero, so -7 / 2 is -3.
+    """
+    if right == 0:
+        raise Exception('<ERROR! Division by zero>')
+    quotient = abs(left) // abs(right)
+    return quotient if (left < 0) == (right < 0) else -quotient
+
+
+def format_value(value):
+    """
+    Returns a value the way the print statement shows it.
+    """
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    return str(value)
+
+
+BINARY = {
+    '+': operator.add, '-': operator.sub, '*': operator.mul, '/': divide,
+    '<': operator.lt, '>': operator.gt, '<=': operator.le, '>=': operator.ge,
+    '=': operator.eq, '!=': operator.ne,
+}
+
+DEFAULTS = {'int': 0, 'bool': False}
+
+
+class Resolver:
+    """
+    This class gives every declaration of a program its own index in a
+    flat frame and resolves every Name to the index of the declaration
+    it refers to, following the hiding rules in grammar.txt (through a
+    SymbolTable).
+
+    'size' is the number of slots the frame needs.
+    """
+
+    def __init__(self, program):
+        self.size = 0
+        self.symbols = SymbolTable()
+        self.resolve_body(program.body)
+
+    def resolve_body(self, body):
+        """
+        Gives a slot to each declaration of the body in a new scope, then
+        resolves the names used in its statements.
+        """
+        self.symbols.enter()
+        for declaration in body.declarations:
+            declaration.slot = self.size
+            if self.symbols.declare(declaration.ident, declaration.name, declaration.type_, self.size) is None:
+                raise Exception(f'<ERROR! at {declaration.position()}. '
+                                f'"{declaration.name}" is already declared>')
+            self.size += 1
+        for statement in body.statements:
+            self.resolve(statement)
+        self.symbols.exit()
+
+    def resolve(self, node):
+        """
+        Resolves the names used in a statement or expression.
+        """
+        kind = type(node)
+        if kind is Name:
+            symbol = self.symbols.lookup(node.ident)
+            if symbol is None:
+                raise Exception(f'<ERROR! at {node.position()}. "{node.name}" is not declared>')
+            node.slot = symbol.slot
+        elif kind is Assign:
+            self.resolve(node.target)
+            self.resolve(node.value)
+        elif kind is If:
+            self.resolve(node.condition)
+            self.resolve_body(node.then_body)
+            if node.else_body is not None:
+                self.resolve_body(node.else_body)
+        elif kind is While:
+            self.resolve(node.condition)
+            self.resolve_body(node.body)
+        elif kind is Print:
+            self.resolve(node.value)
+        elif kind is BinOp:
+            self.resolve(node.left)
+            self.resolve(node.right)
+        elif kind is UnaryOp:
+            self.resolve(node.operand)
+
+
+class Interpreter:
+    """
+    This class executes a program tree returned by Parser.program().
+
+    Names are resolved to frame slots by the Resolver before running,
+    so variables are read and written by list index, never by name.
+
+    Printed values are passed to 'output' (print by default). 'steps'
+    counts the statements executed.
+    """
+
+    def __init__(self, program, output=print):
+        self.program = program
+        self.output = output
+        self.steps = 0
+        self.slots = [0] * Resolver(program).size
+
+    def run(self):
+        """
+        Executes the program.
+        """
+        self.execute_body(self.program.body)
+
+    def execute_body(self, body):
+        """
+        Resets the variables declared in the body, then executes its
+        statements in order.
+        """
+        slots = self.slots
+        for declaration in body.declarations:
+            slots[declaration.slot] = DEFAULTS[declaration.type_]
+        execute = self.execute
+        for statement in body.statements:
+            execute(statement)
+
+    def execute(self, node):
+        """
+        Executes a single statement.
+        """
+        self.steps += 1
+        kind = type(node)
+        if kind is Assign:
+            self.slots[node.target.slot] = self.evaluate(node.value)
+        elif kind is If:
+            if self.evaluate(node.condition):
+                self.execute_body(node.then_body)
+            elif node.else_body is not None:
+                self.execute_body(node.else_body)
+        elif kind is While:
+            evaluate = self.evaluate
+            execute_body = self.execute_body
+            condition = node.condition
+            body = node.body
+            while evaluate(condition):
+                execute_body(body)
+        elif kind is Print:
+            self.output(format_value(self.evaluate(node.value)))
+
+    def evaluate(self, node):
+        """
+        Evaluates an expression and returns its value.
+        """
+        kind = type(node)
+        if kind is Name:
+            return self.slots[node.slot]
+        if kind is Literal:
+            return node.value
+        if kind is BinOp:
+            op = node.op
+            if op == 'and':
+                return self.evaluate(node.left) and self.evaluate(node.right)
+            if op == 'or':
+                return self.evaluate(node.left) or self.evaluate(node.right)
+            return BINARY[op](self.evaluate(node.left), self.evaluate(node.right))
+        value = self.evaluate(node.operand)
+        return -value if node.op == '-' else not value
@@ -1,6 +1,7 @@
 # Change this if classes are in different directory
-from classes.token import Token
+from classes.token import Token, InternTable, KEYWORDS
 from classes.error import IllegalCharacterError
+from classes.source import ChunkReader, CHUNK_SIZE
 
 ###########################
 # LEXER CLASS
@@ -16,19 +17,30 @@ class Lexer:
     Following the requirements, libraries like 're' are not allowed.
 
     The purpose of this class is to return tokens from the input file.
+
+    The input can be a string or a stream (text, binary or a memory-mapped
+    file). Streams are read in chunks of chunk_size, so only the current
+    chunk is kept in memory.
+
+    Identifiers are interned in self.names, an InternTable (a new one,
+    or the one passed in to share ids with another lexer).
     """
 
-    KEYWORDS = frozenset(['program', 'int', 'print', 'if',
-                          'then', 'else', 'while', 'do',
-                          'od', 'fi', 'bool', 'end', 'true',
-                          'false', 'or', 'and', 'not'])
+    KEYWORDS = frozenset(KEYWORDS)
 
-    def __init__(self, text):
-        self.text = text
+    def __init__(self, text, chunk_size=CHUNK_SIZE, names=None):
+        if isinstance(text, str):
+            self.text = text
+            self.reader = None
+        else:
+            self.text = ''
+            self.reader = ChunkReader(text, chunk_size)
         self.idx = -1
         self.line = 1
         self.pos = 0
         self.token = None
+        self.errors = []
+        self.names = InternTable() if names is None else names  # identifier ids
 
     def next_char(self):
         """
@@ -40,10 +52,106 @@ class Lexer:
         """
         self.idx += 1
         self.pos += 1
-        if self.idx == len(self.text):
+        if self.idx == len(self.text) and not self.fill():
             return 'EOF'
         return self.text[self.idx]
 
+    def fill(self):
+        """
+        This function reads the next chunk when the input is a stream.
+
+        The last character of the current chunk is kept because next()
+        may step back one character after a lookahead. Returns False when
+        there is nothing left to read. A stream with nothing to read yet
+        is waited for, since next() has to return a token.
+        """
+        if self.reader is None:
+            return False
+        chunk = self.reader.read_blocking()
+        if not chunk:
+            self.reader = None
+            return False
+        keep = self.text[-1:]
+        self.text = keep + chunk
+        self.idx = len(keep)
+        return True
+
+    def skip_trivia(self):
+        """
+        This function skips whitespace, newlines and comments in a loop
+        and returns the first character after them (already consumed,
+        like next_char()).
+
+        It runs in constant stack depth no matter how many blank or
+        comment lines follow each other.
+        """
+        while True:
+            peek = self.next_char()
+            if peek == '\n':
+                self.line += 1
+                self.pos = 0
+            elif peek == '/':
+                peek = self.next_char()
+                self.idx -= 1
+                self.pos -= 1
+                if peek != '/':
+                    return '/'
+                self.skip_comment()
+            elif peek == 'EOF' or not peek.isspace():
+                return peek
+
+    def skip_comment(self):
+        """
+        This function skips the rest of a '//' comment up to (not
+        including) the newline that ends it.
+
+        The current chunk is searched with str.find() instead of reading
+        the comment one character at a time.
+        """
+        while True:
+            newline = self.text.find('\n', self.idx + 1)
+            end = len(self.text) if newline == -1 else newline
+            self.pos += end - 1 - self.idx
+            self.idx = end - 1
+            if newline != -1:
+                return
+            peek = self.next_char()
+            self.idx -= 1
+            self.pos -= 1
+            if peek == 'EOF':
+                return
+
+    def illegal(self, char):
+        """
+        This function records an illegal character found just before the
+        current position.
+        """
+        self.errors.append(IllegalCharacterError(f"<At (Line: {self.line}, Pos: {self.pos - 1}) '{char}'>",
+                                                 self.line, self.pos - 1))
+
+    def tokens(self):
+        """
+        This function returns every token left in the input, up to and
+        including 'EOF', as a TokenBuffer of parallel arrays (see
+        tokenbuffer.tokenize_all()). It is much faster than calling
+        next() for each token. Illegal characters are added to the buffer's
+        errors list and to self.errors; the lexer is at the end of the
+        input afterwards.
+        """
+        from classes.tokenbuffer import tokenize_all  # tokenbuffer imports this module
+
+        text = self.text[self.idx + 1:]
+        if self.reader is not None:
+            text += self.reader.read_all()
+            self.reader = None
+        buffer = tokenize_all(text, self.line, self.pos, self.names)
+        self.errors += buffer.errors
+        self.text = text
+        self.idx = len(text) - 1
+        self.line = buffer.lines[-1]
+        self.pos = buffer.columns[-1]
+        return buffer
+
     def next(self):
         """
         This function is used to find the next lexeme in the
@@ -51,106 +159,90 @@ class Lexer:
 
         (next() is called to find next lexeme as per requirements)
 
-        Returns an error if there are any characters detected which
-        are not allowed or encoded in this function. It stops looking for tokens
-        once an invalid character is found.
+        Characters which are not allowed or encoded in this function are
+        recorded as IllegalCharacterError in self.errors and skipped, so
+        one pass reports every illegal character.
         """
-        peek = self.next_char()
-        match peek:
-            case peek if peek.isalpha() and peek != 'EOF':
-                word = ''
-                while peek.isalpha() or peek == '_' or peek.isdigit():
-                    word += peek
-                    peek = self.next_char()
-                    if peek == 'EOF':
-                        break
-                self.idx -= 1
-                self.pos -= 1
-                if word not in Lexer.KEYWORDS:
-                    self.token = Token('ID', self.line, self.pos - len(word), word)
-                else:
-                    self.token = Token(word, self.line, self.pos - len(word), word)
-            case peek if peek.isdigit():
-                num = 0
-                digits = 0
-                while peek.isdigit():
-                    num = 10 * num + int(peek, 10)
-                    peek = self.next_char()
-                    digits += 1
-                self.idx -= 1
-                self.pos -= 1
-                self.token = Token('NUM', self.line, self.pos - digits, num)
-            case '/':
-                peek = self.next_char()
-                str_len = 0
-                if peek == '/':
-                    while peek != '\n':
-                        str_len += 1
+        self.token = None
+        while self.token is None:
+            peek = self.skip_trivia()
+            match peek:
+                case peek if peek.isalpha() and peek != 'EOF':
+                    word = ''
+                    while peek.isalpha() or peek == '_' or peek.isdigit():
+                        word += peek
                         peek = self.next_char()
+                        if peek == 'EOF':
+                            break
                     self.idx -= 1
                     self.pos -= 1
-                    self.next()
-                else:
+                    ident = self.names.intern(word)  # also tells keywords apart
+                    word = self.names.names[ident]
+                    if ident >= len(KEYWORDS):
+                        self.token = Token('ID', self.line, self.pos - len(word), word, ident)
+                    else:
+                        self.token = Token(word, self.line, self.pos - len(word), word)
+                case peek if peek.isdigit():
+                    num = 0
+                    digits = 0
+                    while peek.isdigit():
+                        num = 10 * num + int(peek, 10)
+                        peek = self.next_char()
+                        digits += 1
                     self.idx -= 1
                     self.pos -= 1
+                    self.token = Token('NUM', self.line, self.pos - digits, num)
+                case '/':
                     self.token = Token('/', self.line, self.pos - 1, '/')
-            case ':':
-                peek = self.next_char()
-                if peek == '=':
-                    self.token = Token(':=', self.line, self.pos - 2, ':=')
-                else:
-                    self.idx -= 1
-                    self.pos -= 1
-                    self.token = Token(':', self.line, self.pos - 1, ':')
-            case '>':
-                peek = self.next_char()
-                if peek == '=':
-                    self.token = Token('>=', self.line, self.pos - 2, '>=')
-                else:
-                    self.idx -= 1
-                    self.pos -= 1
-                    self.token = Token('>', self.line, self.pos - 1, '>')
-            case '<':
-                peek = self.next_char()
-                if peek == '=':
-                    self.token = Token('<=', self.line, self.pos - 2, '<=')
-                else:
-                    self.idx -= 1
-                    self.pos -= 1
-                    self.token = Token('<', self.line, self.pos - 1, '<')
-            case '!':
-                peek = self.next_char()
-                if peek == '=':
-                    self.token = Token('!=', self.line, self.pos - 2, '!=')
-                else:
-                    print(f'\nError at <(Line: {self.line}, Pos: {self.pos - 2}),',
-                          IllegalCharacterError("'!'>"))
+                case ':':
+                    peek = self.next_char()
+                    if peek == '=':
+                        self.token = Token(':=', self.line, self.pos - 2, ':=')
+                    else:
+                        self.idx -= 1
+                        self.pos -= 1
+                        self.token = Token(':', self.line, self.pos - 1, ':')
+                case '>':
+                    peek = self.next_char()
+                    if peek == '=':
+                        self.token = Token('>=', self.line, self.pos - 2, '>=')
+                    else:
+                        self.idx -= 1
+                        self.pos -= 1
+                        self.token = Token('>', self.line, self.pos - 1, '>')
+                case '<':
+                    peek = self.next_char()
+                    if peek == '=':
+                        self.token = Token('<=', self.line, self.pos - 2, '<=')
+                    else:
+                        self.idx -= 1
+                        self.pos -= 1
+                        self.token = Token('<', self.line, self.pos - 1, '<')
+                case '!':
+                    peek = self.next_char()
+                    if peek == '=':
+                        self.token = Token('!=', self.line, self.pos - 2, '!=')
+                    else:
+                        self.idx -= 1
+                        self.pos -= 1
+                        self.illegal('!')
+                case ';':
+                    self.token = Token(peek, self.line, self.pos - 1, peek)
+                case '(':
+                    self.token = Token(peek, self.line, self.pos - 1, peek)
+                case ')':
+                    self.token = Token(peek, self.line, self.pos - 1, peek)
+                case '+':
+                    self.token = Token(peek, self.line, self.pos - 1, peek)
+                case '-':
+                    self.token = Token(peek, self.line, self.pos - 1, peek)
+                case '*':
+                    self.token = Token(peek, self.line, self.pos - 1, peek)
+                case '=':
+                    self.token = Token(peek, self.line, self.pos - 1, peek)
+                case 'EOF':
                     self.token = Token('EOF', self.line, self.pos - 1, 'EOF')
-            case ';':
-                self.token = Token(peek, self.line, self.pos - 1, peek)
-            case '(':
-                self.token = Token(peek, self.line, self.pos - 1, peek)
-            case ')':
-                self.token = Token(peek, self.line, self.pos - 1, peek)
-            case '+':
-                self.token = Token(peek, self.line, self.pos - 1, peek)
-            case '-':
-                self.token = Token(peek, self.line, self.pos - 1, peek)
-            case '*':
-                self.token = Token(peek, self.line, self.pos - 1, peek)
-            case '=':
-                self.token = Token(peek, self.line, self.pos - 1, peek)
-            case '\n':
-                self.line += 1
-                self.pos = 0
-                return self.next()
-            case peek if peek.isspace():
-                return self.next()
-            case 'EOF':
-                self.token = Token('EOF', self.line, self.pos - 1, 'EOF')
-            case _:
-                print(f'\nError at <(Line: {self.line}, Pos: {self.pos - 1}),',
-                      IllegalCharacterError("'" + peek + "'>"))
-                self.token = Token('EOF', self.line, self.pos - 1, 'EOF')
+                case _:
+                    self.illegal(peek)
 
         return self.token
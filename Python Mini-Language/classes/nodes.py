@@ -0,0 +1,142 @@
+##########################
+# AST NODES
+##########################
+
+
+"""
+These classes are the nodes of the abstract syntax tree built by the
+parser. Every node keeps the line and position of the token it starts
+at, like a Token does.
+
+Each class lists its children in 'fields' and uses __slots__, so a
+node costs a few pointers instead of a dict.
+
+Bodies and statements also have 'start' and 'end' slots: the index of
+their first token and of the token after them, and 'panics': whether
+the parser was recovering from an error before and after them. Bodies
+have 'moves' too, the moves still to be applied to their statements.
+Only the incremental parser (classes/incremental.py) sets them.
+"""
+
+
+class Node:
+    __slots__ = ('line', 'position_')
+    fields = ()
+
+    def __init__(self, line, position, *values):
+        self.line = line
+        self.position_ = position
+        for field, value in zip(self.fields, values):
+            setattr(self, field, value)
+
+    def __repr__(self):
+        values = ', '.join(f'{field}={getattr(self, field)!r}' for field in self.fields)
+        return f'{type(self).__name__}({values})'
+
+    def __eq__(self, other):
+        return type(self) is type(other) and \
+            self.line == other.line and self.position_ == other.position_ and \
+            all(getattr(self, field) == getattr(other, field) for field in self.fields)
+
+    __hash__ = None
+
+    def position(self):
+        """
+        This function returns the position of the node in the text,
+        formatted like Token.position().
+        """
+        return f'(Line: {self.line}, Pos: {self.position_})'
+
+
+class Program(Node):
+    """
+    Program  =  "program"  Identifier  ":"  Body  "end"
+    """
+    fields = ('name', 'body')
+    __slots__ = fields
+
+
+class Body(Node):
+    """
+    Body  =  [ Declarations ]  Statements
+    """
+    fields = ('declarations', 'statements')
+    __slots__ = fields + ('start', 'end', 'panics', 'moves')
+
+
+class Declaration(Node):
+    """
+    Declaration  =  ( "bool" | "int" )  Identifier ";"
+
+    'ident' is the InternTable id of the name and 'slot' the frame index
+    given to the variable before execution.
+    """
+    fields = ('type_', 'name')
+    __slots__ = fields + ('ident', 'slot')
+
+
+class Assign(Node):
+    """
+    AssignmentStatement  =  Identifier ":=" Expression
+    """
+    fields = ('target', 'value')
+    __slots__ = fields + ('start', 'end', 'panics')
+
+
+class If(Node):
+    """
+    ConditionalStatement  =  "if"  Expression  "then"  Body  [ "else" Body ]  "fi"
+    """
+    fields = ('condition', 'then_body', 'else_body')
+    __slots__ = fields + ('start', 'end', 'panics')
+
+
+class While(Node):
+    """
+    IterativeStatement  =  "while"  Expression  "do"  Body  "od"
+    """
+    fields = ('condition', 'body')
+    __slots__ = fields + ('start', 'end', 'panics')
+
+
+class Print(Node):
+    """
+    PrintStatement  =  "print"  Expression
+    """
+    fields = ('value',)
+    __slots__ = fields + ('start', 'end', 'panics')
+
+
+class BinOp(Node):
+    """
+    Relational, additive and multiplicative operators.
+    """
+    fields = ('op', 'left', 'right')
+    __slots__ = fields
+
+
+class UnaryOp(Node):
+    """
+    UnaryOperator  =  "-" | "not"
+    """
+    fields = ('op', 'operand')
+    __slots__ = fields
+
+
+class Literal(Node):
+    """
+    Literal  =  BooleanLiteral  |  IntegerLiteral
+    """
+    fields = ('value',)
+    __slots__ = fields
+
+
+class Name(Node):
+    """
+    Identifier used as a variable.
+
+    'ident' is the InternTable id of the name and 'slot' the frame index
+    of the declaration it refers to.
+    """
+    fields = ('name',)
+    __slots__ = fields + ('ident', 'slot')
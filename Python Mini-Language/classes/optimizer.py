@@ -0,0 +1,216 @@
+# Change this if classes are in different directory
+from classes.nodes import Node, Assign, If, While, Print, BinOp, UnaryOp, Literal, Name
+from classes.interpreter import Resolver, BINARY
+
+######################
+# OPTIMIZER
+######################
+
+
+def count_nodes(node):
+    """
+    Returns the number of nodes in a tree.
+    """
+    count = 1
+    for field in node.fields:
+        value = getattr(node, field)
+        if isinstance(value, list):
+            for child in value:
+                count += count_nodes(child)
+        elif isinstance(value, Node):
+            count += count_nodes(value)
+    return count
+
+
+def is_safe(node):
+    """
+    Returns True if evaluating an expression cannot fail, i.e. it has
+    no division by anything but a non-zero constant. Only such
+    expressions may be dropped without changing what the program does.
+    """
+    kind = type(node)
+    if kind is BinOp:
+        if node.op == '/' and not (type(node.right) is Literal and node.right.value != 0):
+            return False
+        return is_safe(node.left) and is_safe(node.right)
+    if kind is UnaryOp:
+        return is_safe(node.operand)
+    return True
+
+
+def is_dead(node, reads):
+    """
+    Returns True if a statement can be removed without changing what
+    the program does: an assignment to a variable that is never read,
+    or an if whose statements are all dead, with expressions that
+    cannot fail.
+    """
+    kind = type(node)
+    if kind is Assign:
+        return node.target.slot not in reads and is_safe(node.value)
+    if kind is If:
+        return is_safe(node.condition) and \
+            all(is_dead(statement, reads) for statement in node.then_body.statements) and \
+            (node.else_body is None or all(is_dead(statement, reads) for statement in node.else_body.statements))
+    return False
+
+
+class Optimizer:
+    """
+    This class rewrites a program tree that passed the semantic checks
+    so it does less work when it is run or compiled, without changing
+    what it prints (or the division by zero it stops at):
+
+    - constant expressions are folded with the Interpreter's operators
+      (division rounds toward zero; division by zero is left in place),
+      and 'and'/'or'/'+'/'*' with a constant operand are simplified;
+    - an if with a constant condition is replaced by the branch taken
+      (its statements, when the branch declares nothing) and a while
+      with a false condition is removed;
+    - assignments to variables that are never read are removed, as are
+      if statements left without statements, when their expressions
+      cannot fail.
+
+    A body always keeps a statement, as the grammar requires: when all
+    of them would be removed, the last one stays (it does nothing).
+
+    optimize() changes the tree in place and returns it; 'removed' is
+    the number of nodes it removed.
+    """
+
+    def __init__(self, program):
+        self.program = program
+        self.removed = 0
+
+    def optimize(self):
+        before = count_nodes(self.program)
+        Resolver(self.program)  # slots tell variables with the same name apart
+        self.body(self.program.body)
+        while self.prune(self.program.body, self.reads()):
+            pass
+        self.removed = before - count_nodes(self.program)
+        return self.program
+
+    def body(self, body):
+        statements = []
+        for statement in body.statements:
+            statements += self.statement(statement)
+        if not statements:
+            statements = body.statements[-1:]  # removed, so it does nothing
+        body.statements = statements
+
+    def statement(self, node):
+        """
+        Optimizes a statement and returns the statements that replace it.
+        """
+        kind = type(node)
+        if kind is Assign or kind is Print:
+            node.value = self.expr(node.value)
+        elif kind is While:
+            node.condition = self.expr(node.condition)
+            if type(node.condition) is Literal and node.condition.value is False:
+                return []
+            self.body(node.body)
+        elif kind is If:
+            node.condition = self.expr(node.condition)
+            if type(node.condition) is not Literal:
+                self.body(node.then_body)
+                if node.else_body is not None:
+                    self.body(node.else_body)
+                return [node]
+            body = node.then_body if node.condition.value else node.else_body
+            if body is None:
+                return []
+            self.body(body)
+            if not body.declarations:
+                return body.statements
+            # The branch keeps its own scope.
+            node.condition.value = True
+            node.then_body = body
+            node.else_body = None
+        return [node]
+
+    def expr(self, node):
+        """
+        Returns a folded copy of an expression (or the same node).
+        """
+        kind = type(node)
+        if kind is UnaryOp:
+            node.operand = operand = self.expr(node.operand)
+            if type(operand) is Literal:
+                value = -operand.value if node.op == '-' else not operand.value
+                return Literal(node.line, node.position_, value)
+            return node
+        if kind is not BinOp:
+            return node
+
+        node.left = left = self.expr(node.left)
+        node.right = right = self.expr(node.right)
+        op = node.op
+        if type(left) is Literal and type(right) is Literal:
+            if op == 'and':
+                value = left.value and right.value
+            elif op == 'or':
+                value = left.value or right.value
+            elif op == '/' and right.value == 0:
+                return node  # fails when run
+            else:
+                value = BINARY[op](left.value, right.value)
+            return Literal(node.line, node.position_, value)
+        if type(left) is Literal:
+            value = left.value
+            if op == 'and':
+                return left if value is False else right
+            if op == 'or':
+                return left if value is True else right
+            if op == '+' and value == 0 or op == '*' and value == 1:
+                return right
+        elif type(right) is Literal:
+            value = right.value
+            if op == 'and' and value is True or op == 'or' and value is False:
+                return left
+            if op in ('+', '-') and value == 0 or op in ('*', '/') and value == 1:
+                return left
+        return node
+
+    def reads(self):
+        """
+        Returns the slots of the variables read anywhere in the program.
+        """
+        reads = set()
+        nodes = [self.program.body]
+        while nodes:
+            node = nodes.pop()
+            kind = type(node)
+            if kind is Name:
+                reads.add(node.slot)
+            elif kind is Assign:
+                nodes.append(node.value)  # the target is written, not read
+            else:
+                for field in node.fields:
+                    value = getattr(node, field)
+                    if isinstance(value, list):
+                        nodes += value
+                    elif isinstance(value, Node):
+                        nodes.append(value)
+        return reads
+
+    def prune(self, body, reads):
+        """
+        Removes dead statements from a body and the bodies in it. Returns
+        True if something was removed.
+        """
+        statements = [node for node in body.statements if not is_dead(node, reads)]
+        if not statements:
+            statements = body.statements[-1:]
+        removed = len(statements) < len(body.statements)
+        for node in statements:
+            kind = type(node)
+            if kind is If:
+                removed |= self.prune(node.then_body, reads)
+                if node.else_body is not None:
+                    removed |= self.prune(node.else_body, reads)
+            elif kind is While:
+                removed |= self.prune(node.body, reads)
+        body.statements = statements
+        return removed
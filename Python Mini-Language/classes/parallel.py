@@ -0,0 +1,454 @@
+# Change this if classes are in different directory
+from classes.fastparser import FastParser, ID, IF, WHILE, FI, OD, END, EOF, SEMICOLON, PROGRAM, COLON
+from classes.tokenbuffer import tokenize_all
+from classes.scanner import Scanner
+from classes.nodes import Program, Body, Declaration, Assign, If, While, Print, BinOp, UnaryOp, Literal, Name
+from classes.source import ChunkReader
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from contextlib import contextmanager
+import gc
+import marshal
+import os
+
+######################
+# PARALLEL PARSING
+######################
+
+
+MIN_BYTES = 1 << 20  # smaller sources are parsed in one piece
+CHUNKS_PER_JOB = 4  # pieces per worker, so a slow piece does not hold up the others
+
+"""
+Workers send statements back as a flat list in postfix order: the
+children of a node come before it, and every node is four items, its
+code, line, position and one value:
+
+NAME name, LITERAL value, UNARY op, BINARY op, ASSIGN -, PRINT -,
+WHILE -, IF has-else, DECLARATION (type, name), BODY declarations
+count * SHIFT + statements count.
+
+marshal writes such a list quickly and rebuild() turns it back into
+nodes in one loop, without the per-node calls of cache.decode_node().
+"""
+
+NAME, LITERAL, UNARY, BINARY, ASSIGN, PRINT, WHILE_NODE, IF_NODE, DECLARATION, BODY = range(10)
+SHIFT = 1 << 32
+
+
+@contextmanager
+def paused_gc():
+    """
+    Turns off the cyclic garbage collector for a block. Trees have no
+    cycles, but building millions of nodes otherwise sets off collections
+    that scan every node built so far, again and again.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def read_shared(name, start, end):
+    """
+    Returns bytes start to end of the shared memory block 'name' as text.
+    """
+    memory = shared_memory.SharedMemory(name)
+    try:
+        return bytes(memory.buf[start:end]).decode('utf-8')
+    finally:
+        memory.close()
+
+
+def byte_offsets(text, offsets, base):
+    """
+    Turns ascending character offsets in 'text' into byte offsets in its
+    UTF-8 encoding, plus 'base'.
+    """
+    if text.isascii():
+        return [base + offset for offset in offsets]
+    result = []
+    position = 0
+    byte = base
+    for offset in offsets:
+        byte += len(text[position:offset].encode('utf-8'))
+        position = offset
+        result.append(byte)
+    return result
+
+
+def scan_range(name, start, end):
+    """
+    Scans bytes start to end of the shared memory block 'name'. Both are
+    at the start of a line, and tokens never span lines, so the range
+    scans the same as it does in the whole source.
+
+    Returns (depth, low, ends): the if/while nesting depth at the end of
+    the range and the lowest depth reached in it, both counted from 0 at
+    its start, and the byte offsets just after the ';' found at that
+    lowest depth. Only those can end top-level statements, and only if
+    the range starts at depth -low. Returns None if the range has an
+    illegal character.
+    """
+    text = read_shared(name, start, end)
+    buffer = tokenize_all(text)
+    if buffer.errors:
+        return None
+    starts = buffer.starts
+    depth = low = 0
+    ends = []
+    for index, kind in enumerate(buffer.kinds):
+        if kind == IF or kind == WHILE:
+            depth += 1
+        elif kind == FI or kind == OD:
+            depth -= 1
+            if depth < low:
+                low = depth
+                ends = []
+        elif kind == SEMICOLON and depth == low:
+            ends.append(starts[index] + 1)
+    return depth, low, byte_offsets(text, ends, start)
+
+
+def parse_chunk(name, start, end, line, column, last):
+    """
+    Parses the statements in bytes start to end of the shared memory
+    block 'name'. They must each end with ';', except the last one of the
+    'last' chunk, which ends with the "end" of the program. 'line' and
+    'column' are where the chunk starts in the source.
+
+    Returns the statements as a flatten() list written with marshal, or
+    None if anything in the chunk is not a well formed statement (the
+    caller then parses the whole source again).
+    """
+    text = read_shared(name, start, end)
+    with paused_gc():
+        return parse_text(text, line, column, last)
+
+
+def parse_text(text, line, column, last):
+    """
+    The part of parse_chunk() after the text is read.
+    """
+    buffer = tokenize_all(text, line, column)
+    if buffer.errors:
+        return None
+    parser = FastParser(buffer)
+    kinds = parser.kinds
+    statements = []
+    try:
+        while True:
+            statements.append(parser.statement())
+            if parser.errors:
+                return None
+            if parser.kind == SEMICOLON:
+                parser.advance()
+                if parser.kind == EOF:
+                    if last:
+                        return None
+                    break
+            elif parser.kind == END and kinds[parser.index + 1] == EOF and last:
+                break
+            else:
+                return None
+        flat = []
+        for statement in statements:
+            flatten(statement, flat)
+        return marshal.dumps(flat)
+    except (RecursionError, ValueError):  # nested too deeply for the parser or for marshal
+        return None
+
+
+def flatten(node, flat):
+    """
+    Appends a node and its children to 'flat' in postfix order.
+    """
+    kind = type(node)
+    if kind is Name:
+        flat += (NAME, node.line, node.position_, node.name)
+    elif kind is Literal:
+        flat += (LITERAL, node.line, node.position_, node.value)
+    elif kind is BinOp:
+        flatten(node.left, flat)
+        flatten(node.right, flat)
+        flat += (BINARY, node.line, node.position_, node.op)
+    elif kind is UnaryOp:
+        flatten(node.operand, flat)
+        flat += (UNARY, node.line, node.position_, node.op)
+    elif kind is Assign:
+        flatten(node.target, flat)
+        flatten(node.value, flat)
+        flat += (ASSIGN, node.line, node.position_, None)
+    elif kind is Print:
+        flatten(node.value, flat)
+        flat += (PRINT, node.line, node.position_, None)
+    elif kind is While:
+        flatten(node.condition, flat)
+        flatten(node.body, flat)
+        flat += (WHILE_NODE, node.line, node.position_, None)
+    elif kind is If:
+        flatten(node.condition, flat)
+        flatten(node.then_body, flat)
+        if node.else_body is not None:
+            flatten(node.else_body, flat)
+        flat += (IF_NODE, node.line, node.position_, node.else_body is not None)
+    elif kind is Declaration:
+        flat += (DECLARATION, node.line, node.position_, (node.type_, node.name))
+    else:
+        for declaration in node.declarations:
+            flatten(declaration, flat)
+        for statement in node.statements:
+            flatten(statement, flat)
+        flat += (BODY, node.line, node.position_, len(node.declarations) * SHIFT + len(node.statements))
+
+
+def rebuild(flat, names, stack):
+    """
+    Rebuilds the nodes of a list written by flatten() and pushes the
+    top-level ones on 'stack'. Names are interned in 'names', the
+    InternTable of the tree they join.
+    """
+    new = object.__new__
+    push = stack.append
+    pop = stack.pop
+    ids = names.ids
+    intern = names.intern
+    strings = names.names
+    for code, line, position, value in zip(flat[0::4], flat[1::4], flat[2::4], flat[3::4]):
+        if code == NAME:
+            node = new(Name)
+            ident = ids.get(value)
+            if ident is None:
+                ident = intern(value)
+            node.name = strings[ident]
+            node.ident = ident
+        elif code == LITERAL:
+            node = new(Literal)
+            node.value = value
+        elif code == BINARY:
+            node = new(BinOp)
+            node.op = value
+            node.right = pop()
+            node.left = pop()
+        elif code == UNARY:
+            node = new(UnaryOp)
+            node.op = value
+            node.operand = pop()
+        elif code == ASSIGN:
+            node = new(Assign)
+            node.value = pop()
+            node.target = pop()
+        elif code == PRINT:
+            node = new(Print)
+            node.value = pop()
+        elif code == WHILE_NODE:
+            node = new(While)
+            node.body = pop()
+            node.condition = pop()
+        elif code == IF_NODE:
+            node = new(If)
+            node.else_body = pop() if value else None
+            node.then_body = pop()
+            node.condition = pop()
+        elif code == DECLARATION:
+            node = new(Declaration)
+            node.type_, name = value
+            node.ident = intern(name)
+            node.name = strings[node.ident]
+        else:
+            node = new(Body)
+            declarations, statements = divmod(value, SHIFT)
+            node.statements = stack[len(stack) - statements:]
+            del stack[len(stack) - statements:]
+            node.declarations = stack[len(stack) - declarations:]
+            del stack[len(stack) - declarations:]
+        node.line = line
+        node.position_ = position
+        push(node)
+
+
+class ParallelParser:
+    """
+    This class parses one large program on several cores and returns the
+    same tree and diagnostics as the Parser.
+
+    The UTF-8 source is put in shared memory and read from there by a
+    process pool of 'jobs' workers, in two rounds:
+
+    1. Each worker scans a range of whole lines and reports the ';' that
+       may end top-level statements (the ones not inside an if or a
+       while) with the if/fi and while/od depth of its range; the parent
+       adds up the depths to find the ones that do.
+    2. Each worker parses a run of top-level statements between two of
+       those ';' and sends the nodes back (see flatten()).
+
+    The parent parses the header and the declarations and puts the
+    statements returned by the workers in order in the top-level body.
+
+    Sources under 'min_bytes', and sources with any lexical or syntax
+    error, are parsed in one piece by the FastParser, so diagnostics are
+    exactly those of a sequential parse. 'parallel' tells which way the
+    last program() went. The garbage collector is paused while parsing,
+    in the parent and in the workers.
+    """
+
+    def __init__(self, source, jobs=None, min_bytes=MIN_BYTES, executor=None):
+        self.text = source if isinstance(source, str) else ChunkReader(source).read_all()
+        self.jobs = jobs or os.cpu_count() or 1
+        self.min_bytes = min_bytes
+        self.executor = executor
+        self.diagnostics = []
+        self.parallel = False
+
+    def program(self):
+        with paused_gc():
+            return self.parse()
+
+    def parse(self):
+        tree = None
+        if len(self.text) >= self.min_bytes and self.jobs > 1:
+            tree = self.parse_parallel()
+        self.parallel = tree is not None
+        if tree is None:
+            parser = FastParser(self.text)
+            tree = parser.program()
+            self.diagnostics = parser.diagnostics
+        else:
+            self.diagnostics = []
+        return tree
+
+    def header(self):
+        """
+        Parses "program" ID ":" and the declarations. Returns the
+        FastParser that did it, the declarations and the offset of the
+        first statement, or None if they are not well formed.
+        """
+        text = self.text
+        scanner = Scanner(text)
+        for kind in ('program', 'ID', ':'):
+            if scanner.next().type_ != kind:
+                return None
+        token = scanner.next()
+        while token.type_ == 'int' or token.type_ == 'bool':
+            if scanner.next().type_ != 'ID' or scanner.next().type_ != ';':
+                return None
+            token = scanner.next()
+        if scanner.errors or token.type_ == 'EOF':
+            return None
+        first = scanner.start
+        parser = FastParser(text[:first])
+        parser.match(PROGRAM)
+        parser.match(ID)
+        parser.match(COLON)
+        declarations = []
+        while parser.kind != EOF:
+            declarations.append(parser.declaration())
+        return parser, declarations, len(text[:first].encode('utf-8'))
+
+    def parse_parallel(self):
+        """
+        Returns the tree built from the statements parsed in the process
+        pool, or None if the source has to be parsed in one piece.
+        """
+        header = self.header()
+        if header is None:
+            return None
+        parser, declarations, first = header
+        data = self.text.encode('utf-8')
+        memory = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+        executor = self.executor or ProcessPoolExecutor(self.jobs)
+        try:
+            memory.buf[:len(data)] = data
+            ranges = self.ranges(data)
+            scans = list(executor.map(scan_range, *zip(*[(memory.name, start, end) for start, end in ranges])))
+            ends = self.statement_ends(scans, first)
+            if ends is None:
+                return None
+            chunks = self.chunks(ends, first, len(data))
+            positions = self.positions(data, [start for start, _ in chunks])
+            arguments = [(memory.name, start, end, line, column, end == len(data))
+                         for (start, end), (line, column) in zip(chunks, positions)]
+            results = list(executor.map(parse_chunk, *zip(*arguments)))
+        finally:
+            if executor is not self.executor:
+                executor.shutdown()
+            memory.close()
+            memory.unlink()
+        if any(result is None for result in results):
+            return None
+        statements = []
+        for result in results:
+            rebuild(marshal.loads(result), parser.buffer.names, statements)
+        line, column = (declarations[0].line, declarations[0].position_) if declarations else positions[0]
+        body = Body(line, column, declarations, statements)
+        return Program(parser.lines[0], parser.columns[0], parser.value(1)[0], body)
+
+    def ranges(self, data):
+        """
+        Cuts the source into 'jobs' * CHUNKS_PER_JOB ranges of about the
+        same size, at line breaks, and returns (start, end) for each.
+        """
+        count = self.jobs * CHUNKS_PER_JOB
+        cuts = [0]
+        for index in range(1, count):
+            newline = data.find(b'\n', max(len(data) * index // count, cuts[-1]))
+            if newline == -1:
+                break
+            if newline + 1 > cuts[-1]:
+                cuts.append(newline + 1)
+        if cuts[-1] < len(data):
+            cuts.append(len(data))
+        return list(zip(cuts, cuts[1:]))
+
+    @staticmethod
+    def statement_ends(scans, first):
+        """
+        Returns the byte offsets just after the ';' that end top-level
+        statements, from the results of scan_range(), or None if the
+        nesting does not add up.
+        """
+        ends = []
+        depth = 0
+        for scan in scans:
+            if scan is None:
+                return None
+            change, low, candidates = scan
+            if depth + low < 0:
+                return None
+            if depth + low == 0:
+                ends += candidates
+            depth += change
+        if depth:
+            return None
+        return [end for end in ends if end > first]  # not the ';' of declarations
+
+    def chunks(self, ends, first, size):
+        """
+        Groups the top-level statements into runs of about the same size
+        and returns (start, end) byte offsets for each; the last one runs
+        to the end of the source.
+        """
+        step = max((size - first) // (self.jobs * CHUNKS_PER_JOB), 1)
+        starts = [first]
+        for end in ends:
+            if end - starts[-1] >= step:
+                starts.append(end)
+        return list(zip(starts, starts[1:] + [size]))
+
+    @staticmethod
+    def positions(data, offsets):
+        """
+        Returns the line and column of ascending byte offsets.
+        """
+        positions = []
+        line = 1
+        previous = 0
+        for offset in offsets:
+            line += data.count(b'\n', previous, offset)
+            previous = offset
+            line_start = data.rfind(b'\n', 0, offset) + 1
+            positions.append((line, len(data[line_start:offset].decode('utf-8'))))
+        return positions
@@ -1,14 +1,30 @@
+# Change this if classes are in different directory
+from classes.nodes import Program, Body, Declaration, Assign, If, While, Print, \
+    BinOp, UnaryOp, Literal, Name
+from classes.error import IllegalSyntaxError
+from classes.tokenstream import TokenStream
+
 ######################
 # PARSER
 ######################
 
+SYNC = frozenset([';', 'fi', 'od', 'end', 'EOF'])  # tokens the parser resynchronizes on
+STATEMENT_START = frozenset(['ID', 'if', 'while', 'print'])
+LITERAL_FOLLOW = frozenset([';', '<', '>', '<=', '>=', '!=', '=', '+', '-', 'or', '*', '/', 'and', ')',
+                            'do', 'od', 'fi', 'then', 'else', 'end']) | STATEMENT_START
+
 
 class Parser:
     """
     This class is an implementation of a top-down, predictive, recursive descent parser.
-    It takes tokens returned from the lexer and returns 'True' if the program is accepted
-    by the grammar rules else it will return 'False' and stop parsing while returning the
-    position and error details.
+    It takes tokens returned from the lexer and returns the abstract syntax tree (see
+    classes/nodes.py) if the program is accepted by the grammar rules, else it will
+    return None. Errors are not raised: every problem is recorded in self.diagnostics
+    (with the lexer's illegal characters) with its position and details.
+
+    Recovery is panic mode: after an error, further errors are not reported until the
+    parser has skipped to one of the SYNC tokens (';', 'fi', 'od', 'end'), so a single
+    pass reports every independent error.
 
     Comments are not tokenized in the lexer to simplify the process. That way '//'
     and anything after the symbol is already ignored and will not be parsed.
@@ -16,58 +32,79 @@ class Parser:
 
     def __init__(self, lexer):
         self.lex = lexer
-        self.token = self.lex.next()  # initializing first token
+        self.stream = TokenStream(lexer)  # lookahead over the lexer
+        self.errors = []  # syntax errors
+        self.diagnostics = []  # lexer and syntax errors, set by program()
+        self.panic = False  # True while recovering from an error
+        self.token = self.stream.advance()  # initializing first token
+
+    def report(self, details, token=None):
+        """
+        Records a syntax error at the given (default: current) token and
+        enters panic mode. Errors found while in panic mode are dropped,
+        as they are usually caused by the first one.
+        """
+        if not self.panic:
+            token = token or self.token
+            self.errors.append(IllegalSyntaxError(details, token.line, token.position_))
+            self.panic = True
+
+    def synchronize(self):
+        """
+        Skips tokens until one in SYNC and leaves panic mode.
+        """
+        while self.token.kind() not in SYNC:
+            self.token = self.stream.advance()
+        self.panic = False
 
     def match(self, value):
         """
         Takes a value and matches it to the type of the current token.
-        If it is true it will get the next token and store it in a variable,
-        otherwise it will raise an error with the position and type of token that
-        should have been expected.
-        """
-        scaffold = {}
-        if self.token.kind() == value:
-            scaffold['type'] = self.token.type_
-            scaffold['position'] = self.token.position_
-            scaffold['value'] = self.token.value_
-            self.token = self.lex.next()
-            return scaffold
+        If it is true it will get the next token and return the matched one,
+        otherwise it will report an error with the position and type of token that
+        should have been expected, and return the current token without consuming it.
+        """
+        token = self.token
+        if token.kind() == value:
+            self.token = self.stream.advance()
         else:
-            raise Exception(f'<At {self.token.position()} I see "{self.token.kind()}" but expected "{value}">')
+            self.report(f'<At {token.position()} I see "{token.kind()}" but expected "{value}">')
+        return token
 
     def program(self):
         """
         Program  =  "program"  Identifier  ":"  Body  "end"
         Identifier  =  Letter { Letter | Digit | "_" } <--handled by lexer
         """
-        ast = []
+        start = self.match('program')
+        name = self.match('ID')
+        self.match(':')
         try:
-            ast.append(self.match('program'))
-            ast.append(self.match('ID'))
-            ast.append(self.match(':'))
-            ast.append(self.body())
-            ast.append(self.match('end'))
-            return f'\n{ast}\n\n{True}'
-        except BaseException as err:
-            print(f'\n{err}')
-            return f'\n{False}'
+            body = self.body()
+            self.match('end')
+            if self.token.kind() != 'EOF':
+                self.report(f'<At {self.token.position()} I see "{self.token.kind()}" but expected "EOF">')
+        except RecursionError:
+            self.panic = False
+            self.report(f'<ERROR! at {self.token.position()}. Program is nested too deeply>')
+        while self.token.kind() != 'EOF':  # the rest is read too, so its illegal characters are reported
+            self.token = self.stream.advance()
+        self.diagnostics = sorted(self.lex.errors + self.errors, key=lambda error: (error.line, error.position_))
+        if self.diagnostics:
+            return None
+        return Program(start.line, start.position_, name.value_, body)
 
     def body(self):
         """
         Body  =  [ Declarations ]  Statements
         """
-        values = []
+        start = self.token
+        declarations = []
         if self.token.kind() in ('bool', 'int'):
-            values.append({
-                'type': "Body",
-                'value': self.declarations()
-            })
-        values.append({
-            'type': "Body",
-            'value': self.statements()
-        })
+            declarations = self.declarations()
+        statements = self.statements()
 
-        return values
+        return Body(start.line, start.position_, declarations, statements)
 
     def declarations(self):
         """
@@ -84,22 +121,19 @@ class Parser:
         """
         Declaration  =  ( "bool" | "int" )  Identifier ";"
         """
-        values = []
-        assert self.token.kind() in ('bool', 'int'), \
-            f'<ERROR! at {self.token.position()}. ' \
-            f'Expected "bool" or "int" instead' \
-            f'found {self.token.kind()}>'
-        scaffold = {
-            "type": self.token.type_,
-            "position": self.token.position_,
-            "value": self.token.value_
-        }
-        values.append(scaffold)
-        self.token = self.lex.next()
-        values.append(self.match('ID'))
-        values.append(self.match(';'))
+        self.expected(('bool', 'int'))
+        start = self.token
+        self.token = self.stream.advance()
+        name = self.match('ID')
+        self.match(';')
+        if self.panic:
+            self.synchronize()
+            if self.token.kind() == ';':
+                self.token = self.stream.advance()
 
-        return values
+        node = Declaration(start.line, start.position_, start.type_, name.value_)
+        node.ident = name.ident
+        return node
 
     def statements(self):
         """
@@ -107,12 +141,27 @@ class Parser:
         """
         values = []
         values.append(self.statement())
-        while self.token.kind() == ';':
-            self.token = self.lex.next()
+        while self.next_statement():
             values.append(self.statement())
 
         return values
 
+    def next_statement(self):
+        """
+        The loop condition of statements(): skips the ";" between two
+        statements and returns True when another statement follows.
+        """
+        if self.panic:
+            self.synchronize()
+        if self.token.kind() == ';':
+            self.token = self.stream.advance()
+            return True
+        if self.token.kind() in STATEMENT_START:
+            self.report(f'<ERROR! at {self.token.position()}. Expected ";" but none found.>')
+            self.panic = False  # parse on as if the ";" was there
+            return True
+        return False
+
     def statement(self):
         """
         Statement  =  AssignmentStatement
@@ -120,106 +169,91 @@ class Parser:
                    |  IterativeStatement
                    |  PrintStatement
         """
-        scaffold = {}
         if self.token.kind() == 'ID':
-            scaffold = {
-                'type': 'Assignment Statement',
-                'value': self.assignment_statement(),
-            }
+            return self.assignment_statement()
         elif self.token.kind() == 'if':
-            scaffold = {
-                'type': 'Conditional Statement',
-                'value': self.conditional_statement(),
-            }
+            return self.conditional_statement()
         elif self.token.kind() == 'while':
-            scaffold = {
-                'type': 'Iterative Statement',
-                'value': self.iterative_statement(),
-            }
+            return self.iterative_statement()
         elif self.token.kind() == 'print':
-            scaffold = {
-                'type': 'Print Statement',
-                'value': self.print_statement(),
-            }
+            return self.print_statement()
         else:
-            self.expected(('if', 'ID', 'while', 'print'))  # Error is raised here
-        return scaffold
+            self.expected(('if', 'ID', 'while', 'print'))  # Error is reported here
 
     def expected(self, type_list):
         """
         This function takes a list if the token type is not in that list
-        it will raise an error returning the position and details of the
+        it will report an error with the position and details of the
         error.
         """
         if self.token.kind() not in type_list:
-            raise Exception(
+            self.report(
                 f'<ERROR! at {self.token.position()}. Expected to see {type_list}, but see "{self.token.kind()}">')
 
     def assignment_statement(self):
         """
         AssignmentStatement  =  Identifier ":=" Expression
         """
-        values = []
-        assert self.token.kind() == 'ID', f'<Expected "ID" instead found {self.token.kind()}>'
-        values.append(self.match('ID'))
-        values.append(self.match(':='))
-        values.append(self.expr())
-        return values
+        target = self.match('ID')
+        self.match(':=')
+        return Assign(target.line, target.position_, self.name(target), self.expr())
 
     def conditional_statement(self):
         """
         ConditionalStatement  =  "if"  Expression  "then"  Body  [ "else" Body ]  "fi"
         """
-        values = [self.match('if'), self.expr(), self.match('then'), self.body()]
+        start = self.match('if')
+        condition = self.expr()
+        self.match('then')
+        then_body = self.body()
+        else_body = None
         if self.token.kind() == 'else':
-            values.append({
-                'type': self.token.type_,
-                'position': self.token.position_,
-                'value': self.token.value_
-            })
-            self.token = self.lex.next()
-            values.append(self.body())
+            self.token = self.stream.advance()
+            else_body = self.body()
         self.match('fi')
+        return If(start.line, start.position_, condition, then_body, else_body)
 
     def expr(self):
         """
         Expression  =  SimpleExpression [ RelationalOperator SimpleExpression ]
         RelationalOperator  =  "<" | "=<" | "=" | "!=" | ">=" | ">"
+
+        Relational operators do not chain, so this returns at most one
+        BinOp on top of the simple expressions.
         """
-        # value = self.simple_expr()
-        value = {
-            'type': "Expression",
-            'value': self.simple_expr()
-        }
+        value = self.simple_expr()
         if self.token.kind() in ('<', '>', '<=', '>=', '!=', '='):
-            self.token = self.lex.next()
-            # value = self.simple_expr()
-            value = {
-                'type': "Expression",
-                'value': self.simple_expr()
-            }
+            op = self.token
+            self.token = self.stream.advance()
+            value = BinOp(op.line, op.position_, op.value_, value, self.simple_expr())
         return value
 
     def simple_expr(self):
         """
         SimpleExpression  =  Term { AdditiveOperator Term }
         AdditiveOperator  =  "+" | "-" | "or"
+
+        Operators are left associative: a - b - c is (a - b) - c.
         """
         value = self.term()
         while self.token.kind() in ('+', '-', 'or'):
-            self.token = self.lex.next()
-            value = self.term()
+            op = self.token
+            self.token = self.stream.advance()
+            value = BinOp(op.line, op.position_, op.value_, value, self.term())
         return value
 
     def term(self):
         """
         Term  =  Factor { MultiplicativeOperator Factor }
         MultiplicativeOperator  =  "*" | "/" | "and"
+
+        Operators are left associative: a / b * c is (a / b) * c.
         """
         value = self.factor()
         while self.token.kind() in ('*', '/', 'and'):
-            self.token = self.lex.next()
-            value = self.factor()
+            op = self.token
+            self.token = self.stream.advance()
+            value = BinOp(op.line, op.position_, op.value_, value, self.factor())
         return value
 
     def factor(self):
@@ -227,117 +261,78 @@ class Parser:
         Factor  =  [ UnaryOperator ] ( Literal  |  Identifier  | "(" Expression ")" )
         UnaryOperator  =  "-" | "not"
         """
-        values = []
+        op = None
         if self.token.kind() in ('-', 'not'):
-            values.append({
-                "type": self.token.type_,
-                "position": self.token.position_,
-                "value": self.token.value_
-            })
-            self.token = self.lex.next()
+            op = self.token
+            self.token = self.stream.advance()
+        value = None
         if self.token.kind() in ('true', 'false', 'NUM'):
-            values = self.literal()
+            value = self.literal()
         elif self.token.kind() == 'ID':
-            values.append({
-                "type": self.token.type_,
-                "position": self.token.position_,
-                "value": self.token.value_
-            })
-            self.token = self.lex.next()
+            value = self.name(self.token)
+            self.token = self.stream.advance()
         elif self.token.kind() == '(':
-            values.append({
-                "type": self.token.type_,
-                "position": self.token.position_,
-                "value": self.token.value_
-            })
-            self.token = self.lex.next()
-            values.append(self.expr())
-            values.append(self.match(')'))
+            self.token = self.stream.advance()
+            value = self.expr()
+            self.match(')')
         else:
             self.expected(['true', 'false', 'NUM', 'ID', '('])
-        return values
+        if op is not None:
+            value = UnaryOp(op.line, op.position_, op.value_, value)
+        return value
+
+    @staticmethod
+    def name(token):
+        """
+        Returns a Name node for an 'ID' token, with its InternTable id.
+        """
+        node = Name(token.line, token.position_, token.value_)
+        node.ident = token.ident
+        return node
 
     def literal(self):
         """
         Literal  =  BooleanLiteral  |  IntegerLiteral
         IntegerLiteral  =  Digit { Digit } <-- handled by lexer
         """
-        values = []
-        assert self.token.kind() in ('true', 'false', 'NUM'), \
-            f'<ERROR! at {self.token.position()}.' \
-            f'Expected "true" or "false" or "NUM" instead' \
-            f'found {self.token.kind()}>'
         if self.token.kind() == 'NUM':
-            values.append({
-                "type": self.token.type_,
-                "position": self.token.position_,
-                "value": self.token.value_
-            })
-            prev_token = self.token
-            next_token = self.lex.next()
-            if next_token.kind() in (";", '<', '>', '<=', '>=', '!=', '=',
-                                     '+', '-', 'or', '*', '/', 'and', ')',
-                                     'do', 'od', 'fi', 'then'):
-                self.token = next_token
-            else:
-                raise Exception(f'<ERROR! at (Line: {prev_token.line}, Pos: {prev_token.position_ + 1}). '
-                                f'Expected ";" but none found.>')
+            token = self.token
+            # A missing ";" before a statement is reported by statements().
+            if self.stream.peek().kind() not in LITERAL_FOLLOW:
+                self.report(f'<ERROR! at (Line: {token.line}, Pos: {token.position_ + 1}). '
+                            f'Expected ";" but none found.>', token)
+            self.token = self.stream.advance()
+            value = Literal(token.line, token.position_, token.value_)
         else:
-            self.boolean_literal()
-        return values
+            value = self.boolean_literal()
+        return value
 
     def boolean_literal(self):
         """
         BooleanLiteral  =  "false"  |  "true"
         """
-        values = []
-        if self.token.kind() in ('true ', 'false'):
-            values.append({
-                "type": self.token.type_,
-                "position": self.token.position_,
-                "value": self.token.value_
-            })
-            self.token = self.lex.next()
+        token = self.token
+        if token.kind() in ('true', 'false'):
+            self.token = self.stream.advance()
         else:
-            raise Exception(f'<ERROR! at {self.token.position()}. Expected "true" or "false" or "NUM" '
-                            f'instead found {self.token.kind()}>')
-        return values
+            self.report(f'<ERROR! at {token.position()}. Expected "true" or "false" or "NUM" '
+                        f'instead found {token.kind()}>')
+        return Literal(token.line, token.position_, token.kind() == 'true')
 
     def iterative_statement(self):
         """
         IterativeStatement  =  "while"  Expression  "do"  Body  "od"
         """
-        values = []
-        values.append(self.match('while'))
-        values.append(self.expr())
-        values.append(self.match('do'))
-        values.append(self.body())
-        prev_token = self.token
-        values.append(self.match('od'))
-        next_token = self.token
-        if next_token.kind() == ';':
-            values.append({
-                "type": self.token.type_,
-                "position": self.token.position_,
-                "value": self.token.value_
-            })
-            self.token = next_token
-        else:
-            raise Exception(f'<ERROR! at (Line: {prev_token.line}, Pos: {prev_token.position_ + 2}). '
-                            f'Expected ";" but none found.>')
-        return values
+        start = self.match('while')
+        condition = self.expr()
+        self.match('do')
+        body = self.body()
+        self.match('od')
+        return While(start.line, start.position_, condition, body)
 
     def print_statement(self):
         """
         PrintStatement  =  "print"  Expression
         """
-        values = []
-        if self.token.kind() == 'print':
-            values.append({
-                "type": self.token.type_,
-                "position": self.token.position_,
-                "value": self.token.value_
-            })
-            self.token = self.lex.next()
-            self.expr()
-        return values
+        start = self.match('print')
+        return Print(start.line, start.position_, self.expr())
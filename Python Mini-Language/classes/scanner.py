@@ -0,0 +1,259 @@
+# Change this if classes are in different directory
+from classes.token import Token, InternTable, KEYWORDS
+from classes.error import IllegalCharacterError
+from classes.lexer import Lexer
+from classes.source import ChunkReader, CHUNK_SIZE
+import time
+
+###########################
+# SCANNER CLASS
+###########################
+
+
+"""
+Character classes used by the scanner. Every ASCII character is
+classified once when the module is loaded so the scanner only needs
+a tuple lookup per character instead of a chain of string methods.
+"""
+
+OTHER, LETTER, DIGIT, SPACE, NEWLINE, SINGLE, SLASH, COLON, RELATION, BANG = range(10)
+
+
+def classify(char):
+    """
+    Returns the character class of a single character. Used to build
+    the ASCII table and as the fallback for non-ASCII characters, so
+    both paths agree with the str methods used by the Lexer.
+    """
+    if char.isalpha():
+        return LETTER
+    if char.isdigit():
+        return DIGIT
+    if char == '\n':
+        return NEWLINE
+    if char.isspace():
+        return SPACE
+    if char in ';()+-*=':
+        return SINGLE
+    if char == '/':
+        return SLASH
+    if char == ':':
+        return COLON
+    if char in '<>':
+        return RELATION
+    if char == '!':
+        return BANG
+    return OTHER
+
+
+def is_ident_char(char):
+    """
+    Returns True if the character may continue an identifier.
+    """
+    return char.isalpha() or char == '_' or char.isdigit()
+
+
+CHAR_CLASS = tuple(classify(chr(code)) for code in range(128))
+IDENT_CHAR = tuple(is_ident_char(chr(code)) for code in range(128))
+BOUNDARIES = ' \t\r\n;()+-*'  # no token continues across one of these
+
+
+class Scanner:
+    """
+    This class is a single-pass, table-driven alternative to the Lexer.
+
+    Instead of reading one character at a time through next_char() and
+    rewinding after every lookahead, it classifies characters through
+    CHAR_CLASS and slices each lexeme directly out of the source string.
+
+    It has the same next() interface as the Lexer and returns the same
+    Token stream (type, line, position and value) for any input.
+
+    Like the Lexer it also accepts a stream instead of a string. The
+    scanner keeps a window whose tokens are complete up to self.limit,
+    the last token boundary (whitespace or one of ';()+-*') read so far.
+    Once it has scanned up to the limit, the rest of the window (a
+    partial token at most) is carried over and the next chunk is read,
+    so even a source on one long line is never buffered whole. A
+    comment cut off by the window is skipped across chunks.
+
+    If the stream has nothing to read yet (its read() returns None, like
+    a non-blocking stream), next() returns None instead of a token and
+    can be called again once more input has arrived.
+    """
+
+    KEYWORDS = Lexer.KEYWORDS
+
+    def __init__(self, text, chunk_size=CHUNK_SIZE, names=None):
+        if isinstance(text, str):
+            self.text = text
+            self.reader = None
+        else:
+            self.text = ''
+            self.reader = ChunkReader(text, chunk_size)
+        self.limit = len(self.text)  # tokens starting before this index are complete
+        self.offset = 0  # source offset of the first character in the window
+        self.idx = 0
+        self.line = 1
+        self.line_start = 0  # index of the first character of the current line
+        self.start = 0  # index of the first character of the last token
+        self.token = None
+        self.errors = []
+        self.names = InternTable() if names is None else names  # identifier ids
+        self.comment = False  # inside a comment that continues in the next window
+
+    def fill(self, idx):
+        """
+        This function drops the scanned part of the window (everything
+        before idx) and reads chunks until a chunk contains a token
+        boundary or the stream is exhausted. The window ends at the last
+        boundary; the partial token after it is scanned in the next
+        window.
+
+        Returns False if the stream has nothing to read yet; the window
+        then has no complete tokens until the next call.
+        """
+        text = self.text[idx:]
+        self.offset += idx
+        self.line_start -= idx
+        while True:
+            chunk = self.reader.read()
+            if chunk is None:
+                self.text = text
+                self.idx = 0
+                self.limit = 0
+                return False
+            if not chunk:
+                self.reader = None
+                self.limit = len(text)
+                break
+            text += chunk
+            cut = max(chunk.rfind(char) for char in BOUNDARIES)
+            if cut != -1:
+                self.limit = len(text) - len(chunk) + cut
+                break
+        self.text = text
+        self.idx = 0
+        return True
+
+    def next(self):
+        """
+        This function skips whitespace and comments, then scans the next
+        lexeme and returns it as a Token.
+
+        Illegal characters are skipped like whitespace and recorded in
+        self.errors, the same way the Lexer records them.
+        """
+        table = CHAR_CLASS
+        while True:
+            text = self.text
+            limit = self.limit
+            idx = self.idx
+            end = len(text)
+
+            if self.comment:
+                newline = text.find('\n', idx)
+                if newline == -1:
+                    idx = end
+                else:
+                    idx = newline
+                    self.comment = False
+
+            kind = SPACE
+            while idx < limit:
+                char = text[idx]
+                code = ord(char)
+                kind = table[code] if code < 128 else classify(char)
+                if kind == SPACE:
+                    idx += 1
+                elif kind == NEWLINE:
+                    idx += 1
+                    self.line += 1
+                    self.line_start = idx
+                elif kind == SLASH and text.startswith('/', idx + 1):
+                    newline = text.find('\n', idx)
+                    if newline == -1:
+                        idx = end
+                        self.comment = self.reader is not None
+                    else:
+                        idx = newline
+                elif kind == OTHER or (kind == BANG and not text.startswith('=', idx + 1)):
+                    self.errors.append(IllegalCharacterError(
+                        f"<At (Line: {self.line}, Pos: {idx - self.line_start}) '{char}'>",
+                        self.line, idx - self.line_start))
+                    idx += 1
+                else:
+                    break
+
+            if idx < limit or self.reader is None:
+                break
+            if not self.fill(idx):
+                return None
+
+        start = idx
+        column = start - self.line_start
+        line = self.line
+
+        if idx >= end:
+            self.token = Token('EOF', line, column, 'EOF')
+        elif kind == LETTER:
+            ident = IDENT_CHAR
+            idx += 1
+            while idx < end:
+                code = ord(text[idx])
+                if code < 128:
+                    if not ident[code]:
+                        break
+                elif not is_ident_char(text[idx]):
+                    break
+                idx += 1
+            ident = self.names.intern(text[start:idx])
+            word = self.names.names[ident]
+            if ident >= len(KEYWORDS):
+                self.token = Token('ID', line, column, word, ident)
+            else:
+                self.token = Token(word, line, column, word)
+        elif kind == DIGIT:
+            idx += 1
+            while idx < end and text[idx].isdigit():
+                idx += 1
+            self.token = Token('NUM', line, column, int(text[start:idx], 10))
+        elif kind == SINGLE or kind == SLASH:
+            idx += 1
+            self.token = Token(text[start], line, column, text[start])
+        elif kind == COLON or kind == RELATION:
+            lexeme = text[start:start + 2] if text.startswith('=', start + 1) else text[start]
+            idx = start + len(lexeme)
+            self.token = Token(lexeme, line, column, lexeme)
+        else:
+            idx += 2
+            self.token = Token('!=', line, column, '!=')
+
+        self.start = start
+        self.idx = idx
+        return self.token
+
+
+def measure_throughput(text, lexer_class=Scanner):
+    """
+    Tokenizes the whole text with the given lexer class and returns
+    the token count, elapsed time and throughput in tokens/sec and
+    MB/sec (1 MB = 1,000,000 bytes of UTF-8 source).
+    """
+    lexer = lexer_class(text)
+    count = 0
+    start_time = time.perf_counter()
+    token = lexer.next()
+    while token.kind() != 'EOF':
+        count += 1
+        token = lexer.next()
+    seconds = time.perf_counter() - start_time
+
+    size = len(text.encode('utf-8'))
+    return {
+        'tokens': count,
+        'bytes': size,
+        'seconds': seconds,
+        'tokens_per_sec': count / seconds if seconds else float('inf'),
+        'mb_per_sec': size / 1_000_000 / seconds if seconds else float('inf'),
+    }
@@ -0,0 +1,113 @@
+# Change this if classes are in different directory
+from classes.nodes import Assign, If, While, Print, UnaryOp, Literal, Name
+from classes.symbol import SymbolTable
+from classes.error import SemanticError
+
+######################
+# SEMANTIC CHECKS
+######################
+
+
+"""
+Operand and result types of the operators. Relational operators other
+than '=' and '!=' only compare integers; '=' and '!=' compare any two
+values of the same type.
+"""
+
+BINARY_TYPES = {
+    '+': ('int', 'int'), '-': ('int', 'int'), '*': ('int', 'int'), '/': ('int', 'int'),
+    'and': ('bool', 'bool'), 'or': ('bool', 'bool'),
+    '<': ('int', 'bool'), '>': ('int', 'bool'), '<=': ('int', 'bool'), '>=': ('int', 'bool'),
+}
+
+UNARY_TYPES = {'-': 'int', 'not': 'bool'}
+
+
+class Checker:
+    """
+    This class checks a program tree returned by Parser.program() without
+    running it. It reports undeclared names, names declared twice in the
+    same body and int/bool type mismatches.
+
+    Every problem is added to 'errors' as a SemanticError, so one pass
+    finds all of them.
+    """
+
+    def __init__(self, program):
+        self.symbols = SymbolTable()
+        self.errors = []
+        self.check_body(program.body)
+
+    def error(self, node, details):
+        self.errors.append(SemanticError(f'<At {node.position()} {details}>', node.line, node.position_))
+
+    def check_body(self, body):
+        """
+        Declares the body's variables in a new scope and checks its
+        statements.
+        """
+        self.symbols.enter()
+        for declaration in body.declarations:
+            if self.symbols.declare(declaration.ident, declaration.name, declaration.type_) is None:
+                self.error(declaration, f'"{declaration.name}" is already declared in this body')
+        for statement in body.statements:
+            self.check(statement)
+        self.symbols.exit()
+
+    def check(self, node):
+        """
+        Checks a statement.
+        """
+        kind = type(node)
+        if kind is Assign:
+            target = self.expr(node.target)
+            value = self.expr(node.value)
+            if target is not None and value is not None and target != value:
+                self.error(node, f'cannot assign a "{value}" value to "{node.target.name}" ("{target}")')
+        elif kind is If:
+            self.condition(node.condition)
+            self.check_body(node.then_body)
+            if node.else_body is not None:
+                self.check_body(node.else_body)
+        elif kind is While:
+            self.condition(node.condition)
+            self.check_body(node.body)
+        elif kind is Print:
+            self.expr(node.value)
+
+    def condition(self, node):
+        type_ = self.expr(node)
+        if type_ is not None and type_ != 'bool':
+            self.error(node, f'expected a "bool" condition but found "{type_}"')
+
+    def expr(self, node):
+        """
+        Checks an expression and returns its type, or None if the type
+        is unknown because of an earlier error.
+        """
+        kind = type(node)
+        if kind is Name:
+            symbol = self.symbols.lookup(node.ident)
+            if symbol is None:
+                self.error(node, f'"{node.name}" is not declared')
+                return None
+            return symbol.type_
+        if kind is Literal:
+            return 'bool' if isinstance(node.value, bool) else 'int'
+        if kind is UnaryOp:
+            operand = self.expr(node.operand)
+            expected = UNARY_TYPES[node.op]
+            if operand is not None and operand != expected:
+                self.error(node, f'"{node.op}" expects "{expected}" but found "{operand}"')
+            return expected
+        left = self.expr(node.left)
+        right = self.expr(node.right)
+        if node.op in BINARY_TYPES:
+            expected, result = BINARY_TYPES[node.op]
+            for operand in (left, right):
+                if operand is not None and operand != expected:
+                    self.error(node, f'"{node.op}" expects "{expected}" but found "{operand}"')
+            return result
+        if left is not None and right is not None and left != right:
+            self.error(node, f'cannot compare "{left}" with "{right}"')
+        return 'bool'
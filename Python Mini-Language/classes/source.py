@@ -0,0 +1,76 @@
+import codecs
+import time
+
+###########################
+# SOURCE READER
+###########################
+
+CHUNK_SIZE = 1 << 16  # characters (or bytes) read from a stream at a time
+POLL_DELAY = 0.001  # seconds between two reads of a stream that has nothing yet
+
+
+class ChunkReader:
+    """
+    This class reads a source stream in fixed-size chunks and returns
+    them as strings.
+
+    The stream can be a text stream, a binary stream or a memory-mapped
+    file (anything with a read(size) method). Binary input is decoded
+    as UTF-8 incrementally, so a character split across two chunks is
+    returned whole in the second one.
+
+    Like a non-blocking stream, the stream may return None when nothing
+    has arrived yet; read() then returns None as well. Callers that need
+    the data now use read_blocking(), which polls until it comes.
+    """
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = None
+        self.done = False
+
+    def read(self):
+        """
+        Returns the next chunk of text, '' once the stream is exhausted,
+        or None if the stream has nothing to read yet.
+        """
+        while not self.done:
+            chunk = self.stream.read(self.chunk_size)
+            if chunk is None:
+                return None
+            if isinstance(chunk, str):
+                if chunk:
+                    return chunk
+                self.done = True
+            else:
+                if self.decoder is None:
+                    self.decoder = codecs.getincrementaldecoder('utf-8')()
+                text = self.decoder.decode(chunk, final=not chunk)
+                if not chunk:
+                    self.done = True
+                if text:
+                    return text
+        return ''
+
+    def read_blocking(self):
+        """
+        Returns the next chunk of text or '' once the stream is exhausted,
+        waiting for a stream that has nothing to read yet.
+        """
+        chunk = self.read()
+        while chunk is None:
+            time.sleep(POLL_DELAY)
+            chunk = self.read()
+        return chunk
+
+    def read_all(self):
+        """
+        Returns the rest of the stream as one string.
+        """
+        chunks = []
+        chunk = self.read_blocking()
+        while chunk:
+            chunks.append(chunk)
+            chunk = self.read_blocking()
+        return ''.join(chunks)
@@ -0,0 +1,155 @@
+# Change this if classes are in different directory
+from classes.parser import Parser
+from classes.nodes import Body, If, While, BinOp, UnaryOp
+
+######################
+# EXPLICIT-STACK PARSER
+######################
+
+
+RELATIONAL = frozenset(['<', '>', '<=', '>=', '!=', '='])
+ADDITIVE = frozenset(['+', '-', 'or'])
+MULTIPLICATIVE = frozenset(['*', '/', 'and'])
+
+
+class StackParser(Parser):
+    """
+    This class parses the same grammar as the Parser and returns the same
+    tree and the same diagnostics, but keeps nested bodies and nested
+    parentheses on lists instead of on the Python call stack, so the
+    nesting depth is only limited by memory.
+
+    body() replaces body -> statements -> statement -> conditional or
+    iterative statement -> body, and expr() replaces expr -> simple_expr
+    -> term -> factor -> expr. Both make the same calls to match(),
+    report() and the lexer, in the same order, as the recursive methods.
+    """
+
+    def body(self):
+        """
+        Body  =  [ Declarations ]  Statements
+
+        'bodies' holds [start token, declarations, statements] for every
+        open body and 'statements' holds [start token, condition, then
+        body] for every open if or while statement.
+        """
+        bodies = []
+        statements = []
+        self.open_body(bodies)
+        while True:
+            kind = self.token.kind()
+            if kind == 'if' or kind == 'while':
+                start = self.match(kind)
+                condition = self.expr()
+                self.match('then' if kind == 'if' else 'do')
+                statements.append([start, condition, None])
+                self.open_body(bodies)
+                continue
+            if kind == 'ID':
+                value = self.assignment_statement()
+            elif kind == 'print':
+                value = self.print_statement()
+            else:
+                value = None
+                self.expected(('if', 'ID', 'while', 'print'))
+
+            # Add the statement to its body; a finished body completes the
+            # if or while statement it belongs to, which is added in turn.
+            while True:
+                bodies[-1][2].append(value)
+                if self.next_statement():
+                    break
+                start, declarations, values = bodies.pop()
+                body = Body(start.line, start.position_, declarations, values)
+                if not statements:
+                    return body
+                statement = statements[-1]
+                start, condition, then_body = statement
+                if start.kind() == 'if' and then_body is None and self.token.kind() == 'else':
+                    self.token = self.stream.advance()
+                    statement[2] = body
+                    self.open_body(bodies)
+                    break
+                statements.pop()
+                if start.kind() == 'while':
+                    self.match('od')
+                    value = While(start.line, start.position_, condition, body)
+                else:
+                    self.match('fi')
+                    if then_body is None:
+                        value = If(start.line, start.position_, condition, body, None)
+                    else:
+                        value = If(start.line, start.position_, condition, then_body, body)
+
+    def open_body(self, bodies):
+        """
+        Reads the declarations of a new body and adds it to 'bodies'.
+        """
+        start = self.token
+        declarations = []
+        if self.token.kind() in ('bool', 'int'):
+            declarations = self.declarations()
+        bodies.append([start, declarations, []])
+
+    def expr(self):
+        """
+        Expression  =  SimpleExpression [ RelationalOperator SimpleExpression ]
+
+        'frames' holds one [level, left operand, operator] list for every
+        expression, simple expression and term being read, and one
+        ['(', unary operator] list for every open parenthesis.
+        """
+        frames = [['expr', None, None], ['simple', None, None], ['term', None, None]]
+        while True:
+            # Factor  =  [ UnaryOperator ] ( Literal  |  Identifier  | "(" Expression ")" )
+            op = None
+            if self.token.kind() in ('-', 'not'):
+                op = self.token
+                self.token = self.stream.advance()
+            kind = self.token.kind()
+            if kind == '(':
+                self.token = self.stream.advance()
+                frames += [['(', op], ['expr', None, None], ['simple', None, None], ['term', None, None]]
+                continue
+            value = None
+            if kind in ('true', 'false', 'NUM'):
+                value = self.literal()
+            elif kind == 'ID':
+                value = self.name(self.token)
+                self.token = self.stream.advance()
+            else:
+                self.expected(['true', 'false', 'NUM', 'ID', '('])
+            if op is not None:
+                value = UnaryOp(op.line, op.position_, op.value_, value)
+
+            # Return the value to the frames waiting for it, until one
+            # of them needs another operand.
+            while True:
+                frame = frames[-1]
+                level = frame[0]
+                if level == '(':
+                    self.match(')')
+                    op = frame[1]
+                    if op is not None:
+                        value = UnaryOp(op.line, op.position_, op.value_, value)
+                    frames.pop()
+                    continue
+                op = frame[2]
+                if op is not None:
+                    value = BinOp(op.line, op.position_, op.value_, frame[1], value)
+                    frame[2] = None
+                kind = self.token.kind()
+                if level == 'term' and kind in MULTIPLICATIVE or \
+                        level == 'simple' and kind in ADDITIVE or \
+                        level == 'expr' and op is None and kind in RELATIONAL:
+                    frame[1] = value
+                    frame[2] = self.token
+                    self.token = self.stream.advance()
+                    if level == 'simple':
+                        frames.append(['term', None, None])
+                    elif level == 'expr':
+                        frames += [['simple', None, None], ['term', None, None]]
+                    break
+                frames.pop()
+                if not frames:
+                    return value
@@ -2,9 +2,76 @@
 # SYMBOL TABLE
 #########################
 
-# (Not sure if needed...)
-# (Needs more lines of codes...)
+
+class Symbol:
+    """
+    A declared variable: its name, type ('int' or 'bool'), the frame
+    slot given to it and the depth of the scope it was declared in.
+    """
+    __slots__ = ('name', 'type_', 'slot', 'depth')
+
+    def __init__(self, name, type_, slot=None, depth=0):
+        self.name = name
+        self.type_ = type_
+        self.slot = slot
+        self.depth = depth
+
+    def __repr__(self):
+        return f'Symbol({self.name!r}, {self.type_!r}, slot={self.slot}, depth={self.depth})'
+
+
 class SymbolTable:
-    table = dict()
-    pass
+    """
+    This class is a scoped symbol table with hiding.
+
+    'table' maps the id of each name (see token.InternTable) to the
+    stack of symbols declared with that name, innermost last, so
+    lookup() is an integer-keyed dict access and a peek.
+    'scopes' holds, for every open scope, the ids declared in it, so
+    exit() only pops the stacks of those names instead of copying dicts.
+    """
+
+    def __init__(self):
+        self.table = dict()
+        self.scopes = []
+
+    def enter(self):
+        """
+        Opens a new (innermost) scope.
+        """
+        self.scopes.append([])
+
+    def exit(self):
+        """
+        Closes the innermost scope; the names declared in it stop hiding
+        the outer ones.
+        """
+        for ident in self.scopes.pop():
+            stack = self.table[ident]
+            stack.pop()
+            if not stack:
+                del self.table[ident]
+
+    def declare(self, ident, name, type_, slot=None):
+        """
+        Declares a name (by its InternTable id) in the innermost scope and
+        returns its Symbol. Returns None if the name is already declared
+        in that scope.
+        """
+        depth = len(self.scopes)
+        stack = self.table.get(ident)
+        if stack is None:
+            stack = self.table[ident] = []
+        elif stack[-1].depth == depth:
+            return None
+        symbol = Symbol(name, type_, slot, depth)
+        stack.append(symbol)
+        self.scopes[-1].append(ident)
+        return symbol
 
+    def lookup(self, ident):
+        """
+        Returns the innermost visible Symbol for a name id, or None.
+        """
+        stack = self.table.get(ident)
+        return stack[-1] if stack else None
@@ -1,3 +1,63 @@
+##########################
+# TOKEN KINDS
+##########################
+
+
+"""
+Every token type the lexer can produce, in a fixed order so that
+each kind can be stored as a small integer code (its index).
+"""
+
+KINDS = ('EOF', 'ID', 'NUM',
+         'program', 'int', 'print', 'if', 'then', 'else', 'while', 'do',
+         'od', 'fi', 'bool', 'end', 'true', 'false', 'or', 'and', 'not',
+         ';', '(', ')', '+', '-', '*', '/', '=', ':', ':=',
+         '<', '<=', '>', '>=', '!=')
+
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+KEYWORDS = KINDS[KIND_CODES['program']:KIND_CODES['not'] + 1]
+
+
+##########################
+# INTERN TABLE
+##########################
+
+
+class InternTable:
+    """
+    This class gives every distinct identifier a small integer id, so
+    later stages compare and look up names as integers.
+
+    The keywords are entered first: an id below len(KEYWORDS) is a
+    keyword, so one dict lookup both recognizes a keyword and interns
+    an identifier. 'ids' maps a name to its id and 'names' is the
+    reverse lookup. Tokens and nodes keep the string from 'names', so
+    each distinct name is stored once however often it is used.
+    """
+    __slots__ = ('ids', 'names')
+
+    def __init__(self):
+        self.names = list(KEYWORDS)
+        self.ids = {name: ident for ident, name in enumerate(self.names)}
+
+    def intern(self, name):
+        """
+        Returns the id of a name, adding it if it is new.
+        """
+        ident = self.ids.get(name)
+        if ident is None:
+            ident = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return ident
+
+    def name(self, ident):
+        return self.names[ident]
+
+    def __len__(self):
+        return len(self.names)
+
+
 ##########################
 # TOKEN CLASS
 ##########################
@@ -8,16 +68,20 @@ This class creates a token with type, line position,
 value as attributes.
 
 The methods in this class will return its type, position,
-and value respectively.
+and value respectively. 'ID' tokens also carry the id of their
+name in the lexer's InternTable.
 """
 
 
 class Token(object):
-    def __init__(self, type_, line, position, value):
+    __slots__ = ('type_', 'line', 'position_', 'value_', 'ident')
+
+    def __init__(self, type_, line, position, value, ident=None):
         self.type_ = type_
         self.line = line
         self.position_ = position
         self.value_ = value
+        self.ident = ident  # InternTable id of an 'ID' token
 
     def __repr__(self):
         if self.value_:
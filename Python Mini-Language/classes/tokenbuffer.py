@@ -0,0 +1,197 @@
+# Change this if classes are in different directory
+from classes.token import Token, InternTable, KINDS, KIND_CODES
+from classes.scanner import CHAR_CLASS, IDENT_CHAR, LETTER, DIGIT, SPACE, NEWLINE, SINGLE, SLASH, \
+    COLON, RELATION, BANG, Scanner, classify, is_ident_char
+from classes.error import IllegalCharacterError
+from classes.source import ChunkReader
+from array import array
+
+###########################
+# TOKEN BUFFER CLASS
+###########################
+
+
+KEYWORD_CODES = {word: KIND_CODES[word] for word in Scanner.KEYWORDS}
+KEYWORD_LENGTH = max(len(word) for word in KEYWORD_CODES)
+ASCII_CODES = tuple(KIND_CODES.get(chr(code), 0) for code in range(128))  # one-character kinds
+
+
+class TokenBuffer:
+    """
+    This class stores a token stream in parallel arrays instead of one
+    Token object per lexeme.
+
+    For every token it keeps the kind code (see token.KINDS), the line,
+    the position in the line, the offset of the lexeme in the source and
+    the lexeme length. Values are not stored; they are sliced back out of
+    the source text when a Token view is requested with buffer[i]; the
+    names of 'ID' tokens are interned in 'names' at that point.
+    """
+
+    __slots__ = ('text', 'kinds', 'lines', 'columns', 'starts', 'lengths', 'errors', 'names')
+
+    def __init__(self, text, names=None):
+        self.text = text
+        self.names = InternTable() if names is None else names
+        self.kinds = array('B')
+        self.lines = array('I')
+        self.columns = array('I')
+        self.starts = array('Q')
+        self.lengths = array('I')
+        self.errors = []  # illegal characters found by the scanner
+
+    def append(self, kind, line, column, start, length):
+        """
+        Adds one token to the buffer. kind is an integer code.
+        """
+        self.kinds.append(kind)
+        self.lines.append(line)
+        self.columns.append(column)
+        self.starts.append(start)
+        self.lengths.append(length)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, i):
+        """
+        Returns a Token view of the i-th token. The Token is created on
+        demand and is not kept by the buffer.
+        """
+        kind = KINDS[self.kinds[i]]
+        if kind == 'EOF':
+            value = 'EOF'
+        else:
+            start = self.starts[i]
+            value = self.text[start:start + self.lengths[i]]
+            if kind == 'NUM':
+                value = int(value, 10)
+            elif kind == 'ID':
+                ident = self.names.intern(value)
+                return Token(kind, self.lines[i], self.columns[i], self.names.names[ident], ident)
+        return Token(kind, self.lines[i], self.columns[i], value)
+
+    def __iter__(self):
+        for i in range(len(self.kinds)):
+            yield self[i]
+
+    def nbytes(self):
+        """
+        Returns the number of bytes used by the token arrays.
+        """
+        return sum(column.itemsize * len(column) for column in
+                   (self.kinds, self.lines, self.columns, self.starts, self.lengths))
+
+
+def tokenize_all(source, line=1, column=0, names=None):
+    """
+    Scans a whole source (a string or a stream, read in full) in one
+    loop and returns a TokenBuffer holding every token, including the
+    final 'EOF' token, and the illegal characters found.
+
+    The loop classifies characters like the Scanner but appends kind
+    codes, lines, columns, offsets and lengths straight to the arrays,
+    without a method call or a Token object per token. It reads the
+    text as integer code points (bytes for ASCII text) followed by a
+    NUL sentinel, so inner loops need neither ord() nor bounds checks.
+    'line' and 'column' are where the source starts and 'names' the
+    InternTable of the buffer (for Lexer.tokens()).
+    """
+    if not isinstance(source, str):
+        source = ChunkReader(source).read_all()
+    text = source
+    if text.isascii():
+        data = text.encode('ascii') + b'\0'
+    else:
+        data = memoryview((text + '\0').encode('utf-32-le')).cast('I')
+    buffer = TokenBuffer(text, names)
+    errors = buffer.errors
+    add_kind = buffer.kinds.append
+    add_line = buffer.lines.append
+    add_column = buffer.columns.append
+    add_start = buffer.starts.append
+    add_length = buffer.lengths.append
+    table = CHAR_CLASS
+    ident = IDENT_CHAR
+    single = ASCII_CODES
+    keywords = KEYWORD_CODES
+    id_code = KIND_CODES['ID']
+    num_code = KIND_CODES['NUM']
+    end = len(text)
+    idx = 0
+    line_start = -column
+
+    while True:
+        code = data[idx]
+        if code == 32:  # most common character, skipped before the table lookup
+            idx += 1
+            continue
+        kind = table[code] if code < 128 else classify(chr(code))
+        if kind == SPACE:
+            idx += 1
+            continue
+        if kind == NEWLINE:
+            idx += 1
+            line += 1
+            line_start = idx
+            continue
+        start = idx
+        if kind == LETTER:
+            idx += 1
+            while True:
+                code = data[idx]
+                if code < 128:
+                    if not ident[code]:
+                        break
+                elif not is_ident_char(chr(code)):
+                    break
+                idx += 1
+            kind = keywords.get(text[start:idx], id_code) if idx - start <= KEYWORD_LENGTH else id_code
+        elif kind == DIGIT:
+            idx += 1
+            while True:
+                code = data[idx]
+                if code < 128:
+                    if not 48 <= code <= 57:
+                        break
+                elif not chr(code).isdigit():
+                    break
+                idx += 1
+            kind = num_code
+        elif kind == SINGLE:
+            idx += 1
+            kind = single[code]
+        elif kind == SLASH:
+            if data[idx + 1] == 47:  # '//' comment
+                newline = text.find('\n', idx)
+                idx = end if newline == -1 else newline
+                continue
+            idx += 1
+            kind = single[code]
+        elif kind == COLON or kind == RELATION:
+            if data[idx + 1] == 61:  # '='
+                idx += 2
+                kind = KIND_CODES[text[start:idx]]
+            else:
+                idx += 1
+                kind = single[code]
+        elif kind == BANG and data[idx + 1] == 61:
+            idx += 2
+            kind = KIND_CODES['!=']
+        elif idx >= end:
+            add_kind(KIND_CODES['EOF'])
+            add_line(line)
+            add_column(start - line_start)
+            add_start(start)
+            add_length(0)
+            return buffer
+        else:
+            errors.append(IllegalCharacterError(
+                f"<At (Line: {line}, Pos: {idx - line_start}) '{text[idx]}'>", line, idx - line_start))
+            idx += 1
+            continue
+        add_kind(kind)
+        add_line(line)
+        add_column(start - line_start)
+        add_start(start)
+        add_length(idx - start)
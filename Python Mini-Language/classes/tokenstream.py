@@ -0,0 +1,82 @@
+###########################
+# TOKEN STREAM CLASS
+###########################
+
+
+class TokenStream:
+    """
+    This class sits between a lexer (anything with next() and errors)
+    and the parser and gives it bounded lookahead.
+
+    Tokens are read from the lexer only when they are needed and are
+    kept in a ring buffer: advance() moves to the next token and returns
+    it, and peek(k) returns the token k places after the current one
+    without moving. Slots of consumed tokens are reused, so the buffer
+    only grows when a lookahead is longer than it holds.
+
+    'count' is the number of tokens returned by advance(), so the
+    current token is number count - 1.
+    """
+
+    __slots__ = ('lexer', 'ring', 'mask', 'count', 'filled')
+
+    def __init__(self, lexer, size=8):
+        self.lexer = lexer
+        self.ring = [None] * size  # size must be a power of two
+        self.mask = size - 1
+        self.count = 0
+        self.filled = 0  # tokens read from the lexer
+
+    @property
+    def errors(self):
+        return self.lexer.errors
+
+    def fill(self, index):
+        """
+        Reads tokens from the lexer until token number 'index' is in
+        the buffer.
+        """
+        while self.filled <= index:
+            keep = max(self.count - 1, 0)  # the current token stays available
+            if self.filled - keep > self.mask:
+                self.grow(keep)
+            self.ring[self.filled & self.mask] = self.lexer.next()
+            self.filled += 1
+
+    def grow(self, keep):
+        """
+        Doubles the buffer, keeping the tokens from number 'keep' on.
+        """
+        ring = [None] * (2 * len(self.ring))
+        mask = len(ring) - 1
+        for index in range(keep, self.filled):
+            ring[index & mask] = self.ring[index & self.mask]
+        self.ring = ring
+        self.mask = mask
+
+    def advance(self):
+        """
+        Moves to the next token and returns it.
+        """
+        count = self.count
+        self.count = count + 1
+        if count == self.filled:
+            # No lookahead: the slot of an older token is reused.
+            token = self.ring[count & self.mask] = self.lexer.next()
+            self.filled = count + 1
+            return token
+        if count >= self.filled:
+            self.fill(count)
+        return self.ring[count & self.mask]
+
+    next = advance  # a TokenStream can be used as a lexer
+
+    def peek(self, k=1):
+        """
+        Returns the token k places after the current one (peek(0) is the
+        current token) without moving.
+        """
+        index = self.count - 1 + k
+        if index >= self.filled:
+            self.fill(index)
+        return self.ring[index & self.mask]
@@ -1,5 +1,18 @@
 from classes.lexer import Lexer
 from classes.parser import Parser
+from classes.semantic import Checker
+from classes.interpreter import Interpreter
+from classes.optimizer import Optimizer
+from classes.bytecode import BytecodeCompiler, Bytecode, VM
+from classes.scanner import Scanner, measure_throughput
+from classes.cache import ParseCache, open_cache, MAX_BYTES
+from classes.instrument import Profile
+from classes.export import export_tokens, export_tree
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import argparse
+import glob
+import json
 import os
 import sys
 import time
@@ -37,22 +50,325 @@ def parser_test(text):
     """
     lexer = Lexer(text)
     parser = Parser(lexer)
-    print(parser.program())
+    tree = parser.program()
+    errors = parser.diagnostics
+    if tree is not None:
+        print(f'\n{tree}')
+        errors = Checker(tree).errors  # semantic checks
+    for error in errors:
+        print(f'\n{error}')
+    print(f'\n{tree is not None and not errors}')
+
+
+def interpreter_test(text):
+    """
+    Test interpreter here
+    """
+    tree = Parser(Lexer(text)).program()
+    if tree is not None and not Checker(tree).errors:
+        Interpreter(tree).run()
+
+
+def optimizer_test(text):
+    """
+    Test optimizer here (prints the optimized tree, then runs it)
+    """
+    tree = Parser(Lexer(text)).program()
+    if tree is not None and not Checker(tree).errors:
+        optimizer = Optimizer(tree)
+        print(f'\n{optimizer.optimize()}\n\n{optimizer.removed} nodes removed\n')
+        Interpreter(tree).run()
+
+
+def bytecode_test(text):
+    """
+    Test bytecode compiler and VM here (prints the instructions, then runs them)
+    """
+    tree = Parser(Lexer(text)).program()
+    if tree is not None and not Checker(tree).errors:
+        bytecode = BytecodeCompiler(tree).compile()
+        print(f'\n{bytecode.disassemble()}\n')
+        VM(bytecode).run()
+
+
+def scanner_test(text):
+    """
+    Test scanner here (compares it to the lexer and reports throughput)
+    """
+    lex = Lexer(text)
+    scanner = Scanner(text)
+    expected = lex.next()
+    token = scanner.next()
+    while True:
+        assert (token.kind(), token.line, token.position_, token.value()) == \
+               (expected.kind(), expected.line, expected.position_, expected.value()), \
+            f'<Scanner returned {token.position()} "{token.kind()}" but lexer returned ' \
+            f'{expected.position()} "{expected.kind()}">'
+        if token.kind() == 'EOF':
+            break
+        expected = lex.next()
+        token = scanner.next()
+
+    for name, lexer_class in (('Lexer', Lexer), ('Scanner', Scanner)):
+        stats = measure_throughput(text, lexer_class)
+        print(f'{name : <10}{stats["tokens"]} tokens in {stats["seconds"]:.6f} seconds '
+              f'({stats["tokens_per_sec"]:,.0f} tokens/sec, {stats["mb_per_sec"]:.3f} MB/sec)')
+
+
+def check_file(path, cache=None, max_bytes=MAX_BYTES):
+    """
+    Lexes, parses and checks one file and returns the result as a dict
+    with every error found in 'errors'.
+
+    If 'cache' is a directory, the tokens and the tree are read from a
+    ParseCache there when the file has not changed ('cached' is True).
+    """
+    start_time = time.perf_counter()
+    cached = False
+    try:
+        if cache is None:
+            with open(path) as file:
+                parser = Parser(Lexer(file))
+                tree = parser.program()
+            diagnostics = parser.diagnostics
+        else:
+            with open(path) as file:
+                text = file.read()
+            parse_cache = open_cache(cache, max_bytes)
+            hits = parse_cache.hits
+            _, tree, diagnostics = parse_cache.parse(text)
+            cached = parse_cache.hits > hits
+        errors = [str(error) for error in diagnostics]
+        if tree is not None:
+            errors += [str(error) for error in Checker(tree).errors]
+    except (OSError, UnicodeDecodeError) as err:
+        tree = None
+        errors = [str(err)]
+    return {
+        'path': path,
+        'accepted': tree is not None and not errors,
+        'errors': errors,
+        'cached': cached,
+        'seconds': time.perf_counter() - start_time,
+    }
+
+
+def find_files(patterns, suffix):
+    """
+    Expands files, directories (searched recursively for files ending
+    in 'suffix') and glob patterns into a sorted list of paths.
+    """
+    paths = set()
+    for pattern in patterns:
+        for match in glob.glob(pattern, recursive=True) or [pattern]:
+            if os.path.isdir(match):
+                for folder, _, names in os.walk(match):
+                    paths.update(os.path.join(folder, name) for name in names if name.endswith(suffix))
+            else:
+                paths.add(match)
+    return sorted(paths)
+
+
+def check_files(paths, jobs=None, chunksize=None, cache=None, max_bytes=MAX_BYTES):
+    """
+    Checks the files over a process pool and returns a report dict with
+    the per-file results in input order. 'cache' is an optional
+    ParseCache directory shared by the workers.
+    """
+    check = partial(check_file, cache=cache, max_bytes=max_bytes)
+    jobs = jobs or os.cpu_count() or 1
+    if chunksize is None:
+        chunksize = max(1, min(64, len(paths) // (jobs * 4)))
+    start_time = time.perf_counter()
+    if jobs == 1:
+        results = [check(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(check, paths, chunksize=chunksize))
+    accepted = sum(result['accepted'] for result in results)
+    report = {
+        'files': len(results),
+        'accepted': accepted,
+        'rejected': len(results) - accepted,
+        'jobs': jobs,
+        'seconds': time.perf_counter() - start_time,
+        'results': results,
+    }
+    if cache is not None:
+        # Workers only evict what they know about; trim the whole directory once.
+        parse_cache = ParseCache(cache, max_bytes)
+        parse_cache.trim()
+        hits = sum(result['cached'] for result in results)
+        report['cache'] = {'hits': hits, 'misses': len(results) - hits,
+                           'evictions': parse_cache.evictions, 'bytes': parse_cache.size}
+    return report
+
+
+def profile_files(args):
+    """
+    Parses the files given on the command line with instrumentation
+    and writes the counters as JSON (and the call stacks in collapsed
+    format, for flame graphs, with --collapsed).
+    """
+    profile = Profile()
+    for path in find_files(args.paths, args.suffix):
+        with open(path) as file:
+            profile.parser(Lexer(file)).program()
+    with open(args.profile, 'w') as file:
+        file.write(profile.to_json())
+    if args.collapsed:
+        with open(args.collapsed, 'w') as file:
+            file.write(profile.collapsed())
+    return 0
+
+
+def compile_path(path):
+    """
+    Lexes, parses, checks and compiles one file to bytecode. Returns
+    (bytecode, errors); bytecode is None if there are errors.
+    """
+    with open(path) as file:
+        parser = Parser(Lexer(file))
+        tree = parser.program()
+    errors = parser.diagnostics if tree is None else Checker(tree).errors
+    if errors:
+        return None, errors
+    return BytecodeCompiler(tree).compile(), []
+
+
+def print_rejected(path, errors):
+    print(f'{"REJECT" : <8}{path}')
+    for error in errors:
+        print(f'        {error}')
+
+
+def compile_files(args):
+    """
+    Compiles every accepted file given on the command line to bytecode,
+    written next to it with the suffix '.mlc', and prints the errors of
+    the others. Returns the exit status (1 if any file was rejected).
+    """
+    status = 0
+    for path in find_files(args.paths, args.suffix):
+        bytecode, errors = compile_path(path)
+        if bytecode is None:
+            print_rejected(path, errors)
+            status = 1
+            continue
+        target = os.path.splitext(path)[0] + '.mlc'
+        bytecode.save(target)
+        print(f'{"COMPILE" : <8}{path} -> {target}')
+    return status
+
+
+def export_files(args):
+    """
+    Writes the token stream or the tree of every file given on the
+    command line next to it, as '.tokens' or '.tree' followed by
+    '.jsonl' or, with --binary, '.bin' (see classes/export.py). Files
+    with errors (illegal characters for tokens) are written too, with
+    their errors; the errors are also printed. Returns the exit status (1 if any file has errors).
+    """
+    status = 0
+    suffix = f'.{args.export}' + ('.bin' if args.binary else '.jsonl')
+    for path in find_files(args.paths, args.suffix):
+        target = os.path.splitext(path)[0] + suffix
+        with open(path) as source, open(target, 'wb') as file:
+            if args.export == 'tokens':
+                errors = export_tokens(source, file, args.binary)
+            else:
+                errors = export_tree(source, file, args.binary)
+        if errors:
+            print_rejected(path, errors)
+            status = 1
+        print(f'{"EXPORT" : <8}{path} -> {target}')
+    return status
+
+
+def run_files(args):
+    """
+    Runs the programs given on the command line with the VM. Files
+    ending in '.mlc' are loaded as compiled programs, the others are
+    parsed, checked and compiled first.
+    """
+    for path in find_files(args.paths, args.suffix):
+        if path.endswith('.mlc'):
+            bytecode = Bytecode.load(path)
+        else:
+            bytecode, errors = compile_path(path)
+            if bytecode is None:
+                print_rejected(path, errors)
+                return 1
+        VM(bytecode).run()
+    return 0
+
+
+def batch(args):
+    """
+    Checks every file given on the command line and prints a report.
+    Returns the exit status (1 if any file was rejected).
+    """
+    paths = find_files(args.paths, args.suffix)
+    report = check_files(paths, args.jobs, args.chunksize, args.cache, args.cache_size)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for result in report['results']:
+            print(f'{"ACCEPT" if result["accepted"] else "REJECT" : <8}{result["path"]}')
+            for error in result['errors']:
+                print(f'        {error}')
+        print(f'\n{report["accepted"]} accepted, {report["rejected"]} rejected, '
+              f'{report["files"]} files in {report["seconds"]:.3f} seconds ({report["jobs"]} jobs)')
+        if 'cache' in report:
+            stats = report['cache']
+            print(f'cache: {stats["hits"]} hits, {stats["misses"]} misses, '
+                  f'{stats["evictions"]} evictions, {stats["bytes"]} bytes')
+    return 1 if report['rejected'] else 0
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Lex, parse and check mini-language programs.')
+    parser.add_argument('paths', nargs='*', help='files, directories or glob patterns')
+    parser.add_argument('-j', '--jobs', type=int, help='worker processes (default: CPU count)')
+    parser.add_argument('--chunksize', type=int, help='files sent to a worker at a time')
+    parser.add_argument('--suffix', default='.txt', help='file suffix searched in directories')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--cache', help='directory of a parse cache reused between runs')
+    parser.add_argument('--cache-size', type=int, default=MAX_BYTES, help='parse cache size cap in bytes')
+    parser.add_argument('--profile', help='parse the files with instrumentation and write the counters here (JSON)')
+    parser.add_argument('--collapsed', help='with --profile, also write collapsed call stacks here')
+    parser.add_argument('--compile', action='store_true', help='compile the files to bytecode (.mlc files)')
+    parser.add_argument('--run', action='store_true', help='run the files (source or .mlc) with the VM')
+    parser.add_argument('--export', choices=('tokens', 'tree'), help='write the token stream or the tree of the files')
+    parser.add_argument('--binary', action='store_true', help='with --export, use the binary format instead of JSON lines')
+    args = parser.parse_args()
+    if args.paths and args.compile:
+        return compile_files(args)
+    if args.paths and args.run:
+        return run_files(args)
+    if args.paths and args.export:
+        return export_files(args)
+    if args.paths and args.profile:
+        return profile_files(args)
+    if args.paths:
+        return batch(args)
+
     # while True:  # uncomment and wrap all the code segment below for repeated filename input
     # filename = input('\nEnter filename: ')  # uncomment this and replace string below with 'filename' for input
 
-    with open(os.path.join(sys.path[0], 'examples\\if.txt')) as file:  # change input file here manually
-        text = file.read()
-
-    start_time = time.time()
+    with open(os.path.join(sys.path[0], 'examples', 'if.txt')) as file:  # change input file here manually
+        start_time = time.time()
 
-    # lexer_test(text)      # lexer test
-    parser_test(text)       # parser test
+        # lexer_test(file)              # lexer test (the lexer reads the file in chunks)
+        # scanner_test(file.read())     # scanner test
+        parser_test(file)               # parser test (the lexer reads the file in chunks)
+        # interpreter_test(file)        # interpreter test
+        # optimizer_test(file)          # optimizer test
+        # bytecode_test(file)           # bytecode test
 
     print("\n--- Program finished in %.6s seconds ---" % (time.time() - start_time))  # testing code runtime
+    return 0
 
 
-main()
+if __name__ == '__main__':
+    sys.exit(main())
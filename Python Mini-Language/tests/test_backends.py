@@ -0,0 +1,135 @@
+from classes.lexer import Lexer
+from classes.parser import Parser
+from classes.semantic import Checker
+from classes.interpreter import Interpreter
+from classes.compiler import Compiler, load, compile_source
+from classes.optimizer import Optimizer
+from classes.bytecode import BytecodeCompiler, Bytecode, VM
+from classes.generator import Generator
+import os
+
+import pytest
+
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples')
+STEPS = 2000  # statements a generated program may execute
+LARGEST = 10 ** 30  # values a generated program may compute
+
+
+class TooLong(Exception):
+    pass
+
+
+class LimitedInterpreter(Interpreter):
+    """An Interpreter that gives up on programs that run long or grow huge numbers."""
+
+    def execute(self, node):
+        if self.steps >= STEPS:
+            raise TooLong()
+        Interpreter.execute(self, node)
+
+    def evaluate(self, node):
+        value = Interpreter.evaluate(self, node)
+        if type(value) is int and abs(value) > LARGEST:
+            raise TooLong()
+        return value
+
+
+def parse(text):
+    tree = Parser(Lexer(text)).program()
+    assert tree is not None and not Checker(tree).errors
+    return tree
+
+
+def outcome(run):
+    """
+    Returns the printed lines and the error a program stopped at.
+    """
+    lines = []
+    try:
+        run(lines.append)
+    except TooLong:
+        raise
+    except Exception as err:
+        return lines, str(err)
+    return lines, None
+
+
+def generated(seed):
+    """
+    Returns the first generated program from 'seed' on that finishes
+    quickly, so every backend can run it, and prints something without
+    stopping at a division by zero (the edge cases cover those).
+    """
+    while True:
+        text = Generator(3, 2, seed).text(400)
+        try:
+            lines, error = outcome(lambda output: LimitedInterpreter(parse(text), output).run())
+        except TooLong:
+            lines, error = [], None
+        if lines and error is None:
+            return text
+        seed += 1000
+
+
+def examples():
+    texts = []
+    for name in sorted(os.listdir(EXAMPLES)):
+        with open(os.path.join(EXAMPLES, name)) as file:
+            text = file.read()
+        tree = Parser(Lexer(text)).program()
+        if tree is not None and not Checker(tree).errors:
+            texts.append(text)
+    return texts
+
+
+EDGE_CASES = [
+    'program a: int x; print 1; x := 5 / x; print 2 end',
+    'program a: print 7 / 0 end',
+    'program a: int x; while true do x := x + 1; if x = 3 then print x / (x - 3) fi od end',
+    'program a: print -7 / 2; print 7 / -2; print -7 / -2; print 0 - 7 * 3 end',
+    'program a: print false and (1 / 0 = 1); print true or (1 / 0 = 1) end',
+    'program a: int x; x := 1; if true then int x; x := 2; print x fi; print x end',
+    'program a: int x; bool b; if x = 0 then bool x; x := not b; if x then int b; b := 4; print b fi; '
+    'print x fi; print x; print b end',
+    'program a: int i; int s; while i < 10 do int t; t := i * i; s := s + t; i := i + 1 od; print s end',
+    'program a: int i; while i < 3 do int t; print t; t := 5; i := i + 1 od end',
+    'program a: int i; while i < 3 do i := i + 1; while false do print i od od; print i end',
+    'program a: int x; if false then print 1 fi; x := 2 end',
+    'program a: int x; x := 12345678901234567890 * 98765432109876543210; print x; print x > 0 end',
+]
+
+SOURCES = examples() + EDGE_CASES + [generated(seed) for seed in range(30)]
+
+
+@pytest.mark.parametrize('text', SOURCES)
+def test_backends_print_the_same(text, tmp_path):
+    expected = outcome(lambda output: Interpreter(parse(text), output).run())
+
+    code = Compiler(parse(text)).compile()
+    assert outcome(load(code)) == expected
+    cache = {}
+    assert outcome(compile_source(text, cache)) == expected
+    assert outcome(compile_source(text, cache)) == expected  # from the cache
+    assert list(cache.values()) == [code]
+
+    optimized = Optimizer(parse(text)).optimize()
+    assert outcome(lambda output: Interpreter(optimized, output).run()) == expected
+    assert outcome(lambda output: VM(BytecodeCompiler(optimized).compile(), output).run()) == expected
+
+    bytecode = BytecodeCompiler(parse(text)).compile()
+    assert outcome(lambda output: VM(bytecode, output).run()) == expected
+    path = str(tmp_path / 'program.mlc')
+    bytecode.save(path)
+    loaded = Bytecode.load(path)
+    assert loaded == bytecode
+    assert Bytecode.from_bytes(bytecode.to_bytes()) == bytecode
+    assert outcome(lambda output: VM(loaded, output).run()) == expected
+
+
+def test_compiled_file_must_be_a_program(tmp_path):
+    with pytest.raises(Exception, match='Not a compiled program'):
+        Bytecode.from_bytes(b'program a: print 1 end')
+    data = bytearray(BytecodeCompiler(parse('program a: print 1 end')).compile().to_bytes())
+    with pytest.raises(Exception, match='Not a compiled program'):
+        Bytecode.from_bytes(data[:3])
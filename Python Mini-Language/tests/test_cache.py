@@ -0,0 +1,90 @@
+from classes.lexer import Lexer
+from classes.parser import Parser
+from classes.cache import ParseCache
+import os
+
+import pytest
+
+
+def errors(diagnostics):
+    return [(type(error), error.details, error.line, error.position_) for error in diagnostics]
+
+
+def program(number):
+    return f'program p{number}: int x; x := {number}; print x + {number} end'
+
+
+def entry_size(tmp_path):
+    cache = ParseCache(str(tmp_path / 'probe'))
+    cache.parse(program(0))
+    return cache.size
+
+
+@pytest.mark.parametrize('text', [
+    program(1),
+    'program a: print 1 od print 2 # end',
+    'program a: x := ; print end',
+    'program été: int é; é := 1; print é end',
+])
+def test_hit_gives_the_same_result_as_a_parse(text, tmp_path):
+    cache = ParseCache(str(tmp_path))
+    parser = Parser(Lexer(text))
+    tree = parser.program()
+    for _ in range(2):
+        tokens, cached, diagnostics = cache.parse(text)
+        assert cached == tree
+        assert errors(diagnostics) == errors(parser.diagnostics)
+        assert tokens[-1].type_ == 'EOF'
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert ParseCache(str(tmp_path)).parse(text)[1] == tree  # read back by a new cache
+
+
+def test_size_cap_evicts_the_least_recently_used(tmp_path):
+    size = entry_size(tmp_path)
+    directory = str(tmp_path / 'cache')
+    cache = ParseCache(directory, max_bytes=3 * size)
+    for number in range(3):
+        cache.parse(program(number))
+    cache.parse(program(0))  # now the most recently used
+    cache.parse(program(3))
+    assert cache.evictions == 1
+    assert cache.size <= 3 * size
+    assert len(os.listdir(directory)) == 3
+    cache.parse(program(0))
+    cache.parse(program(2))
+    cache.parse(program(3))
+    assert cache.hits == 4
+    cache.parse(program(1))  # was evicted
+    assert cache.misses == 5
+    assert cache.stats() == {'hits': 4, 'misses': 5, 'evictions': 2, 'entries': 3, 'bytes': cache.size}
+
+
+def test_order_survives_reopening(tmp_path):
+    size = entry_size(tmp_path)
+    directory = str(tmp_path / 'cache')
+    cache = ParseCache(directory, max_bytes=10 * size)
+    for number in range(3):
+        cache.parse(program(number))
+        os.utime(os.path.join(directory, cache.key(program(number))), ns=(number * 10 ** 9, number * 10 ** 9))
+    cache = ParseCache(directory, max_bytes=2 * size)
+    assert cache.size == 3 * size
+    cache.parse(program(3))
+    assert not os.path.exists(os.path.join(directory, cache.key(program(0))))
+    assert not os.path.exists(os.path.join(directory, cache.key(program(1))))
+    assert os.path.exists(os.path.join(directory, cache.key(program(2))))
+
+
+def test_a_cap_smaller_than_an_entry_keeps_nothing(tmp_path):
+    cache = ParseCache(str(tmp_path), max_bytes=1)
+    tree = cache.parse(program(1))[1]
+    assert tree == Parser(Lexer(program(1))).program()
+    assert cache.stats()['entries'] == 0 and os.listdir(str(tmp_path)) == []
+
+
+def test_damaged_entry_is_parsed_again(tmp_path):
+    cache = ParseCache(str(tmp_path))
+    cache.parse(program(1))
+    with open(os.path.join(str(tmp_path), cache.key(program(1))), 'wb') as file:
+        file.write(b'\x00\x01')
+    assert cache.parse(program(1))[1] == Parser(Lexer(program(1))).program()
+    assert (cache.hits, cache.misses) == (0, 2)
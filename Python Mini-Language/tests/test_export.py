@@ -0,0 +1,65 @@
+from classes.lexer import Lexer
+from classes.parser import Parser
+from classes.export import export_tokens, export_tree, read_tokens, read_tree
+import io
+
+import pytest
+
+
+SOURCES = [
+    'program a: int x; bool b;\n x := 12 + 3 * x;\n b := not (x < 2) or true;\n'
+    ' if b then print x else while x > 0 do x := x - 1 od fi end',
+    'program a: print 1 \0 end',
+    'program \u00e9t\u00e9: int \u00e9; \u00e9 := 1; print \u00e9 end',
+    'program a: print 123456789012345678901234567890 end',
+    'program a: print 1 od print 2 # end',
+    'program a: x := ; print end',
+    'program p: int 5; x := 1 end',
+    'program p: if x then int 5; print 1 fi end',
+]
+
+
+def errors(diagnostics):
+    return [(type(error), error.details, error.line, error.position_) for error in diagnostics]
+
+
+def lex(text):
+    lexer = Lexer(text)
+    tokens = [lexer.next()]
+    while tokens[-1].kind() != 'EOF':
+        tokens.append(lexer.next())
+    return [(token.type_, token.line, token.position_, token.value_) for token in tokens], errors(lexer.errors)
+
+
+@pytest.mark.parametrize('binary', [False, True])
+@pytest.mark.parametrize('text', SOURCES)
+def test_tokens_round_trip(text, binary):
+    file = io.BytesIO()
+    returned = export_tokens(text, file, binary)
+    file.seek(0)
+    tokens, lexer_errors = read_tokens(file)
+    assert ([(token.type_, token.line, token.position_, token.value_) for token in tokens],
+            errors(lexer_errors)) == lex(text)
+    assert errors(returned) == errors(lexer_errors)
+
+
+@pytest.mark.parametrize('binary', [False, True])
+@pytest.mark.parametrize('text', SOURCES)
+def test_tree_round_trip(text, binary):
+    parser = Parser(Lexer(text))
+    tree = parser.program()
+    file = io.BytesIO()
+    export_tree(text, file, binary)
+    file.seek(0)
+    loaded, diagnostics = read_tree(file)
+    assert loaded == tree
+    assert errors(diagnostics) == errors(parser.diagnostics)
+
+
+def test_nul_in_an_error_keeps_the_string_table():
+    file = io.BytesIO()
+    export_tokens('program a: print 1 \0 end\n x', file, binary=True)
+    file.seek(0)
+    tokens, lexer_errors = read_tokens(file)
+    assert [token.value_ for token in tokens if token.type_ == 'ID'] == ['a', 'x']
+    assert '\0' in lexer_errors[0].details
@@ -0,0 +1,53 @@
+from classes.lexer import Lexer
+from classes.parser import Parser
+from classes.fastparser import FastParser
+from classes.generator import Generator
+import os
+import random
+
+import pytest
+
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples')
+
+
+def sources():
+    texts = []
+    for name in sorted(os.listdir(EXAMPLES)):
+        with open(os.path.join(EXAMPLES, name)) as file:
+            texts.append(file.read())
+    texts += [Generator(4, 4, seed).text(2000) for seed in range(10)]
+    texts += [
+        'program a: print 1 end print 2; x := y',
+        'program a: print 1 od print 2 # end',
+        'program a: print - - 1; x := not (1 < 2 end',
+        'program a: x := 1 2; print 3 end',
+        'program a: int x; bool x; x := 1 end',
+    ]
+    rng = random.Random(1)
+    for text in texts[:15]:
+        for _ in range(8):  # damaged copies
+            index = rng.randrange(len(text))
+            text = text[:index] + rng.choice([';', 'fi', 'od', 'if', '(', '-', '#', 'x :=', '']) + text[index + 2:]
+            texts.append(text)
+    return texts
+
+
+def errors(diagnostics):
+    return [(type(error), error.details, error.line, error.position_) for error in diagnostics]
+
+
+@pytest.mark.parametrize('text', sources())
+def test_same_tree_and_diagnostics_as_the_parser(text):
+    parser = Parser(Lexer(text))
+    fast = FastParser(text)
+    assert fast.program() == parser.program()
+    assert errors(fast.diagnostics) == errors(parser.diagnostics)
+
+
+def test_names_are_interned():
+    tree = FastParser('program a: int x; x := x + 1 end').program()
+    declaration = tree.body.declarations[0]
+    assignment = tree.body.statements[0]
+    assert assignment.target.ident == declaration.ident == assignment.value.left.ident
+    assert assignment.target.name is declaration.name
@@ -0,0 +1,51 @@
+from classes.frontend import AsyncChecker, ChunkFeed, check_source
+from classes.scanner import Scanner
+import asyncio
+
+import pytest
+
+
+SOURCE = 'program Frontend:\n  int x;\n  x := 1; // a comment\n  if x < 2 then print x * 3 fi #\nend\n'
+
+
+async def chunks(data, size):
+    for start in range(0, len(data), size):
+        await asyncio.sleep(0)
+        yield data[start:start + size]
+
+
+def check(source, **options):
+    async def run():
+        async with AsyncChecker(**options) as checker:
+            return await checker.check(source)
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('size', [1, 3, 16, 1 << 16])
+def test_stream_gives_the_same_result_as_the_whole_source(size):
+    expected = check_source(SOURCE.encode())
+    result = check(chunks(SOURCE.encode(), size), yield_every=2)
+    for key in ('accepted', 'errors', 'tokens', 'bytes'):
+        assert result[key] == expected[key]
+    assert not result['accepted'] and not result['offloaded']
+    assert result['errors'][0]['details'] == "<At (Line: 4, Pos: 31) '#'>"
+
+
+def test_stream_is_scanned_as_it_arrives():
+    feed = ChunkFeed()
+    scanner = Scanner(feed)
+    feed.push(b'program Fee')
+    assert scanner.next().type_ == 'program'
+    assert scanner.next() is None  # 'Fee' may continue
+    feed.push(b'd: print 1')
+    assert [scanner.next().value() for _ in range(3)] == ['Feed', ':', 'print']
+    assert scanner.next() is None
+    feed.push(b' end')
+    feed.close()
+    assert [scanner.next().type_ for _ in range(3)] == ['NUM', 'end', 'EOF']
+
+
+def test_stream_that_is_not_utf8():
+    result = check(chunks(b'program a: print 1 \xff end', 4))
+    assert not result['accepted']
+    assert [error['kind'] for error in result['errors']] == ['Decode Error']
@@ -0,0 +1,122 @@
+from classes import incremental
+from classes.incremental import Document
+from classes.lexer import Lexer
+from classes.parser import Parser
+from classes.generator import Generator
+import random
+
+import pytest
+
+
+WORDS = ['program', 'p', ':', 'end', 'int', 'bool', 'x', ';', ':=', 'if', 'then', 'else', 'fi', 'while', 'do',
+         'od', 'print', '(', ')', '+', '-', '*', '<', '=', 'not', 'and', 'true', '1', '42', '#', '>', '//c\n', '\n']
+PIECES = [';', 'fi', 'od', 'if', 'else', 'end', '(', ')', '-', '#', '7', ' ', '\n', '\n\n', '//c\n',
+          'x :=', ' int', 'print 1; ', 'if x then print 1 fi;', 'while x do x := 1 od;', '']
+
+
+def errors(diagnostics):
+    return [(type(error), error.details, error.line, error.position_) for error in diagnostics]
+
+
+def tokens(text):
+    lexer = Lexer(text)
+    values = [lexer.next()]
+    while values[-1].type_ != 'EOF':
+        values.append(lexer.next())
+    return values
+
+
+def check(document, text):
+    parser = Parser(Lexer(text))
+    tree = parser.program()
+    assert document.text == text
+    assert document.tree == tree
+    assert errors(document.diagnostics) == errors(parser.diagnostics)
+    assert [(token.type_, token.value_, token.line, token.position_) for token in document.tokens] == \
+        [(token.type_, token.value_, token.line, token.position_) for token in tokens(text)]
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_edits_give_the_same_result_as_the_parser(seed, monkeypatch):
+    rng = random.Random(seed)
+    monkeypatch.setattr(incremental, 'BLOCK_SIZE', rng.choice([2, 4, 128]))
+    text = Generator(4, 4, seed).text(1000)
+    document = Document(text)
+    for _ in range(30):
+        offset = rng.randrange(len(text) + 1)
+        deleted = min(rng.choice([0, 0, 1, 2, 5]), len(text) - offset)
+        inserted = rng.choice(PIECES)
+        text = text[:offset] + inserted + text[offset + deleted:]
+        check(document.edit(offset, deleted, inserted), text)
+
+
+def edit_randomly(rng, document, text, count):
+    for _ in range(count):
+        offset = rng.choice([0, rng.randrange(len(text) + 1), rng.randrange(min(len(text), 20) + 1)])
+        deleted = min(rng.choice([0, 0, 1, 2, 5]), len(text) - offset)
+        inserted = rng.choice(PIECES + WORDS)
+        text = text[:offset] + inserted + text[offset + deleted:]
+        check(document.edit(offset, deleted, inserted), text)
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_edits_of_token_soup_give_the_same_result_as_the_parser(seed, monkeypatch):
+    rng = random.Random(seed)
+    monkeypatch.setattr(incremental, 'BLOCK_SIZE', rng.choice([2, 4, 128]))
+    text = ' '.join(rng.choice(WORDS) for _ in range(rng.randrange(1, 150)))
+    if seed % 2:
+        text = 'program p: ' + text + ' end'
+    edit_randomly(rng, Document(text), text, 30)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_edits_of_damaged_programs_give_the_same_result_as_the_parser(seed):
+    rng = random.Random(seed)
+    text = Generator(4, 4, seed).text(800)
+    for _ in range(5):
+        offset = rng.randrange(len(text))
+        text = text[:offset] + rng.choice(PIECES + WORDS) + text[offset + 2:]
+    edit_randomly(rng, Document(text), text, 30)
+
+
+@pytest.mark.parametrize('text, edits', [
+    ('program p: int x; x := 1; print x end', [(19, 0, 'print'), (0, 2, '//zz\n'), (0, 1, 'else')]),
+    ('>rogram p: int x; x := 1; print x end', [(0, 0, 'print')]),
+    ('program p: int x; x := 1; print x end', [(8, 1, 'q'), (0, 0, '\n\n'), (2, 0, '# '), (2, 2, '')]),
+    ('// note\nprogram p: print 1 end', [(3, 0, 'x'), (0, 8, ''), (0, 0, '  '), (7, 0, ':')]),
+    ('program p print 1 end', [(9, 0, ':'), (8, 2, ''), (0, 7, 'if')]),
+])
+def test_header_and_leading_edits(text, edits):
+    document = Document(text)
+    for offset, deleted, inserted in edits:
+        text = text[:offset] + inserted + text[offset + deleted:]
+        check(document.edit(offset, deleted, inserted), text)
+
+
+def test_an_error_elsewhere_does_not_parse_everything():
+    lines = ''.join(f'   a := a + {line};\n' for line in range(2000))
+    text = 'program Edit:\n   int a;\n' + lines + '   print a\nend\n'
+    document = Document(text)
+    offset = text.index('a + 10;') + 4
+    text = text[:offset] + ')' + text[offset:]
+    document.edit(offset, 0, ')')
+    assert document.reparsed < 20 and len(document.diagnostics) == 1
+    offset = text.index('a + 1000;') + 5
+    for inserted in ('\n', '7'):
+        text = text[:offset] + inserted + text[offset:]
+        document.edit(offset, 0, inserted)
+        assert document.relexed < 5 and document.reparsed < 20
+    check(document, text)
+
+
+def test_a_new_error_parses_up_to_the_next_statement():
+    lines = ''.join(f'   a := a + {line};\n' for line in range(2000))
+    text = 'program Edit:\n   int a;\n' + lines + '   print a\nend\n'
+    document = Document(text)
+    offset = text.index('a + 1000;') + 4
+    document.edit(offset, 0, ') ')
+    assert document.reparsed < 20
+    check(document, text[:offset] + ') ' + text[offset:])
+    document.edit(offset, 2, '')
+    assert document.reparsed < 20
+    check(document, text)
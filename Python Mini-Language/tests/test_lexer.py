@@ -0,0 +1,100 @@
+from classes.lexer import Lexer
+from classes.scanner import Scanner
+import io
+import sys
+import tracemalloc
+
+import pytest
+
+
+LEXERS = [Lexer, Scanner]
+
+
+def kinds_and_eof(lex):
+    kinds = []
+    token = lex.next()
+    while token.kind() != 'EOF':
+        kinds.append(token.kind())
+        token = lex.next()
+    return kinds, token
+
+
+@pytest.mark.parametrize('lexer_class', LEXERS)
+@pytest.mark.parametrize('trivia', ['\n', '// comment line\n', '  \t\n', '//\n\n  // x\n'])
+def test_trivia_runs_longer_than_the_recursion_limit(lexer_class, trivia):
+    lines = 2 * sys.getrecursionlimit()
+    text = 'program Blank:\n' + trivia * lines + '  print 1\nend\n'
+    kinds, eof = kinds_and_eof(lexer_class(text))
+    assert kinds == ['program', 'ID', ':', 'print', 'NUM', 'end']
+    assert eof.line == text.count('\n') + 1
+
+
+@pytest.mark.parametrize('lexer_class', LEXERS)
+def test_trivia_runs_from_a_stream(lexer_class):
+    lines = 2 * sys.getrecursionlimit()
+    text = 'program Blank:\n' + '\n// comment line\n' * lines + '  print 1\nend'
+    kinds, eof = kinds_and_eof(lexer_class(io.StringIO(text)))
+    assert kinds == ['program', 'ID', ':', 'print', 'NUM', 'end']
+    assert eof.line == 2 * lines + 3
+
+
+class SlowStream:
+    """A non-blocking stream: every other read has nothing yet."""
+
+    def __init__(self, text):
+        self.stream = io.StringIO(text)
+        self.ready = False
+
+    def read(self, size):
+        self.ready = not self.ready
+        return self.stream.read(size) if self.ready else None
+
+
+def test_stream_with_nothing_yet_is_waited_for():
+    text = 'program a: int x; x := 12 # 3; print x end'
+    expected = tokens_and_errors(Lexer(text))
+    assert tokens_and_errors(Lexer(SlowStream(text), 4)) == expected
+    lexer = Lexer(SlowStream(text), 4)
+    lexer.next()
+    assert [token.kind() for token in lexer.tokens()][-3:] == ['ID', 'end', 'EOF'] and len(lexer.errors) == 1
+
+
+def test_skip_trivia_returns_the_next_character():
+    lines = 2 * sys.getrecursionlimit()
+    lexer = Lexer('\n' * lines + '// comment\n' * lines + 'x')
+    assert lexer.skip_trivia() == 'x'
+    assert lexer.line == 2 * lines + 1
+
+
+def tokens_and_errors(lex):
+    tokens = []
+    token = lex.next()
+    while token.kind() != 'EOF':
+        tokens.append((token.kind(), token.value(), token.line, token.position_))
+        token = lex.next()
+    tokens.append((token.kind(), token.value(), token.line, token.position_))
+    return tokens, [(error.details, error.line, error.position_) for error in lex.errors]
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64])
+def test_one_line_stream_matches_the_string(chunk_size):
+    text = ('program a: int x1; x1 := 12 + (3*4) - 5; if x1 != 7 then print x1 <= 8 fi; '
+            'while not x1 >= 1000 do x1 := x1*x1 od; b := x1 / 2 # % ! ; print identifier_long_3 '
+            '// a comment // with slashes; print 1\nprint 2 end')
+    expected = tokens_and_errors(Scanner(text))
+    assert tokens_and_errors(Scanner(io.StringIO(text), chunk_size)) == expected
+    assert tokens_and_errors(Scanner(io.BytesIO(text.encode()), chunk_size)) == expected
+
+
+def test_one_line_stream_is_not_buffered_whole():
+    text = 'program a: ' + 'x := 12345 + y; print x * (y - 1); ' * 4000 + 'print 0 end'
+    stream = io.BytesIO(text.encode())  # a StringIO would copy the text when first read
+    tracemalloc.start()
+    try:
+        scanner = Scanner(stream, 1024)
+        while scanner.next().kind() != 'EOF':
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < len(text) // 10
@@ -0,0 +1,57 @@
+import main
+import os
+import shutil
+import sys
+
+import pytest
+
+
+SOURCES = {
+    'trailing.txt': 'program a: print 1 end print 2; x := y',
+    'late_character.txt': 'program a: print 1 od print 2 # end',
+    'after_end.txt': 'program a: print 1 end # @',
+    'semantic.txt': 'program a: int x; y := 1; print x end',
+    'illegal.txt': 'program a: int x;\n x := 1 $ 2;\n print x end',
+}
+
+
+def run(paths, *options):
+    """
+    Runs main.py on 'paths' and returns the per-file lines it prints
+    (the summary lines hold timings and cache counters).
+    """
+    argv = sys.argv
+    sys.argv = ['main.py', '-j', '1', *options, *paths]
+    try:
+        main.main()
+    finally:
+        sys.argv = argv
+
+
+def per_file_lines(output):
+    return [line for line in output.splitlines()
+            if line.startswith(('ACCEPT', 'REJECT', ' '))]
+
+
+@pytest.fixture
+def sources(tmp_path):
+    folder = tmp_path / 'sources'
+    examples = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples')
+    shutil.copytree(examples, folder)
+    for name, text in SOURCES.items():
+        (folder / name).write_text(text)
+    return str(folder)
+
+
+def test_cached_and_uncached_runs_print_the_same(sources, tmp_path, capsys):
+    cache = str(tmp_path / 'cache')
+    run([sources])
+    uncached = per_file_lines(capsys.readouterr().out)
+    run([sources], '--cache', cache)  # every file is a miss
+    missed = capsys.readouterr().out
+    run([sources], '--cache', cache)  # every file is a hit
+    hit = capsys.readouterr().out
+    assert 'cache: 0 hits' in missed and 'misses, ' in hit and 'cache: 0 hits' not in hit
+    assert per_file_lines(missed) == uncached
+    assert per_file_lines(hit) == uncached
+    assert any('expected "EOF"' in line for line in uncached)
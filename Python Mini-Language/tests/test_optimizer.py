@@ -0,0 +1,58 @@
+from classes.lexer import Lexer
+from classes.parser import Parser
+from classes.semantic import Checker
+from classes.interpreter import Interpreter
+from classes.optimizer import Optimizer
+from classes.nodes import If, While
+
+import pytest
+
+
+def parse(text):
+    tree = Parser(Lexer(text)).program()
+    assert tree is not None and not Checker(tree).errors
+    return tree
+
+
+def output(tree):
+    lines = []
+    Interpreter(tree, lines.append).run()
+    return lines
+
+
+def bodies(body):
+    yield body
+    for node in body.statements:
+        if type(node) is If:
+            yield from bodies(node.then_body)
+            if node.else_body is not None:
+                yield from bodies(node.else_body)
+        elif type(node) is While:
+            yield from bodies(node.body)
+
+
+@pytest.mark.parametrize('text', [
+    'program a: if false then print 1 fi end',
+    'program a: while 1 > 2 do print 1 od end',
+    'program a: int x; x := 1 end',
+    'program a: int x; if true then x := 2 fi; x := 1 end',
+    'program a: int x; if x < 1 then x := 2 else x := 3 fi end',
+    'program a: int x; while x < 3 do if false then print x fi; x := x + 1 od end',
+    'program a: int x; while x < 3 do int y; y := x; x := x + 1 od; print x end',
+    'program a: int x; if x = 0 then if false then print 1 fi else x := 1 fi; print x end',
+])
+def test_no_body_is_left_without_statements(text):
+    tree = parse(text)
+    expected = output(tree)
+    optimizer = Optimizer(parse(text))
+    optimized = optimizer.optimize()
+    assert all(body.statements for body in bodies(optimized.body))
+    assert output(optimized) == expected
+
+
+def test_dead_statements_are_removed():
+    text = 'program a: int x; int y; x := 1; if x > 0 then y := 2 else y := 3 fi; print x end'
+    optimizer = Optimizer(parse(text))
+    tree = optimizer.optimize()
+    assert repr(tree) == repr(parse('program a: int x; int y; x := 1; print x end'))
+    assert optimizer.removed > 0
@@ -0,0 +1,66 @@
+from classes.lexer import Lexer
+from classes.parser import Parser
+from classes.parallel import ParallelParser
+from classes.generator import Generator
+from concurrent.futures import ProcessPoolExecutor
+import io
+
+import pytest
+
+
+def errors(diagnostics):
+    return [(type(error), error.details, error.line, error.position_) for error in diagnostics]
+
+
+@pytest.fixture(scope='module')
+def executor():
+    with ProcessPoolExecutor(2) as executor:
+        yield executor
+
+
+def parse(text, executor, **options):
+    parser = ParallelParser(text, jobs=2, min_bytes=0, executor=executor, **options)
+    return parser, parser.program()
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_same_tree_as_the_parser(seed, executor):
+    text = Generator(4, 4, seed).text(20000)
+    parser, tree = parse(text, executor)
+    assert parser.parallel
+    assert tree == Parser(Lexer(text)).program()
+    assert parser.diagnostics == []
+
+
+@pytest.mark.parametrize('text', [
+    'program \u00e9t\u00e9: int \u00e9; ' + '\u00e9 := \u00e9 + 1;\n print \u00e9;\n' * 500 + ' print 0 end',
+    'program a:\n' + 'if true then print 1 fi;\nwhile false do print 2 od;\n' * 400 + 'print 3\nend',
+    'program a: print 1; print 2 end',
+    'program a: print 1 end',
+])
+def test_unicode_nesting_and_short_programs(text, executor):
+    parser, tree = parse(text, executor)
+    assert parser.parallel
+    assert tree == Parser(Lexer(text)).program()
+
+
+@pytest.mark.parametrize('text', [
+    'program a: int x;\n' + 'x := x + 1;\n' * 500 + 'x := ) 2;\n' + 'print x;\n' * 500 + 'print x end',
+    'program a: int x;\n' + 'x := x + 1;\n' * 500 + 'if x then print 1;\n' + 'print x;\n' * 500 + 'print x end',
+    'program a: int x;\n' + 'x := x + 1;\n' * 500 + 'x := 2 # 3;\n' + 'print x end',
+    'program a int x;\n' + 'x := x + 1;\n' * 500 + 'print x end',
+    'program a: int x;\n' + 'x := x + 1;\n' * 500 + 'print x end print 2',
+])
+def test_errors_are_those_of_the_parser(text, executor):
+    parser, tree = parse(text, executor)
+    expected = Parser(Lexer(text))
+    assert tree == expected.program()
+    assert errors(parser.diagnostics) == errors(expected.diagnostics)
+    assert not parser.parallel
+
+
+def test_small_sources_are_parsed_in_one_piece():
+    text = Generator(3, 3, 1).text(5000)
+    parser = ParallelParser(io.BytesIO(text.encode('utf-8')), jobs=2)
+    assert parser.program() == Parser(Lexer(text)).program()
+    assert not parser.parallel
@@ -0,0 +1,87 @@
+from classes.lexer import Lexer
+from classes.parser import Parser
+from classes.semantic import Checker
+from classes.symbol import SymbolTable
+import os
+
+import pytest
+
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'examples')
+
+
+def check(text):
+    tree = Parser(Lexer(text)).program()
+    assert tree is not None
+    return [(error.details, error.line, error.position_) for error in Checker(tree).errors]
+
+
+def test_declare_and_lookup():
+    symbols = SymbolTable()
+    symbols.enter()
+    x = symbols.declare(1, 'x', 'int', 0)
+    assert (x.name, x.type_, x.slot, x.depth) == ('x', 'int', 0, 1)
+    assert symbols.lookup(1) is x
+    assert symbols.lookup(2) is None
+
+
+def test_redeclaration_in_the_same_scope_is_refused():
+    symbols = SymbolTable()
+    symbols.enter()
+    x = symbols.declare(1, 'x', 'int')
+    assert symbols.declare(1, 'x', 'bool') is None
+    assert symbols.lookup(1) is x
+
+
+def test_inner_scope_hides_until_it_exits():
+    symbols = SymbolTable()
+    symbols.enter()
+    outer = symbols.declare(1, 'x', 'int')
+    symbols.enter()
+    inner = symbols.declare(1, 'x', 'bool')
+    y = symbols.declare(2, 'y', 'int')
+    assert inner is not None and inner.depth == 2
+    assert symbols.lookup(1) is inner and symbols.lookup(2) is y
+    symbols.exit()
+    assert symbols.lookup(1) is outer
+    assert symbols.lookup(2) is None
+    assert 2 not in symbols.table  # emptied stacks are removed
+    symbols.exit()
+    assert symbols.lookup(1) is None and symbols.table == {}
+
+
+@pytest.mark.parametrize('text, errors', [
+    ('program a: int x; bool x; x := 1 end',
+     [('<At (Line: 1, Pos: 18) "x" is already declared in this body>', 1, 18)]),
+    ('program a: int x; if true then int y; bool y; y := 1 fi end',
+     [('<At (Line: 1, Pos: 38) "y" is already declared in this body>', 1, 38)]),
+    ('program a: x := 1; if true then int x; x := 2 fi end',
+     [('<At (Line: 1, Pos: 11) "x" is not declared>', 1, 11)]),
+    ('program a: if true then int x; x := 1 fi; print x end',
+     [('<At (Line: 1, Pos: 48) "x" is not declared>', 1, 48)]),
+    ('program a: while false do bool b; b := true od; b := false end',
+     [('<At (Line: 1, Pos: 48) "b" is not declared>', 1, 48)]),
+])
+def test_checker_errors(text, errors):
+    assert check(text) == errors
+
+
+def test_shadowing_is_legal():
+    with open(os.path.join(EXAMPLES, 'hiding.txt')) as file:
+        assert check(file.read()) == []
+    assert check('program a: int x; if true then bool x; x := true; '
+                 'if x then int x; x := 2; print x fi fi; x := 3 end') == []
+
+
+def test_hidden_variable_keeps_its_type_after_the_scope():
+    assert check('program a: int x; if true then bool x; x := true fi; x := false end') == \
+        [('<At (Line: 1, Pos: 53) cannot assign a "bool" value to "x" ("int")>', 1, 53)]
+
+
+def test_every_type_error_is_reported():
+    assert check('program a: int x; bool b; x := b; print x + b; if x then print 1 fi; print x = b end') == [
+        ('<At (Line: 1, Pos: 26) cannot assign a "bool" value to "x" ("int")>', 1, 26),
+        ('<At (Line: 1, Pos: 42) "+" expects "int" but found "bool">', 1, 42),
+        ('<At (Line: 1, Pos: 50) expected a "bool" condition but found "int">', 1, 50),
+        ('<At (Line: 1, Pos: 77) cannot compare "int" with "bool">', 1, 77),
+    ]
@@ -0,0 +1,83 @@
+from classes.lexer import Lexer
+from classes.parser import Parser
+from classes.stackparser import StackParser
+from classes.generator import Generator
+from classes.nodes import If, While, Print, Literal
+import random
+import sys
+
+import pytest
+
+
+DEEP = 100000  # nesting far beyond the recursion limit
+
+
+def errors(diagnostics):
+    return [(type(error), error.details, error.line, error.position_) for error in diagnostics]
+
+
+def sources():
+    texts = [Generator(5, 5, seed).text(1500) for seed in range(8)]
+    texts += [
+        'program a: print 1 end print 2; x := y',
+        'program a: print 1 od print 2 # end',
+        'program a: print - - 1; x := not (1 < 2 end',
+        'program a: x := 1 2; print 3 end',
+        'program a: if x then if y then print 1 else print 2 fi fi; while ((x)) do od end',
+        'program a: if x then int y; bool y print 1 fi end',
+        'program a: print ((1 + 2) * (3 end',
+    ]
+    rng = random.Random(2)
+    for text in texts[:8]:
+        for _ in range(6):  # damaged copies
+            index = rng.randrange(len(text))
+            text = text[:index] + rng.choice([';', 'fi', 'od', 'if', '(', ')', 'then', 'x :=', '']) + text[index + 2:]
+            texts.append(text)
+    return texts
+
+
+@pytest.mark.parametrize('text', sources())
+def test_same_tree_and_diagnostics_as_the_parser(text):
+    parser = Parser(Lexer(text))
+    stack = StackParser(Lexer(text))
+    assert stack.program() == parser.program()
+    assert errors(stack.diagnostics) == errors(parser.diagnostics)
+
+
+def test_deeply_nested_ifs():
+    text = 'program deep: ' + 'if true then ' * DEEP + 'print 1' + ' fi' * DEEP + ' end'
+    parser = StackParser(Lexer(text))
+    tree = parser.program()
+    assert parser.diagnostics == []
+    node = tree.body.statements[0]
+    for _ in range(DEEP - 1):
+        assert type(node) is If and node.else_body is None and len(node.then_body.statements) == 1
+        node = node.then_body.statements[0]
+    assert type(node.then_body.statements[0]) is Print
+
+
+def test_deeply_nested_parentheses():
+    text = 'program deep: print ' + '(' * DEEP + '1' + ')' * DEEP + ' end'
+    parser = StackParser(Lexer(text))
+    tree = parser.program()
+    assert parser.diagnostics == []
+    assert type(tree.body.statements[0].value) is Literal
+
+
+def test_deep_nesting_with_an_error():
+    depth = 4 * sys.getrecursionlimit()
+    text = 'program deep: ' + 'while true do ' * depth + 'print ((1' + ' od' * depth + ' end'
+    parser = StackParser(Lexer(text))
+    assert parser.program() is None
+    assert parser.diagnostics[0].details.endswith('I see "od" but expected ")">')
+
+
+def test_nesting_in_expressions_and_bodies():
+    condition = '(' * 20 + 'true' + ')' * 20
+    text = 'program deep: ' + f'while {condition} do ' * 5000 + 'print 1' + ' od' * 5000 + ' end'
+    parser = StackParser(Lexer(text))
+    node = parser.program().body.statements[0]
+    for _ in range(4999):
+        assert type(node.condition) is Literal
+        node = node.body.statements[0]
+    assert type(node) is While and parser.diagnostics == []
@@ -0,0 +1,77 @@
+from classes.lexer import Lexer
+from classes.tokenbuffer import tokenize_all
+from classes.generator import Generator
+import io
+import random
+
+import pytest
+
+
+def errors(errors):
+    return [(type(error), error.details, error.line, error.position_) for error in errors]
+
+
+def lexed(lexer):
+    tokens = [lexer.next()]
+    while tokens[-1].kind() != 'EOF':
+        tokens.append(lexer.next())
+    return [(token.type_, token.value_, token.line, token.position_) for token in tokens], errors(lexer.errors)
+
+
+def buffered(buffer):
+    return [(token.type_, token.value_, token.line, token.position_) for token in buffer], errors(buffer.errors)
+
+
+def sources():
+    texts = [Generator(4, 4, seed).text(3000) for seed in range(4)]
+    texts += [
+        '',
+        'program',
+        'program a: print 1 end',
+        'program a: x := 1 $ 2; print x != 3 ! 4 end @',
+        'program a: int x1; x1 := 12 + (3*4) - 5; if x1 != 7 then print x1 <= 8 fi end',
+        '// only a comment',
+        'program a: // comment\n\n  print 1 // another\nend',
+        'program été: int é; é := 1; print é § end',
+        'program a: print 123456789012345678901234567890 end',
+        'program a: print 1 \0 end',
+        'x:=y<=z>=w!=v=u<t>s',
+        'ifx if1 fi od_ end2 true false notnot and or',
+        'a\tb\r\nc\n\n\n  d',
+        '007 1a a1 _x x_',
+    ]
+    rng = random.Random(3)
+    for text in texts[:4]:
+        for _ in range(5):  # damaged copies
+            index = rng.randrange(len(text))
+            text = text[:index] + rng.choice(['#', '!', '$=', 'é', '/', '//', '\n', '']) + text[index + 1:]
+            texts.append(text)
+    return texts
+
+
+@pytest.mark.parametrize('text', sources())
+def test_same_tokens_and_errors_as_the_lexer(text):
+    assert buffered(tokenize_all(text)) == lexed(Lexer(text))
+
+
+@pytest.mark.parametrize('text', sources()[:6])
+def test_streams(text):
+    expected = lexed(Lexer(text))
+    assert buffered(tokenize_all(io.StringIO(text))) == expected
+    assert buffered(tokenize_all(io.BytesIO(text.encode('utf-8')))) == expected
+
+
+def test_lexer_tokens_continue_where_next_stopped():
+    text = 'program a: int x;\n x := 1 # 2;\n print x\nend'
+    lexer = Lexer(text)
+    first = [lexer.next() for _ in range(3)]
+    rest = lexer.tokens()
+    tokens = [(token.type_, token.value_, token.line, token.position_) for token in first + list(rest)]
+    assert (tokens, errors(lexer.errors)) == lexed(Lexer(text))
+
+
+def test_names_are_interned():
+    buffer = tokenize_all('program a: a := b + a end')
+    names = [token for token in buffer if token.type_ == 'ID']
+    assert names[0].ident == names[1].ident == names[3].ident != names[2].ident
+    assert names[0].value_ is names[3].value_
@@ -0,0 +1,34 @@
+from classes.lexer import Lexer
+from classes.tokenstream import TokenStream
+
+
+TEXT = 'program a: int x; x := 1; while x < 10 do x := x + 1 od; print x end'
+
+
+def kinds(text):
+    lexer = Lexer(text)
+    values = [lexer.next().kind()]
+    while values[-1] != 'EOF':
+        values.append(lexer.next().kind())
+    return values
+
+
+def test_advance_returns_the_lexer_tokens():
+    stream = TokenStream(Lexer(TEXT))
+    values = [stream.advance().kind()]
+    while values[-1] != 'EOF':
+        values.append(stream.advance().kind())
+    assert values == kinds(TEXT)
+
+
+def test_peek_past_the_buffer_size():
+    expected = kinds(TEXT)
+    stream = TokenStream(Lexer(TEXT), size=4)
+    assert stream.advance().kind() == expected[0]
+    assert [stream.peek(k).kind() for k in range(len(expected))] == expected
+    values = [stream.peek(0).kind()]
+    for _ in range(len(expected) - 1):
+        values.append(stream.advance().kind())
+        if values[-1] != 'EOF':
+            assert stream.peek(1).kind() == expected[len(values)]
+    assert values == expected